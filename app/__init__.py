@@ -1,12 +1,22 @@
 from flask import Flask
 from flask_cors import CORS
 from .routes.know_v1 import bp as know_bp
+from .routes.metrics import bp as metrics_bp, instrument
+from .routes.admin import bp as admin_bp, profile_requests
+from .know_service.prewarm import prewarmer
 import os
 
 app = Flask(__name__)
+# request bodies (ingest streams included) past this get a 413
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("KNOW_MAX_BODY_BYTES", str(64 * 1024 * 1024)))
 origins = os.getenv("CORS_ALLOWLIST","*").split(",")
-CORS(app, resources={r"/api/*": {"origins": origins}})
+CORS(app, resources={r"/api/*": {"origins": origins}}, expose_headers=["ETag", "Server-Timing", "X-Know-Profile-Id"])
+instrument(app)
+profile_requests(app)
 app.register_blueprint(know_bp, url_prefix="/api/know/v1")
+app.register_blueprint(metrics_bp, url_prefix="/api")
+app.register_blueprint(admin_bp, url_prefix="/api/admin")
+prewarmer.start()
 
 @app.get("/api/healthz")
 def healthz(): return {"ok": True}
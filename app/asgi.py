@@ -0,0 +1,149 @@
+"""ASGI entry point: cartography compiles run on the event loop, everything else is the Flask app.
+
+    pip install asgiref httpx uvicorn
+    uvicorn app.asgi:app --port 8000
+
+A compile waiting on ORCID/OpenAlex/Crossref holds no worker thread here, so
+one process can keep hundreds in flight. Other routes go through asgiref's
+WSGI adapter unchanged, CORS preflights included.
+"""
+import json
+import os
+import time
+from contextlib import aclosing
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header, parse_etags
+
+from . import app as flask_app
+from .know_service import telemetry
+from .know_service.cartography import compile_events_async, compile_graph_async
+from .know_service.prewarm import prewarmer
+from .know_service.wire import WireFormatError, encode, negotiate
+from .routes.http_cache import DEGRADED_TTL, canonical_key, memo
+from .routes.know_v1 import STREAM_HEADERS, STREAM_TYPES, compile_args, compile_version, encode_event, stream_format
+
+COMPILE_PATH = "/api/know/v1/cartography/compile"
+COMPILE_TTL = 600  # as the Flask route's http_cached
+ORIGINS = os.getenv("CORS_ALLOWLIST", "*").split(",")
+MAX_BODY = 1 << 20
+
+wsgi = WsgiToAsgi(flask_app)
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY:
+            raise ValueError("body too large")
+        if not message.get("more_body"):
+            return body
+
+
+def cors_headers(headers):
+    origin = headers.get(b"origin", b"").decode()
+    if origin and ("*" in ORIGINS or origin in ORIGINS):
+        return [(b"access-control-allow-origin", b"*" if "*" in ORIGINS else origin.encode()),
+                (b"access-control-expose-headers", b"ETag, Server-Timing"), (b"vary", b"Origin")]
+    return []
+
+
+async def respond(send, status, body=b"", content_type="application/json", headers=()):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", content_type.encode()), *headers]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def compile_cartography(scope, receive, send):
+    headers = dict(scope["headers"])
+    extra = cors_headers(headers)
+    try:
+        body = json.loads(await read_body(receive) or b"{}") or {}
+        if not isinstance(body, dict):
+            raise ValueError("body must be a JSON object")
+        prompt, mode, window = compile_args(body)
+    except ValueError:
+        error = {"ok": False, "error": "body must be JSON; ymin and ymax must be integers"}
+        return await respond(send, 400, json.dumps(error).encode(), headers=extra)
+
+    query = dict(parse_qsl(scope.get("query_string", b"").decode()))
+    accept = headers.get(b"accept", b"").decode()
+    accepted = parse_accept_header(accept, MIMEAccept)
+    extra += [(b"vary", b"Accept")]
+    fmt = stream_format(query.get("stream") or body.get("stream"), accepted)
+    if fmt:
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", STREAM_TYPES[fmt].encode()),
+            *[(k.lower().encode(), v.encode()) for k, v in STREAM_HEADERS.items()], *extra]})
+        # closed at once if send fails (client gone), which cancels the authors still running
+        async with aclosing(compile_events_async(prompt, mode, window=window)) as events:
+            async for ev in events:
+                await send({"type": "http.response.body", "body": encode_event(ev, fmt).encode(), "more_body": True})
+        return await send({"type": "http.response.body", "body": b""})
+
+    try:
+        wire = negotiate(query.get("format") or body.get("format"), accepted)
+    except WireFormatError as e:
+        return await respond(send, 400, json.dumps({"ok": False, "error": str(e)}).encode(), headers=extra)
+
+    # keyed like the Flask route's http_cached entry, in the same memo
+    key = canonical_key("POST", COMPILE_PATH, query.items(), accept or None, body, compile_version())
+    entry = memo.get(key)
+    if entry is None:
+        graph, failed = prewarmer.lookup(prompt, mode, window), []
+        if graph is None:
+            with telemetry.failures() as failed:
+                graph = await compile_graph_async(prompt, mode, window=window)
+        with telemetry.span("serialize"):
+            payload, mimetype = encode(graph, wire)
+        entry = memo.put(key, payload, DEGRADED_TTL if failed else COMPILE_TTL, mimetype)
+    payload, etag, _, mimetype = entry
+    extra += [(b"etag", f'"{etag}"'.encode()), (b"cache-control", b"no-cache")]
+    if parse_etags(headers.get(b"if-none-match", b"").decode() or None).contains(etag):
+        return await respond(send, 304, headers=extra)
+    await respond(send, 200, payload, content_type=mimetype, headers=extra)
+
+
+async def timed(handler, scope, receive, send):
+    """Server-Timing and request metrics for a natively served route, as the Flask hooks add them."""
+    trace = telemetry.start()
+    if trace is None:
+        return await handler(scope, receive, send)
+    status = 500
+
+    async def send_timed(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            message = {**message, "headers": [*message["headers"], (b"server-timing", trace.server_timing().encode())]}
+        await send(message)
+
+    telemetry.IN_FLIGHT.inc((scope["path"],))
+    try:
+        await handler(scope, receive, send_timed)
+    finally:
+        telemetry.REQUEST_SECONDS.observe(time.perf_counter() - trace.started, (scope["path"], scope["method"], str(status)))
+        telemetry.IN_FLIGHT.inc((scope["path"],), -1)
+        telemetry.finish()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] == COMPILE_PATH:
+        return await timed(compile_cartography, scope, receive, send)
+    return await wsgi(scope, receive, send)
@@ -0,0 +1,56 @@
+from dataclasses import asdict
+
+from .fanout import authors, gather, deadline_in
+from .groups import find_group
+from .people import identify, resolve_one, unresolved
+from .works import fetch_for
+
+MAX_AUTHORS = 100
+MAX_WORKS = 50
+
+
+def expand_authors(entries=None, group=None):
+    """Explicit entries plus the members of a ``data/groups.json`` group, if named."""
+    out = list(entries or [])
+    concepts = []
+    hit = find_group(group) if group else None
+    if hit:
+        out += hit[1].get("members", [])
+        concepts = list(hit[1].get("defaultConcepts", []))
+    return out, concepts
+
+
+def person_key(p):
+    return p.orcid or p.openalex or p.name
+
+
+def resolve_batch(entries, deadline=None):
+    """Resolve entries once per distinct identifier, then merge entries that land on one person.
+
+    Returns ``[(Person, [entries...])]`` in order of first appearance; entries past
+    ``MAX_AUTHORS`` are ignored.
+    """
+    entries = entries[:MAX_AUTHORS]
+    deadline = deadline or deadline_in()
+    distinct = {}
+    for e in entries:
+        distinct.setdefault(identify(e), e)
+    found = gather(authors, [(resolve_one, e, deadline) for e in distinct.values()], deadline)
+    by_ident = {k: p or unresolved(e) for (k, e), p in zip(distinct.items(), found)}
+
+    merged = {}
+    for e in entries:
+        p = by_ident[identify(e)]
+        person, inputs = merged.setdefault(person_key(p), (p, []))
+        if e not in inputs:
+            inputs.append(e)
+    return list(merged.values())
+
+
+def fetch_batch(entries, concepts, window=None, limit=5, deadline=None):
+    deadline = deadline or deadline_in()
+    resolved = resolve_batch(entries, deadline)
+    limit = max(1, min(int(limit), MAX_WORKS))
+    works = gather(authors, [(fetch_for, p, concepts, window, limit, deadline) for p, _ in resolved],
+                   deadline, default=[])
+    return [{"query": inputs, "person": asdict(p), "works": ws} for (p, inputs), ws in zip(resolved, works)]
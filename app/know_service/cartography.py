@@ -0,0 +1,197 @@
+import asyncio
+import re
+import threading
+from concurrent.futures import TimeoutError, as_completed
+
+from .concepts import tagger, work_concepts
+from .groups import find_group
+from .people import resolve_one, resolve_one_async, unresolved
+from .works import fetch_for, fetch_for_async
+from .fanout import authors, gather, gather_async, deadline_in, remaining
+from .telemetry import bind, note_failure, span, traced
+
+
+def parse_prompt(prompt: str):
+    names = []
+    lower = prompt.lower()
+    # concepts named before the roster, in the order they are mentioned
+    concepts = tagger().find(prompt.split("across", 1)[0] if "across" in lower else prompt)
+    if "across" in lower:
+        after = prompt.split("across", 1)[1]
+        names = expand_groups(n.strip(" .") for n in after.replace(" and ", ",").split(",") if n.strip())
+    else:
+        names = [prompt]
+    return names, concepts
+
+
+_GROUP_WORDS = re.compile(r"^the\s+|\s+group$", re.I)
+
+
+def expand_groups(names):
+    """Names as given, with a ``data/groups.json`` group ("the Deleuzian Scholars group") replaced by its members."""
+    out = []
+    for n in names:
+        hit = find_group(_GROUP_WORDS.sub("", n))
+        out += hit[1].get("members", []) if hit else [n]
+    return out
+
+
+def concept_codes(concepts):
+    """``{concept: code}``: "#" and the first three letters, lengthened until no two concepts share one."""
+    codes, used = {}, set()
+    for c in concepts:
+        if c in codes:
+            continue
+        n = 3
+        code = f"#{c[:n].upper()}"
+        while code in used and n < len(c):
+            n += 1
+            code = f"#{c[:n].upper()}"
+        base, k = code, 2
+        while code in used:  # all of c is an earlier concept's code
+            code, k = f"{base}{k}", k + 1
+        used.add(code)
+        codes[c] = code
+    return codes
+
+
+def _author(name, concepts, window, deadline, abandoned=None):
+    p = resolve_one(name, deadline)
+    if abandoned is not None and abandoned.is_set():
+        return None
+    return p, fetch_for(p, concepts, window, deadline=deadline)
+
+
+async def _author_async(name, concepts, window, deadline):
+    p = await resolve_one_async(name, deadline)
+    return p, await fetch_for_async(p, concepts, window, deadline=deadline)
+
+
+def concept_nodes(concepts):
+    codes = concept_codes(concepts)
+    return [{"id": f"concept:{c}", "type": "concept", "label": c, "code": codes[c]} for c in concepts]
+
+
+def author_fragment(p, works, concepts):
+    """Nodes, edges and per-concept refs contributed by one author."""
+    aid = p.orcid or p.name
+    code = "".join(w[0].upper() for w in p.name.split())
+    nodes = [{"id": aid, "type": "author", "label": p.name, "orcid": p.orcid, "code": code}]
+    edges = []
+    codes = concept_codes(concepts)
+    refs = {codes[c]: [] for c in concepts}
+    # works carry concept tags from their adapter; only the requested ones become edges
+    wanted = {tagger().resolve(c): c for c in concepts}
+    for w in works:
+        wid = w.get("doi") or w.get("url") or w["title"]
+        nodes.append({"id": wid, "type": "work", "label": w["title"], "year": w.get("year"), "url": w.get("url")})
+        edges.append({"source": aid, "target": wid, "kind": "authored"})
+        for tag in work_concepts(w):
+            c = wanted.get(tag)
+            if c is not None:
+                edges.append({"source": f"concept:{c}", "target": wid, "kind": "concept"})
+                refs[codes[c]].append({"title": w["title"], "url": w.get("url"), "doi": w.get("doi"), "year": w.get("year")})
+    return nodes, edges, refs
+
+
+def _merge_refs(concepts, fragments):
+    out = {code: [] for code in concept_codes(concepts).values()}
+    for part in fragments:
+        for code, items in part.items():
+            out[code] += items
+    return out
+
+
+def compile_graph(prompt: str, mode: str = "concept_lineage", deadline=None, window=None):
+    names, concepts = parse_prompt(prompt)
+    deadline = deadline or deadline_in()
+    # Authors resolve and fetch in parallel; gather keeps prompt order.
+    found = gather(authors, [(_author, n, concepts, window, deadline) for n in names], deadline)
+    return _assemble(names, concepts, found)
+
+
+async def compile_graph_async(prompt: str, mode: str = "concept_lineage", deadline=None, window=None):
+    """``compile_graph`` on the event loop: upstream waits hold no thread."""
+    names, concepts = parse_prompt(prompt)
+    deadline = deadline or deadline_in()
+    found = await gather_async([(_author_async, n, concepts, window, deadline) for n in names], deadline)
+    return _assemble(names, concepts, found)
+
+
+@traced("assemble")
+def _assemble(names, concepts, found):
+    nodes = concept_nodes(concepts)
+    edges = []
+    parts = []
+    for n, hit in zip(names, found):
+        if hit is None or hit[0].source == "string":
+            note_failure("unresolved")
+        a_nodes, a_edges, a_refs = author_fragment(*(hit or (unresolved(n), [])), concepts)
+        nodes += a_nodes
+        edges += a_edges
+        parts.append(a_refs)
+    return {"nodes": nodes, "edges": edges, "refs": _merge_refs(concepts, parts)}
+
+
+def compile_events(prompt: str, mode: str = "concept_lineage", deadline=None, window=None):
+    """Yield the graph as events: concepts first, then each author as soon as
+    it resolves (fastest first), then a summary carrying ``refs`` in prompt order."""
+    names, concepts = parse_prompt(prompt)
+    deadline = deadline or deadline_in()
+    yield {"event": "concepts", "nodes": concept_nodes(concepts), "edges": []}
+    abandoned = threading.Event()
+    pending = {authors.submit(bind(_author), n, concepts, window, deadline, abandoned): i
+               for i, n in enumerate(names)}
+    parts = [None] * len(names)
+
+    def emit(i, hit):
+        with span("assemble"):
+            a_nodes, a_edges, parts[i] = author_fragment(*(hit or (unresolved(names[i]), [])), concepts)
+        return {"event": "author", "index": i, "nodes": a_nodes, "edges": a_edges}
+
+    try:
+        try:
+            for f in as_completed(pending, timeout=remaining(deadline)):
+                i = pending.pop(f)
+                yield emit(i, f.result() if f.exception() is None else None)
+        except TimeoutError:
+            pass
+        for f, i in sorted(pending.items(), key=lambda kv: kv[1]):
+            f.cancel()
+            yield emit(i, None)
+        yield {"event": "summary", "authors": len(names), "refs": _merge_refs(concepts, parts)}
+    finally:
+        # also runs when a client disconnects and the stream is closed: queued authors
+        # never start, and running ones stop before fetching works
+        abandoned.set()
+        for f in pending:
+            f.cancel()
+
+
+async def compile_events_async(prompt: str, mode: str = "concept_lineage", deadline=None, window=None):
+    """Async generator twin of ``compile_events``, with the same event sequence."""
+    names, concepts = parse_prompt(prompt)
+    deadline = deadline or deadline_in()
+    yield {"event": "concepts", "nodes": concept_nodes(concepts), "edges": []}
+    pending = {asyncio.ensure_future(_author_async(n, concepts, window, deadline)): i for i, n in enumerate(names)}
+    parts = [None] * len(names)
+
+    def emit(i, hit):
+        with span("assemble"):
+            a_nodes, a_edges, parts[i] = author_fragment(*(hit or (unresolved(names[i]), [])), concepts)
+        return {"event": "author", "index": i, "nodes": a_nodes, "edges": a_edges}
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, timeout=remaining(deadline), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for t in sorted(done, key=pending.get):
+                i = pending.pop(t)
+                yield emit(i, t.result() if t.exception() is None else None)
+    finally:
+        for t in pending:
+            t.cancel()
+    for t, i in sorted(pending.items(), key=lambda kv: kv[1]):
+        yield emit(i, None)
+    yield {"event": "summary", "authors": len(names), "refs": _merge_refs(concepts, parts)}
@@ -1,23 +1,243 @@
+import glob
+import hashlib
 import json
+import logging
+import marshal
 import os
-import functools
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+from .telemetry import traced
+
+log = logging.getLogger(__name__)
 
 CATALOG_PATH = os.getenv("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+MIN_SCORE = float(os.getenv("SCHOLAR_MIN_SCORE", "0.5"))
+GIVEN_NAME_PENALTY = 0.5  # same surname, different given name: "Paul Smith" is not Daniel W. Smith
+POLL_SECONDS = float(os.getenv("SCHOLAR_CATALOG_POLL", "5"))
+SNAPSHOT_DIR = os.getenv("SCHOLAR_SNAPSHOT_DIR", "data/cache")
+SNAPSHOT_FORMAT = 2
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip diacritics and punctuation, and turn "Last, First" into "first last"."""
+    s = unicodedata.normalize("NFKD", name or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+    if "," in s:
+        last, _, first = s.partition(",")
+        s = f"{first} {last}"
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", s)).strip()
+
+
+def given_name_conflict(q_words, key_words) -> bool:
+    """Same surname but given names that are neither equal nor an initial/prefix of each other."""
+    if len(q_words) < 2 or len(key_words) < 2 or q_words[-1] != key_words[-1]:
+        return False
+    a, b = q_words[0], key_words[0]
+    return not (a.startswith(b) or b.startswith(a))
+
+
+def trigrams(s: str) -> set:
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class CatalogIndex:
+    """Exact name/alias dict plus token and trigram postings for ranked fuzzy lookup."""
+
+    def __init__(self, scholars, state=None):
+        self.scholars = scholars
+        if state is not None:
+            self.exact, self.orcids, self.keys, self.tokens, self.grams = state
+            return
+        self.exact = {}
+        self.orcids = {s["orcid"]: pos for pos, s in enumerate(scholars) if s.get("orcid")}
+        self.keys = []  # (normalized key, scholar position, trigram count)
+        self.tokens = defaultdict(set)
+        self.grams = defaultdict(set)
+        for pos, s in enumerate(scholars):
+            for label in [s["name"], *s.get("aliases", [])]:
+                key = normalize_name(label)
+                if not key:
+                    continue
+                self.exact.setdefault(key, pos)
+                self.exact.setdefault(key.replace(" ", ""), pos)
+                k = len(self.keys)
+                grams = trigrams(key)
+                self.keys.append((key, pos, len(grams)))
+                for t in set(key.split()):
+                    self.tokens[t].add(k)
+                for g in grams:
+                    self.grams[g].add(k)
+
+    def state(self):
+        return self.exact, self.orcids, self.keys, dict(self.tokens), dict(self.grams)
+
+    def search(self, name: str, limit: int = 5):
+        """Ranked ``[(scholar, score)]`` with score in (0, 1]; exact hits score 1.0."""
+        q = normalize_name(name)
+        if not q:
+            return []
+        pos = self.exact.get(q, self.exact.get(q.replace(" ", "")))
+        if pos is not None:
+            return [(self.scholars[pos], 1.0)]
+        q_words = q.split()
+        q_tokens = set(q_words)
+        q_grams = trigrams(q)
+        # postings give shared-token and shared-trigram counts without touching other keys
+        shared_tokens = Counter()
+        shared_grams = Counter()
+        for t in q_tokens:
+            shared_tokens.update(self.tokens.get(t, ()))
+        for g in q_grams:
+            shared_grams.update(self.grams.get(g, ()))
+        best = {}
+        for k, common in shared_grams.items():
+            key, pos, n_grams = self.keys[k]
+            dice = 2 * common / (len(q_grams) + n_grams)
+            cover = shared_tokens[k] / len(q_tokens)
+            score = 0.5 * dice + 0.5 * cover
+            if given_name_conflict(q_words, key.split()):
+                score *= GIVEN_NAME_PENALTY
+            score = round(score, 3)
+            if score > best.get(pos, 0.0):
+                best[pos] = score
+        ranked = sorted(best.items(), key=lambda kv: (-kv[1], self.scholars[kv[0]]["name"]))
+        return [(self.scholars[p], s) for p, s in ranked[:limit]]
+
+
+class CatalogStore:
+    """Current catalog snapshot, rebuilt off the request path when the file changes.
+
+    A watcher thread polls the file's mtime/size every ``poll`` seconds and
+    compares a content hash before rebuilding, then swaps the new
+    ``(version, scholars, index)`` tuple in with a single assignment.
+    Compiled indexes are written to ``SNAPSHOT_DIR`` keyed by that hash, so
+    only the first worker to see a given catalog parses and indexes it; the
+    others unmarshal the snapshot instead, which is much faster. Each worker
+    still holds its own copy in memory.
+    """
+
+    def __init__(self, path=CATALOG_PATH, poll=POLL_SECONDS, snapshot_dir=SNAPSHOT_DIR):
+        self.path = path
+        self.poll = poll
+        self.snapshot_dir = snapshot_dir
+        self.snapshot = None
+        self.signature = None
+        self.lock = threading.Lock()
+        self.watcher = None
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def _snapshot_path(self, version):
+        return os.path.join(self.snapshot_dir, f"catalog-{version}.marshal")
+
+    def _load_snapshot(self, version):
+        try:
+            with open(self._snapshot_path(version), "rb") as f:
+                fmt, scholars, state = marshal.load(f)
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        if fmt != SNAPSHOT_FORMAT:
+            return None
+        return scholars, CatalogIndex(scholars, state)
+
+    def _write_snapshot(self, version, scholars, index):
+        if not self.snapshot_dir:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            target = self._snapshot_path(version)
+            tmp = f"{target}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump((SNAPSHOT_FORMAT, scholars, index.state()), f)
+            os.replace(tmp, target)
+            for old in glob.glob(os.path.join(self.snapshot_dir, "catalog-*.marshal")):
+                if old != target:
+                    os.remove(old)
+        except OSError as e:
+            log.warning("could not write catalog snapshot: %s", e)
+
+    def reload(self):
+        """Re-read the catalog if its content changed; returns True when swapped."""
+        with self.lock:
+            signature = self._stat()
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            version = hashlib.sha1(raw).hexdigest()[:16]
+            self.signature = signature
+            if self.snapshot and self.snapshot[0] == version:
+                return False
+            loaded = self._load_snapshot(version) if self.snapshot_dir else None
+            if loaded is None:
+                scholars = json.loads(raw)
+                index = CatalogIndex(scholars)
+                self._write_snapshot(version, scholars, index)
+            else:
+                scholars, index = loaded
+            self.snapshot = (version, scholars, index)
+            return True
+
+    def check(self):
+        try:
+            if self._stat() != self.signature:
+                if self.reload():
+                    log.info("catalog reloaded: %s", self.snapshot[0])
+        except (OSError, ValueError) as e:
+            log.warning("catalog reload failed, keeping %s: %s", self.snapshot and self.snapshot[0], e)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll)
+            self.check()
+
+    def current(self):
+        if self.snapshot is None:
+            self.reload()
+        if self.watcher is None and self.poll > 0:
+            with self.lock:
+                if self.watcher is None:
+                    self.watcher = threading.Thread(target=self._watch, name="know-catalog", daemon=True)
+                    self.watcher.start()
+        return self.snapshot
+
+
+_store = CatalogStore()
+
+
+def catalog_version() -> str:
+    return _store.current()[0]
 
 
-@functools.lru_cache(maxsize=1)
 def load_scholar_catalog():
-    with open(CATALOG_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _store.current()[1]
+
+
+def catalog_index() -> CatalogIndex:
+    return _store.current()[2]
+
+
+@traced("catalog")
+def match_scholar(name: str):
+    """Best catalog match for ``name`` as ``(scholar, score)``, or ``(None, 0.0)``."""
+    hits = catalog_index().search(name, limit=1)
+    if hits and hits[0][1] >= MIN_SCORE:
+        return hits[0]
+    return None, 0.0
 
 
 def find_scholar(name: str):
-    cat = load_scholar_catalog()
-    q = name.lower().strip()
-    for s in cat:
-        if s["name"].lower() == q or any(q == a.lower() for a in s.get("aliases", [])):
-            return s
-    for s in cat:
-        if q in s["name"].lower():
-            return s
-    return None
+    return match_scholar(name)[0]
+
+
+def find_scholar_by_orcid(orcid: str):
+    pos = catalog_index().orcids.get(orcid)
+    return None if pos is None else load_scholar_catalog()[pos]
@@ -0,0 +1,130 @@
+"""Concept tagger: one Aho–Corasick pass per work over title, abstract and keywords.
+
+Built once from the site's concept lists and each group's ``defaultConcepts``.
+Every alias, multilingual label and plural variant compiles into a single
+automaton over word-padded, diacritic-free text, so "Assemblages",
+"agencement" and "Déterritorialisation" all land on their concept ids.
+An alias ending in ``*`` matches as a word prefix ("deterritoriali*").
+"""
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+from .groups import load_groups
+from .intent import KeywordAutomaton
+
+CONCEPTS_PATHS = [
+    os.getenv("KNOW_CONCEPTS_PATH", "site/public/data/concepts.json"),
+    "site/public/concepts/concepts.json",
+]
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip diacritics, and collapse everything but word characters to single spaces."""
+    text = text or ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def plurals(phrase: str):
+    head, _, last = phrase.rpartition(" ")
+    head = f"{head} " if head else ""
+    if last.endswith("y") and last[-2:-1] not in "aeiou":
+        yield f"{head}{last[:-1]}ies"
+    elif last.endswith(("s", "x", "z", "ch", "sh")):
+        yield f"{head}{last}es"
+    else:
+        yield f"{head}{last}s"
+
+
+def load_concepts(paths=CONCEPTS_PATHS, groups=None):
+    """``{concept id: [alias, ...]}`` merged from the concept files and group concept lists."""
+    concepts = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for c in data.get("concepts", []) if isinstance(data, dict) else data:
+            if isinstance(c, str):
+                c = {"id": c}
+            cid = c.get("id")
+            if not cid:
+                continue
+            names = concepts.setdefault(cid, [])
+            names += [cid, c.get("label") or ""] + list(c.get("aliases", [])) + list((c.get("labels") or {}).values())
+    groups = load_groups() if groups is None else groups
+    for g in groups.values():
+        for name in g.get("defaultConcepts", []):
+            concepts.setdefault(name, [name])
+    return concepts
+
+
+class ConceptTagger:
+    def __init__(self, concepts):
+        self.ids = {}
+        keywords = {}
+        for cid, names in concepts.items():
+            for name in names:
+                prefix = name.endswith("*")
+                norm = normalize(name.rstrip("*"))
+                if not norm:
+                    continue
+                if prefix:
+                    keywords[f" {norm}"] = cid
+                    continue
+                for form in [norm, *plurals(norm)]:
+                    self.ids.setdefault(form, cid)
+                    keywords[f" {form} "] = cid
+        # a concept named by a group ("war machine") folds into the site id it aliases ("war-machine")
+        for cid in list(concepts):
+            self.ids.setdefault(normalize(cid), cid)
+        self.canonical = {cid: self.ids.get(normalize(cid), cid) for cid in concepts}
+        self.automaton = KeywordAutomaton((k, self.canonical[v]) for k, v in keywords.items())
+
+    def resolve(self, name):
+        """Concept id for a user-supplied concept name, or the name itself when unknown."""
+        norm = normalize(name)
+        if norm in self.ids:
+            return self.canonical.get(self.ids[norm], self.ids[norm])
+        found = self.find(name)
+        return found[0] if len(found) == 1 else name
+
+    def find(self, text):
+        """Concept ids in order of first mention."""
+        hits = sorted((start, cid) for start, _, cid in self.automaton.scan(f" {normalize(text)} "))
+        return list(dict.fromkeys(cid for _, cid in hits))
+
+    def tag(self, *texts):
+        """Sorted concept ids found anywhere in ``texts`` (title, abstract, keywords...)."""
+        padded = " " + " | ".join(normalize(t) for t in texts if t) + " "
+        return sorted(self.automaton.values(padded))
+
+
+@lru_cache(maxsize=1)
+def tagger() -> ConceptTagger:
+    return ConceptTagger(load_concepts())
+
+
+def tag_work(title, abstract=None, keywords=()):
+    return tagger().tag(title, abstract, *keywords)
+
+
+def work_concepts(work):
+    """Tags stored on a work by its adapter, or computed from the title for rows cached before tagging."""
+    tags = work.get("concepts")
+    return tags if tags is not None else tag_work(work.get("title"))
+
+
+def abstract_text(inverted_index):
+    """Rebuild OpenAlex's ``abstract_inverted_index`` into plain text."""
+    if not inverted_index:
+        return None
+    words = sorted((pos, word) for word, positions in inverted_index.items() for pos in positions)
+    return " ".join(word for _, word in words)
@@ -0,0 +1,201 @@
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+
+from .telemetry import traced
+
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.I)
+_ISBN_CHARS = re.compile(r"[^0-9X]")
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+_ORDINAL = re.compile(r"^(\d+)(?:st|nd|rd|th)?$")
+_ROMAN = re.compile(r"^[ivxl]+$")
+
+BOOK_TYPES = {"book", "edited-book", "monograph", "authored-book"}
+BIN_BITS = 5
+NUM_BINS = 1 << BIN_BITS  # sketch size
+BANDS = 8
+THRESHOLD = 0.8
+MAX_CANDIDATES = 200  # bounds the worst case when many titles share buckets
+_EMPTY = 1 << 32
+# titles that differ only in these are different works: "Volume 1"/"Volume 2", "2nd edition"
+SEQUENCE_WORDS = {"volume", "vol", "part", "pt", "book", "no", "number", "issue", "edition", "ed", "series"}
+EDITION_WORDS = {"revised", "expanded", "abridged", "unabridged"}
+NUMBER_WORDS = {w: str(i) for i, w in enumerate(
+    ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"])}
+NUMBER_WORDS.update({w: str(i) for i, w in enumerate(
+    ["first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth"], 1)})
+ROMAN = {"i": 1, "v": 5, "x": 10, "l": 50}
+
+
+def normalize_doi(doi) -> str:
+    return _DOI_PREFIX.sub("", (doi or "").strip()).strip().lower()
+
+
+def normalize_isbn(isbn) -> str:
+    """ISBN-13 digits for an ISBN-10 or ISBN-13, or "" when it is not one."""
+    s = _ISBN_CHARS.sub("", (isbn or "").upper())
+    if len(s) == 10:
+        if not s[:9].isdigit() or not (s[9].isdigit() or s[9] == "X"):
+            return ""
+        core = "978" + s[:9]
+        check = (10 - sum(int(c) * (3 if i % 2 else 1) for i, c in enumerate(core)) % 10) % 10
+        return core + str(check)
+    return s if len(s) == 13 and s.isdigit() else ""
+
+
+def norm_title(t) -> str:
+    t = t or ""
+    if not t.isascii():
+        t = unicodedata.normalize("NFKD", t)
+        t = "".join(ch for ch in t if not unicodedata.combining(ch))
+    return _SPACES.sub(" ", _NON_WORD.sub("", t.lower())).strip()
+
+
+def work_keys(row, title=None) -> list[str]:
+    """Every exact identity of a work, strongest first: DOI, book ISBN, title+year."""
+    keys = []
+    doi = normalize_doi(row.get("doi"))
+    if doi:
+        keys.append("doi:" + doi)
+    # chapters carry their book's ISBN, so only books are keyed by it
+    if (row.get("type") or "").lower() in BOOK_TYPES:
+        isbn = normalize_isbn(row.get("isbn"))
+        if isbn:
+            keys.append("isbn:" + isbn)
+    title = norm_title(row.get("title")) if title is None else title
+    if title:
+        keys.append(f"ty:{title}|{row.get('year') or ''}")
+    return keys
+
+
+def work_key(row) -> str:
+    keys = work_keys(row)
+    return keys[0] if keys else "ty:|"
+
+
+def _shingles(title):
+    s = f" {title} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _minhash(shingles):
+    # one-permutation MinHash: a single hash per shingle, min kept per bin
+    mins = [_EMPTY] * NUM_BINS
+    for s in shingles:
+        h = zlib.crc32(s.encode())
+        b = h & (NUM_BINS - 1)
+        v = h >> BIN_BITS
+        if v < mins[b]:
+            mins[b] = v
+    return mins
+
+
+def _roman(s):
+    total = 0
+    for a, b in zip(s, s[1:] + " "):
+        v = ROMAN[a]
+        total += -v if ROMAN.get(b, 0) > v else v
+    return str(total)
+
+
+def _markers(title):
+    """Numbers and edition words in a normalized title; a fuzzy match must agree on them."""
+    out = set()
+    words = title.split()
+    for prev, w, nxt in zip([""] + words, words, words[1:] + [""]):
+        m = _ORDINAL.match(w)
+        if m:
+            out.add(m.group(1).lstrip("0") or "0")
+        elif w in NUMBER_WORDS and (prev in SEQUENCE_WORDS or nxt in SEQUENCE_WORDS):
+            out.add(NUMBER_WORDS[w])  # "volume two", "second edition"
+        elif prev in SEQUENCE_WORDS and _ROMAN.match(w):
+            out.add(_roman(w))
+        elif w in EDITION_WORDS:
+            out.add(w)
+    return frozenset(out)
+
+
+def _year(row):
+    try:
+        return int(str(row.get("year") or "")[:4])
+    except ValueError:
+        return None
+
+
+class Deduper:
+    """Streaming duplicate detector: exact canonical keys, then MinHash/LSH on titles.
+
+    Each row is checked against every exact key seen so far and, when
+    ``fuzzy`` is on, against titles sharing an LSH band bucket. Candidates are
+    confirmed with true trigram Jaccard >= ``threshold``, compatible years and
+    the same volume/part/edition numbers, so the cost stays near-linear in the
+    number of rows.
+    """
+
+    def __init__(self, fuzzy=True, threshold=THRESHOLD, bands=BANDS):
+        self.fuzzy = fuzzy
+        self.threshold = threshold
+        self.bands = bands
+        self.rows_per_band = NUM_BINS // bands
+        self.exact = {}
+        self.buckets = defaultdict(list)
+        self.titles = []  # per cluster: (shingles, year, markers)
+
+    def add(self, row):
+        """Return ``(cluster_id, is_new)`` for ``row``."""
+        title = norm_title(row.get("title"))
+        keys = work_keys(row, title)
+        for k in keys:
+            if k in self.exact:
+                cid = self.exact[k]
+                for other in keys:
+                    self.exact.setdefault(other, cid)
+                return cid, False
+        shingles = _shingles(title) if title else set()
+        year = _year(row)
+        markers = _markers(title)
+        bands = []
+        if self.fuzzy and len(shingles) > 3:
+            sig = _minhash(shingles)
+            r = self.rows_per_band
+            bands = [(b, tuple(sig[b * r:(b + 1) * r])) for b in range(self.bands)]
+            # a band of empty bins says nothing about similarity
+            bands = [band for band in bands if any(v != _EMPTY for v in band[1])]
+            candidates = {}
+            for band in bands:
+                for cid in self.buckets.get(band, ())[-MAX_CANDIDATES:]:
+                    candidates.setdefault(cid, None)
+                if len(candidates) >= MAX_CANDIDATES:
+                    break
+            for cid in candidates:
+                other, oyear, omarkers = self.titles[cid]
+                if year is not None and oyear is not None and abs(year - oyear) > 1:
+                    continue
+                if markers != omarkers:
+                    continue
+                if len(shingles & other) / len(shingles | other) >= self.threshold:
+                    for k in keys:
+                        self.exact.setdefault(k, cid)
+                    return cid, False
+        cid = len(self.titles)
+        self.titles.append((shingles, year, markers))
+        for k in keys:
+            self.exact[k] = cid
+        for band in bands:
+            self.buckets[band].append(cid)
+        return cid, True
+
+
+@traced("dedupe")
+def dedupe(rows, limit=None, fuzzy=True):
+    """First occurrence of each distinct work, in input order."""
+    d = Deduper(fuzzy=fuzzy)
+    out = []
+    for r in rows:
+        if d.add(r)[1]:
+            out.append(r)
+            if limit is not None and len(out) >= limit:
+                break
+    return out
@@ -0,0 +1,123 @@
+"""Async twin of ``http``: the same per-host limits, retries and metrics on an event loop.
+
+The rate limit and connection cap are shared with the sync client, not
+copied, and attempts shrink their timeouts to the ``gather_async`` deadline.
+
+Uses httpx when installed; without it each call runs the blocking client on
+a worker thread, so async callers keep working (just without multiplexing).
+"""
+import asyncio
+import contextlib
+import random
+import time
+from urllib.parse import urlsplit
+
+from . import http
+from ..fanout import current_deadline, remaining
+from .http import LIMITS, DEFAULT_LIMIT, RETRY_STATUS, USER_AGENT, UpstreamError
+
+try:
+    import httpx
+except Exception:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+SLOT_POLL = 0.01
+
+
+async def take(bucket, deadline=None):
+    """``TokenBucket.take`` for the event loop: the host's one bucket, awaited instead of slept on."""
+    while True:
+        wait = bucket.reserve()
+        if not wait:
+            return True
+        if deadline is not None and remaining(deadline) < wait:
+            return False
+        await asyncio.sleep(wait)
+
+
+@contextlib.asynccontextmanager
+async def slot(slots):
+    # the connection cap is the sync client's threading semaphore; polling it keeps the loop free
+    while not slots.acquire(blocking=False):
+        await asyncio.sleep(SLOT_POLL)
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+class AsyncHostClient:
+    """One pooled httpx client per host and event loop.
+
+    Rate limit, connection cap and metrics are the sync client's, so a host
+    sees one budget however the calls reach it.
+    """
+
+    def __init__(self, host, concurrency, retries=None):
+        self.host = host
+        self.retries = http.RETRIES if retries is None else retries
+        self.stats = http.client(host)
+        self.bucket = self.stats.bucket
+        self.slots = self.stats.slots
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        self.session = httpx.AsyncClient(headers={"User-Agent": USER_AGENT}, limits=limits)
+
+    async def get_json(self, url, params=None, headers=None, timeout=5):
+        deadline = current_deadline()
+        for attempt in range(self.retries + 1):
+            throttled = not await take(self.bucket, deadline)
+            left = remaining(deadline)
+            if throttled or (left is not None and left <= 0):
+                raise UpstreamError(self.host, reason="request deadline passed")
+            r = err = None
+            async with slot(self.slots):
+                t0 = time.perf_counter()
+                try:
+                    r = await self.session.get(url, params=params, headers=headers,
+                                               timeout=timeout if left is None else min(timeout, left))
+                except httpx.HTTPError as e:
+                    err = e
+                self.stats._record(r.status_code if r is not None else None, time.perf_counter() - t0)
+            if r is not None and r.status_code not in RETRY_STATUS:
+                if not r.is_success:
+                    raise UpstreamError(self.host, r.status_code)
+                return r.json()
+            if attempt == self.retries:
+                break
+            delay = self._delay(attempt, r)
+            if deadline is not None and remaining(deadline) <= delay:
+                break
+            with self.stats.lock:
+                self.stats.retried += 1
+            await asyncio.sleep(delay)
+        if r is not None:
+            raise UpstreamError(self.host, r.status_code)
+        raise UpstreamError(self.host, reason=str(err))
+
+    def _delay(self, attempt, r):
+        after = r.headers.get("Retry-After") if r is not None else None
+        if after and after.isdigit():
+            return min(http.MAX_BACKOFF, float(after))
+        return random.uniform(0, min(http.MAX_BACKOFF, http.BACKOFF * 2 ** attempt))
+
+
+_clients = {}
+
+
+def client(url: str) -> AsyncHostClient:
+    host = urlsplit(url).netloc or url
+    loop = asyncio.get_running_loop()
+    c = _clients.get((loop, host))
+    if c is None:
+        # clients (and their connection pools) are bound to the loop that made them
+        for key in [k for k in _clients if k[0].is_closed()]:
+            del _clients[key]
+        c = _clients[(loop, host)] = AsyncHostClient(host, LIMITS.get(host, DEFAULT_LIMIT)[2])
+    return c
+
+
+async def get_json(url, **kw):
+    if httpx is None:
+        return await asyncio.to_thread(http.get_json, url, **kw)
+    return await client(url).get_json(url, **kw)
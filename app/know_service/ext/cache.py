@@ -0,0 +1,254 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from ..fanout import upstream as refresh_pool
+from .singleflight import flights, process_lock
+
+log = logging.getLogger(__name__)
+
+CACHE_PATH = os.getenv("KNOW_CACHE_PATH", "data/cache/upstream.sqlite3")
+MAX_ENTRIES = int(os.getenv("KNOW_CACHE_MAX_ENTRIES", "50000"))
+DAY = 86400
+
+# source -> (ttl, stale-while-revalidate window, negative ttl) in seconds
+TTLS = {
+    "orcid": (3 * DAY, 7 * DAY, 7 * DAY),
+    "openalex": (2 * DAY, 7 * DAY, 3 * DAY),
+    "crossref": (2 * DAY, 7 * DAY, 3 * DAY),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    value TEXT NOT NULL,
+    negative INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed);
+CREATE INDEX IF NOT EXISTS entries_stale_until ON entries(stale_until);
+"""
+
+
+def normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [normalize(v) for v in value]
+        return sorted(items, key=json.dumps) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    return value
+
+
+def make_key(name, args, kwargs):
+    return name + ":" + json.dumps([normalize(args), normalize(kwargs)], sort_keys=True, default=str)
+
+
+class UpstreamCache:
+    """SQLite-backed response cache shared by every worker pointing at ``path``."""
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db.executescript(SCHEMA)
+
+    @property
+    def db(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get(self, key, count=True):
+        """Return ``(value, state)`` with state ``fresh``, ``stale`` or ``None`` (miss)."""
+        row = self.db.execute("SELECT value, expires, stale_until, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or now >= row[2]:
+            self.misses += count
+            return None, None
+        value, expires, _, accessed = row
+        if now - accessed > 60:
+            self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        if now < expires:
+            self.hits += count
+            return json.loads(value), "fresh"
+        self.stale_hits += count
+        return json.loads(value), "stale"
+
+    def put(self, key, source, value, ttl, negative=False, stale=0):
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (key, source, value, negative, expires, stale_until, accessed)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, source, json.dumps(value), int(negative), now + ttl, now + ttl + stale, now),
+        )
+        with self.lock:
+            self.writes += 1
+            sweep = self.writes % 100 == 0
+        if sweep:
+            self.evict()
+
+    def evict(self):
+        # entries past their stale window are useless; drop them with the LRU tail
+        self.db.execute("DELETE FROM entries WHERE stale_until < ?", (time.time(),))
+        (count,) = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            self.db.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self):
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+
+_store = None
+_store_lock = threading.Lock()
+_refreshing = set()
+_tasks = set()  # background refreshes on the event loop, held so they are not collected
+
+
+def store():
+    global _store
+    if _store is None and CACHE_PATH:
+        with _store_lock:
+            if _store is None:
+                _store = UpstreamCache(CACHE_PATH)
+    return _store
+
+
+def _refresh(fn, key, source, ttl, neg_ttl, stale, is_miss, args, kwargs):
+    try:
+        value = fn(*args, **kwargs)
+        miss = is_miss(value)
+        store().put(key, source, value, neg_ttl if miss else ttl, miss, stale)
+    except Exception as e:
+        log.warning("background refresh of %s failed: %s", key, e)
+    finally:
+        with _store_lock:
+            _refreshing.discard(key)
+
+
+async def _refresh_async(fn, key, source, ttl, neg_ttl, stale, is_miss, args, kwargs):
+    try:
+        value = await fn(*args, **kwargs)
+        miss = is_miss(value)
+        await asyncio.to_thread(store().put, key, source, value, neg_ttl if miss else ttl, miss, stale)
+    except Exception as e:
+        log.warning("background refresh of %s failed: %s", key, e)
+    finally:
+        with _store_lock:
+            _refreshing.discard(key)
+
+
+def _cached_async(fn, name, source, ttl, stale, neg_ttl, is_miss):
+    # sqlite reads and writes block (busy timeout, WAL fsync), so they run on a
+    # worker thread and the event loop keeps serving other calls meanwhile
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        cache = store()
+        key = make_key(name, args, kwargs)
+        if cache is None:
+            return await flights.do_async(key, fn, *args, **kwargs)
+        value, state = await asyncio.to_thread(cache.get, key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            with _store_lock:
+                start = key not in _refreshing
+                _refreshing.add(key)
+            if start:
+                task = asyncio.ensure_future(
+                    _refresh_async(fn, key, source, ttl, neg_ttl, stale, is_miss, args, kwargs))
+                _tasks.add(task)
+                task.add_done_callback(_tasks.discard)
+            return value
+        return await flights.do_async(key, _fill_async, cache, fn, key, source, ttl, neg_ttl, stale, is_miss,
+                                      args, kwargs)
+
+    wrapper.uncached = fn
+    return wrapper
+
+
+def _fill(cache, fn, key, source, ttl, neg_ttl, stale, is_miss, args, kwargs):
+    """Run a missed call and store its result; ``flights`` makes this once per key at a time."""
+    with process_lock(key):
+        # a flight that just landed (here or in another worker) has already filled the entry
+        value, state = cache.get(key, count=False)
+        if state == "fresh":
+            return value
+        value = fn(*args, **kwargs)
+        miss = is_miss(value)
+        cache.put(key, source, value, neg_ttl if miss else ttl, miss, stale)
+        return value
+
+
+async def _fill_async(cache, fn, key, source, ttl, neg_ttl, stale, is_miss, args, kwargs):
+    value, state = await asyncio.to_thread(cache.get, key, count=False)
+    if state == "fresh":
+        return value
+    value = await fn(*args, **kwargs)
+    miss = is_miss(value)
+    await asyncio.to_thread(cache.put, key, source, value, neg_ttl if miss else ttl, miss, stale)
+    return value
+
+
+def cached(source, is_miss=lambda v: not v):
+    """Cache an adapter's result under its normalized arguments.
+
+    Fresh hits return immediately; stale hits return immediately and refresh
+    in the background. Empty results are cached for the source's negative TTL.
+    Exceptions are never cached, so wrap this inside ``upstream()``.
+
+    An ``async def`` twin named ``<adapter>_async`` shares its adapter's entries.
+    """
+    ttl, stale, neg_ttl = TTLS[source]
+
+    def deco(fn):
+        name = f"{source}:{fn.__name__.removesuffix('_async')}"
+        if inspect.iscoroutinefunction(fn):
+            return _cached_async(fn, name, source, ttl, stale, neg_ttl, is_miss)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = store()
+            key = make_key(name, args, kwargs)
+            if cache is None:
+                return flights.do(key, fn, *args, **kwargs)
+            value, state = cache.get(key)
+            if state == "fresh":
+                return value
+            if state == "stale":
+                with _store_lock:
+                    start = key not in _refreshing
+                    _refreshing.add(key)
+                if start:
+                    refresh_pool.submit(_refresh, fn, key, source, ttl, neg_ttl, stale, is_miss, args, kwargs)
+                return value
+            # concurrent misses on one key share a single upstream call
+            return flights.do(key, _fill, cache, fn, key, source, ttl, neg_ttl, stale, is_miss, args, kwargs)
+
+        wrapper.uncached = fn
+        return wrapper
+    return deco
@@ -1,34 +1,86 @@
 import os
+from itertools import islice
 
-try:
-    import requests
-except Exception:  # pragma: no cover
-    requests = None
+from ..concepts import tag_work
+from . import ahttp
+from .cache import cached
+from .http import get_json, upstream
 
 CROSSREF_BASE = os.getenv("CROSSREF_BASE", "https://api.crossref.org")
+MAX_ROWS = 1000
+WORK_FIELDS = "DOI,title,issued,URL,abstract,subject"
 
 
-def crossref_search(name: str, concepts, window=None):
-    try:
-        if not requests:
-            return []
-        query = name
-        if concepts:
-            query += " " + " ".join(concepts)
-        r = requests.get(f"{CROSSREF_BASE}/works", params={"query": query, "rows": 5}, timeout=5)
-        if r.ok:
-            data = r.json()
-            out = []
-            for item in data.get("message", {}).get("items", []):
-                title = item.get("title", [""])[0]
-                year = None
-                parts = item.get("issued", {}).get("date-parts", [[None]])[0]
-                if parts:
-                    year = parts[0]
-                doi = item.get("DOI")
-                url = item.get("URL")
-                out.append({"title": title, "year": year, "doi": doi, "url": url})
-            return out
-    except Exception:
-        pass
-    return []
+def date_filter(window):
+    if not window:
+        return None
+    lo, hi = window
+    parts = []
+    if lo is not None:
+        parts.append(f"from-pub-date:{lo}")
+    if hi is not None:
+        parts.append(f"until-pub-date:{hi}")
+    return ",".join(parts)
+
+
+def _works_params(name, concepts, window, rows, select):
+    params = {"query.author": name, "rows": rows, "cursor": "*"}
+    if select:
+        params["select"] = select
+    if concepts:
+        params["query.bibliographic"] = " ".join(concepts)
+    if window:
+        params["filter"] = date_filter(window)
+    return params
+
+
+def _page(data):
+    """``(rows, next_cursor)`` for one page of /works; cursor is None on the last page."""
+    message = data.get("message", {})
+    items = message.get("items") or []
+    rows = []
+    for item in items:
+        title = (item.get("title") or [""])[0]
+        year = None
+        parts = item.get("issued", {}).get("date-parts", [[None]])[0]
+        if parts:
+            year = parts[0]
+        concepts = tag_work(title, item.get("abstract"), item.get("subject") or [])
+        rows.append({"title": title, "year": year, "doi": item.get("DOI"), "url": item.get("URL"), "concepts": concepts})
+    return rows, message.get("next-cursor") if items else None
+
+
+def iter_crossref_works(name: str, concepts=None, window=None, rows=MAX_ROWS, select=WORK_FIELDS):
+    """Yield matching works with Crossref deep paging (``cursor``).
+
+    Stop iterating to stop fetching; drain it for bulk exports.
+    """
+    params = _works_params(name, concepts, window, rows, select)
+    while True:
+        page, cursor = _page(get_json(f"{CROSSREF_BASE}/works", params=params))
+        yield from page
+        if not cursor:
+            return
+        params["cursor"] = cursor
+
+
+@upstream([])
+@cached("crossref")
+def crossref_search(name: str, concepts, window=None, limit=5):
+    rows = min(MAX_ROWS, limit) if limit else MAX_ROWS
+    return list(islice(iter_crossref_works(name, concepts, window, rows), limit))
+
+
+@upstream([])
+@cached("crossref")
+async def crossref_search_async(name: str, concepts, window=None, limit=5):
+    rows = min(MAX_ROWS, limit) if limit else MAX_ROWS
+    params = _works_params(name, concepts, window, rows, WORK_FIELDS)
+    out = []
+    while not limit or len(out) < limit:
+        page, cursor = _page(await ahttp.get_json(f"{CROSSREF_BASE}/works", params=params))
+        out += page
+        if not cursor:
+            break
+        params["cursor"] = cursor
+    return out[:limit] if limit else out
@@ -0,0 +1,233 @@
+import copy
+import functools
+import inspect
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from ..fanout import current_deadline, remaining
+from ..telemetry import ADAPTER_FAILURES, ENABLED, note_failure, observe_upstream, span
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except Exception:  # pragma: no cover - fallback when requests unavailable
+    requests = None
+
+log = logging.getLogger(__name__)
+
+RETRIES = int(os.getenv("KNOW_HTTP_RETRIES", "3"))
+BACKOFF = float(os.getenv("KNOW_HTTP_BACKOFF", "0.5"))
+MAX_BACKOFF = float(os.getenv("KNOW_HTTP_MAX_BACKOFF", "8"))
+CONTACT = os.getenv("KNOW_CONTACT_EMAIL", "")
+USER_AGENT = "IanBuchananVault/1.0" + (f" (mailto:{CONTACT})" if CONTACT else "")
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# host -> (requests/second, burst, max concurrent connections), per each API's published limits
+LIMITS = {
+    "pub.orcid.org": (24, 40, 8),       # ORCID public API: 24 req/s, burst 40
+    "api.openalex.org": (10, 10, 5),    # OpenAlex: 10 req/s
+    "api.crossref.org": (10, 10, 3),    # Crossref polite pool: 10 req/s, 3 concurrent
+}
+DEFAULT_LIMIT = (10, 10, 4)
+
+
+class UpstreamError(Exception):
+    def __init__(self, host, status=None, reason=""):
+        self.host = host
+        self.status = status
+        super().__init__(f"{host}: {status or reason}")
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return 0, or return how long until one is due without taking it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def take(self, deadline=None):
+        """Wait for a token; False, without waiting, when one would not come before ``deadline``."""
+        while True:
+            wait = self.reserve()
+            if not wait:
+                return True
+            if deadline is not None and remaining(deadline) < wait:
+                return False
+            time.sleep(wait)
+
+
+class HostClient:
+    """Keep-alive session for one upstream host with rate limit, retries and metrics."""
+
+    def __init__(self, host, rate, burst, concurrency, retries=RETRIES):
+        self.host = host
+        self.retries = retries
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.session = None
+        if requests:
+            self.session = requests.Session()
+            self.session.headers["User-Agent"] = USER_AGENT
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, pool_block=True)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.retried = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.statuses = Counter()
+
+    def _record(self, status, elapsed):
+        observe_upstream(self.host, status, elapsed)
+        with self.lock:
+            self.calls += 1
+            self.latency_sum += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            if status is None:
+                self.errors += 1
+            else:
+                self.statuses[status] += 1
+
+    def _delay(self, attempt, r):
+        after = r.headers.get("Retry-After") if r is not None else None
+        if after and after.isdigit():
+            return min(MAX_BACKOFF, float(after))
+        # full jitter: uniform over the exponential window
+        return random.uniform(0, min(MAX_BACKOFF, BACKOFF * 2 ** attempt))
+
+    def get(self, url, params=None, headers=None, timeout=5):
+        if self.session is None:
+            raise UpstreamError(self.host, reason="requests not installed")
+        deadline = current_deadline()
+        for attempt in range(self.retries + 1):
+            throttled = not self.bucket.take(deadline)
+            left = remaining(deadline)
+            if throttled or (left is not None and left <= 0):
+                raise UpstreamError(self.host, reason="request deadline passed")
+            r = err = None
+            with self.slots:
+                t0 = time.perf_counter()
+                try:
+                    r = self.session.get(url, params=params, headers=headers,
+                                         timeout=timeout if left is None else min(timeout, left))
+                except requests.RequestException as e:
+                    err = e
+                self._record(r.status_code if r is not None else None, time.perf_counter() - t0)
+            if r is not None and r.status_code not in RETRY_STATUS:
+                return r
+            if attempt == self.retries:
+                break
+            delay = self._delay(attempt, r)
+            if deadline is not None and remaining(deadline) <= delay:
+                break
+            with self.lock:
+                self.retried += 1
+            time.sleep(delay)
+        if r is not None:
+            raise UpstreamError(self.host, r.status_code)
+        raise UpstreamError(self.host, reason=str(err))
+
+    def get_json(self, url, params=None, headers=None, timeout=5):
+        r = self.get(url, params=params, headers=headers, timeout=timeout)
+        if not r.ok:
+            raise UpstreamError(self.host, r.status_code)
+        return r.json()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retried,
+                "errors": self.errors,
+                "latency_avg": self.latency_sum / self.calls if self.calls else 0.0,
+                "latency_max": self.latency_max,
+                "status": dict(self.statuses),
+            }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def client(url: str) -> HostClient:
+    host = urlsplit(url).netloc or url
+    c = _clients.get(host)
+    if c is None:
+        with _clients_lock:
+            c = _clients.get(host)
+            if c is None:
+                c = _clients[host] = HostClient(host, *LIMITS.get(host, DEFAULT_LIMIT))
+    return c
+
+
+def get(url, **kw):
+    return client(url).get(url, **kw)
+
+
+def get_json(url, **kw):
+    return client(url).get_json(url, **kw)
+
+
+def metrics():
+    return {host: c.snapshot() for host, c in list(_clients.items())}
+
+
+# what a failed call or a malformed payload raises: transport/status errors, bad
+# JSON, and the lookup errors parsers hit on missing or null fields
+ADAPTER_ERRORS = (UpstreamError, ValueError, KeyError, IndexError, TypeError, AttributeError)
+
+
+def upstream(default):
+    """Turn upstream failures into ``default`` for adapters, logging instead of hiding them.
+
+    Works on both sync adapters and their ``async def`` twins.
+    """
+    def deco(fn):
+        # async twins share their sync adapter's span and failure series
+        name = fn.__name__.removesuffix("_async")
+
+        def failed(e):
+            log.warning("%s failed: %s", fn.__name__, e)
+            note_failure(name)
+            if ENABLED:
+                ADAPTER_FAILURES.inc((name,))
+            return copy.deepcopy(default)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*args, **kwargs):
+                with span(name):
+                    try:
+                        return await fn(*args, **kwargs)
+                    except ADAPTER_ERRORS as e:
+                        return failed(e)
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                try:
+                    return fn(*args, **kwargs)
+                except ADAPTER_ERRORS as e:
+                    return failed(e)
+        return wrapper
+    return deco
@@ -1,40 +1,113 @@
 import os
+from itertools import islice
 
-try:
-    import requests
-except Exception:  # pragma: no cover
-    requests = None
+from ..concepts import abstract_text, tag_work
+from . import ahttp
+from .cache import cached
+from .http import get_json, upstream
 
 OPENALEX_BASE = os.getenv("OPENALEX_BASE", "https://api.openalex.org")
+MAX_PAGE = 200
+WORK_FIELDS = "id,title,publication_year,doi,keywords,abstract_inverted_index"
 
 
-def openalex_lookup_author(name: str):
-    try:
-        if not requests:
-            return None
-        r = requests.get(f"{OPENALEX_BASE}/authors", params={"search": name}, timeout=5)
-        if r.ok:
-            data = r.json()
-            results = data.get("results", [])
-            if results:
-                first = results[0]
-                return {"id": first.get("id"), "display_name": first.get("display_name")}
-    except Exception:
-        pass
+def _first_author(data):
+    results = data.get("results", [])
+    if results:
+        first = results[0]
+        return {"id": first.get("id"), "display_name": first.get("display_name"), "orcid": first.get("orcid")}
     return None
 
 
-def openalex_works_by_author(author_id: str, concepts, window=None):
-    try:
-        if not requests:
-            return []
-        r = requests.get(f"{OPENALEX_BASE}/works", params={"filter": f"author.id:{author_id}", "per-page": 5}, timeout=5)
-        if r.ok:
-            data = r.json()
-            out = []
-            for w in data.get("results", []):
-                out.append({"title": w.get("title"), "year": w.get("publication_year"), "doi": w.get("doi"), "url": w.get("id")})
-            return out
-    except Exception:
-        pass
-    return []
+def _author(data):
+    return {"id": data.get("id"), "display_name": data.get("display_name"), "orcid": data.get("orcid")}
+
+
+@upstream(None)
+@cached("openalex")
+def openalex_lookup_author(name: str):
+    return _first_author(get_json(f"{OPENALEX_BASE}/authors", params={"search": name}))
+
+
+@upstream(None)
+@cached("openalex")
+async def openalex_lookup_author_async(name: str):
+    return _first_author(await ahttp.get_json(f"{OPENALEX_BASE}/authors", params={"search": name}))
+
+
+@upstream(None)
+@cached("openalex")
+def openalex_author(author_id: str):
+    return _author(get_json(f"{OPENALEX_BASE}/authors/{author_id.rsplit('/', 1)[-1]}"))
+
+
+@upstream(None)
+@cached("openalex")
+async def openalex_author_async(author_id: str):
+    return _author(await ahttp.get_json(f"{OPENALEX_BASE}/authors/{author_id.rsplit('/', 1)[-1]}"))
+
+
+def year_filter(window):
+    if not window:
+        return None
+    lo, hi = window
+    if lo is not None and hi is not None:
+        return f"publication_year:{lo}-{hi}"
+    return f"publication_year:>{lo - 1}" if lo is not None else f"publication_year:<{hi + 1}"
+
+
+def _works_params(author_id, concepts, window, per_page, select):
+    filters = [f"author.id:{author_id}", year_filter(window)]
+    params = {"filter": ",".join(f for f in filters if f), "per-page": per_page, "cursor": "*"}
+    if select:
+        params["select"] = select
+    if concepts:
+        # full-text search over title/abstract/fulltext; results come back by relevance
+        params["search"] = " OR ".join(concepts)
+    return params
+
+
+def _page(data):
+    """``(rows, next_cursor)`` for one page of /works; cursor is None on the last page."""
+    results = data.get("results") or []
+    rows = [{"title": w.get("title"), "year": w.get("publication_year"), "doi": w.get("doi"), "url": w.get("id"),
+             "concepts": tag_work(w.get("title"), abstract_text(w.get("abstract_inverted_index")),
+                                  [k.get("display_name") for k in w.get("keywords") or []])}
+            for w in results]
+    return rows, (data.get("meta") or {}).get("next_cursor") if results else None
+
+
+def iter_openalex_works(author_id: str, concepts=None, window=None, per_page=MAX_PAGE, select=WORK_FIELDS):
+    """Yield an author's works page by page with OpenAlex cursor paging.
+
+    Stop iterating to stop fetching; drain it for bulk exports.
+    """
+    params = _works_params(author_id, concepts, window, per_page, select)
+    while True:
+        rows, cursor = _page(get_json(f"{OPENALEX_BASE}/works", params=params))
+        yield from rows
+        if not cursor:
+            return
+        params["cursor"] = cursor
+
+
+@upstream([])
+@cached("openalex")
+def openalex_works_by_author(author_id: str, concepts, window=None, limit=5):
+    per_page = min(MAX_PAGE, limit) if limit else MAX_PAGE
+    return list(islice(iter_openalex_works(author_id, concepts, window, per_page), limit))
+
+
+@upstream([])
+@cached("openalex")
+async def openalex_works_by_author_async(author_id: str, concepts, window=None, limit=5):
+    per_page = min(MAX_PAGE, limit) if limit else MAX_PAGE
+    params = _works_params(author_id, concepts, window, per_page, WORK_FIELDS)
+    out = []
+    while not limit or len(out) < limit:
+        rows, cursor = _page(await ahttp.get_json(f"{OPENALEX_BASE}/works", params=params))
+        out += rows
+        if not cursor:
+            break
+        params["cursor"] = cursor
+    return out[:limit] if limit else out
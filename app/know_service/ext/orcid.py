@@ -1,76 +1,111 @@
 import os
 
-try:
-    import requests
-except Exception:  # pragma: no cover - fallback when requests unavailable
-    requests = None
+from ..concepts import tag_work, tagger
+from . import ahttp
+from .cache import cached
+from .http import get_json, upstream
 
 ORCID_BASE = os.getenv("ORCID_BASE", "https://pub.orcid.org/v3.0")
+JSON = {"Accept": "application/json"}
+BULK_SIZE = 100  # ORCID caps /works/{put-codes} at 100 put-codes per call
 
 
-def orcid_lookup_by_name(name: str) -> str | None:
-    try:
-        if not requests:
-            return None
-        url = f"{ORCID_BASE}/search/?q=name:{requests.utils.quote(name)}"
-        r = requests.get(url, headers={"Accept": "application/json"}, timeout=5)
-        if r.ok:
-            data = r.json()
-            for res in data.get("result", []):
-                oid = res.get("orcid-identifier", {}).get("path")
-                if oid:
-                    return oid
-    except Exception:
-        pass
+def _first_orcid(data):
+    for res in data.get("result") or []:
+        oid = res.get("orcid-identifier", {}).get("path")
+        if oid:
+            return oid
     return None
 
 
+def _person(data):
+    name_parts = data.get("name") or {}
+    gn = (name_parts.get("given-names") or {}).get("value")
+    fn = (name_parts.get("family-name") or {}).get("value")
+    name = " ".join(p for p in [gn, fn] if p)
+    homepage = None
+    urls = data.get("researcher-urls", {}).get("researcher-url", [])
+    if urls:
+        homepage = urls[0].get("url", {}).get("value")
+    return {"name": name, "homepage": homepage}
+
+
+def _in_window(year, window):
+    if not window:
+        return True
+    if year is None:
+        return False
+    lo, hi = window
+    return (lo is None or year >= lo) and (hi is None or year <= hi)
+
+
+def _work_rows(data, concepts, window):
+    # ORCID has no server-side filters: drop out-of-window summaries before
+    # building rows, and rank titles tagged with a requested concept first.
+    wanted = {tagger().resolve(c) for c in concepts or []}
+    hits, rest = [], []
+    for g in data.get("group", []):
+        w = g.get("work-summary", [{}])[0]
+        pub = w.get("publication-date") or {}
+        year = None
+        if pub.get("year"):
+            year = int(pub["year"]["value"])
+        if not _in_window(year, window):
+            continue
+        title = ((w.get("title") or {}).get("title") or {}).get("value")
+        doi = None
+        for eid in (w.get("external-ids") or {}).get("external-id", []):
+            if eid.get("external-id-type") == "doi":
+                doi = eid.get("external-id-value")
+                break
+        url_work = f"https://doi.org/{doi}" if doi else None
+        row = {"title": title, "year": year, "doi": doi, "url": url_work, "concepts": tag_work(title)}
+        (hits if wanted.intersection(row["concepts"]) else rest).append(row)
+    return hits + rest
+
+
+@upstream(None)
+@cached("orcid")
+def orcid_lookup_by_name(name: str) -> str | None:
+    return _first_orcid(get_json(f"{ORCID_BASE}/search/", params={"q": f"name:{name}"}, headers=JSON))
+
+
+@upstream(None)
+@cached("orcid")
+async def orcid_lookup_by_name_async(name: str) -> str | None:
+    return _first_orcid(await ahttp.get_json(f"{ORCID_BASE}/search/", params={"q": f"name:{name}"}, headers=JSON))
+
+
+@upstream({"name": None})
+@cached("orcid", is_miss=lambda v: not v.get("name"))
 def orcid_person(orcid: str) -> dict:
-    try:
-        if not requests:
-            return {"name": None}
-        url = f"{ORCID_BASE}/{orcid}/person"
-        r = requests.get(url, headers={"Accept": "application/json"}, timeout=5)
-        if r.ok:
-            data = r.json()
-            name_parts = data.get("name", {})
-            gn = name_parts.get("given-names", {}).get("value")
-            fn = name_parts.get("family-name", {}).get("value")
-            name = " ".join(p for p in [gn, fn] if p)
-            homepage = None
-            urls = data.get("researcher-urls", {}).get("researcher-url", [])
-            if urls:
-                homepage = urls[0].get("url", {}).get("value")
-            return {"name": name, "homepage": homepage}
-    except Exception:
-        pass
-    return {"name": None}
+    return _person(get_json(f"{ORCID_BASE}/{orcid}/person", headers=JSON))
+
 
+@upstream({"name": None})
+@cached("orcid", is_miss=lambda v: not v.get("name"))
+async def orcid_person_async(orcid: str) -> dict:
+    return _person(await ahttp.get_json(f"{ORCID_BASE}/{orcid}/person", headers=JSON))
 
+
+@upstream([])
+@cached("orcid")
 def orcid_works(orcid: str, concepts, window=None):
-    try:
-        if not requests:
-            return []
-        url = f"{ORCID_BASE}/{orcid}/works"
-        r = requests.get(url, headers={"Accept": "application/json"}, timeout=5)
-        if r.ok:
-            data = r.json()
-            out = []
-            for g in data.get("group", []):
-                w = g.get("work-summary", [{}])[0]
-                title = w.get("title", {}).get("title", {}).get("value")
-                pub = w.get("publication-date", {})
-                year = None
-                if pub.get("year"):
-                    year = int(pub["year"]["value"])
-                doi = None
-                for eid in w.get("external-ids", {}).get("external-id", []):
-                    if eid.get("external-id-type") == "doi":
-                        doi = eid.get("external-id-value")
-                        break
-                url_work = f"https://doi.org/{doi}" if doi else None
-                out.append({"title": title, "year": year, "doi": doi, "url": url_work})
-            return out
-    except Exception:
-        pass
-    return []
+    return _work_rows(get_json(f"{ORCID_BASE}/{orcid}/works", headers=JSON), concepts, window)
+
+
+@upstream([])
+@cached("orcid")
+async def orcid_works_async(orcid: str, concepts, window=None):
+    return _work_rows(await ahttp.get_json(f"{ORCID_BASE}/{orcid}/works", headers=JSON), concepts, window)
+
+
+def orcid_works_summary(orcid: str) -> dict:
+    return get_json(f"{ORCID_BASE}/{orcid}/works", headers=JSON, timeout=30)
+
+
+def orcid_work_batch(orcid: str, put_codes) -> list[dict]:
+    """Full work records for up to ``BULK_SIZE`` put-codes in one call."""
+    codes = ",".join(str(p) for p in put_codes)
+    data = get_json(f"{ORCID_BASE}/{orcid}/works/{codes}", headers=JSON, timeout=30)
+    return [b["work"] for b in data.get("bulk", []) if b.get("work")]
@@ -0,0 +1,109 @@
+"""Single-flight: concurrent calls with the same key share one execution.
+
+The first caller for a key runs it; callers arriving while it is in flight
+wait and get (a copy of) the same result or exception. ``cached()`` puts this
+under every cache miss, so a burst of identical adapter calls costs one
+upstream request per distinct key.
+
+With ``KNOW_SINGLEFLIGHT_LOCKS=1`` the leader also takes an ``fcntl`` lock
+file for the key, so leaders in other worker processes queue behind it and
+then find the shared SQLite cache already filled. Keys hash onto a fixed set
+of lock files; two different keys can share one and briefly serialize.
+"""
+import asyncio
+import contextlib
+import copy
+import hashlib
+import os
+import threading
+
+from ..telemetry import COALESCED, ENABLED
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows
+    fcntl = None
+
+LOCK_DIR = os.getenv("KNOW_SINGLEFLIGHT_DIR", "data/cache/flights")
+LOCK_STRIPES = int(os.getenv("KNOW_SINGLEFLIGHT_STRIPES", "1024"))
+PROCESS_LOCKS = os.getenv("KNOW_SINGLEFLIGHT_LOCKS", "0") in ("1", "true")
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def _label(key):
+    return key.split(":", 1)[0]
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.futures = {}  # (loop, key) -> asyncio.Future, for coroutine callers
+
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+        if not leader:
+            if ENABLED:
+                COALESCED.inc((_label(key),))
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.value)
+        try:
+            flight.value = fn(*args, **kwargs)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        slot = (asyncio.get_running_loop(), key)
+        fut = self.futures.get(slot)
+        if fut is not None:
+            if ENABLED:
+                COALESCED.inc((_label(key),))
+            # shield: a cancelled waiter must not cancel the shared call
+            return copy.deepcopy(await asyncio.shield(fut))
+        fut = self.futures[slot] = asyncio.ensure_future(fn(*args, **kwargs))
+        try:
+            return await asyncio.shield(fut)
+        finally:
+            if fut.done():
+                self.futures.pop(slot, None)
+            else:
+                fut.add_done_callback(lambda _: self.futures.pop(slot, None))
+
+
+flights = SingleFlight()
+
+
+@contextlib.contextmanager
+def process_lock(key):
+    """Hold the key's lock file while filling it, when cross-process coalescing is on."""
+    if not PROCESS_LOCKS or fcntl is None:
+        yield
+        return
+    stripe = int(hashlib.sha1(key.encode()).hexdigest(), 16) % LOCK_STRIPES
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with open(os.path.join(LOCK_DIR, f"{stripe:04d}.lock"), "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,83 @@
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .telemetry import bind, note_failure
+
+AUTHOR_WORKERS = int(os.getenv("KNOW_AUTHOR_WORKERS", "8"))
+UPSTREAM_WORKERS = int(os.getenv("KNOW_UPSTREAM_WORKERS", "16"))
+REQUEST_DEADLINE = float(os.getenv("KNOW_REQUEST_DEADLINE", "12"))
+
+# deadline of the gather() a pool thread is working for; HTTP attempts shrink their
+# timeouts to it, so a call the caller gave up on frees its slot soon after
+_deadline = contextvars.ContextVar("know_deadline", default=None)
+
+# Two pools so author tasks (which wait on adapter calls) can never starve
+# the adapter calls they are waiting on.
+authors = ThreadPoolExecutor(max_workers=AUTHOR_WORKERS, thread_name_prefix="know-author")
+upstream = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix="know-upstream")
+
+
+def deadline_in(seconds=None):
+    return time.monotonic() + (REQUEST_DEADLINE if seconds is None else seconds)
+
+
+def remaining(deadline):
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def current_deadline():
+    return _deadline.get()
+
+
+def _within(deadline, fn, *args):
+    token = _deadline.set(deadline)
+    try:
+        return fn(*args)
+    finally:
+        _deadline.reset(token)
+
+
+def gather(pool, calls, deadline=None, default=None):
+    """Run ``(fn, *args)`` calls on ``pool``; results come back in call order.
+
+    A call that raises or is still running at ``deadline`` yields ``default``.
+    """
+    deadline = deadline if deadline is not None else current_deadline()
+    futures = [pool.submit(bind(_within), deadline, fn, *args) for fn, *args in calls]
+    wait(futures, timeout=remaining(deadline))
+    out = []
+    for f in futures:
+        if f.done() and not f.cancelled() and f.exception() is None:
+            out.append(f.result())
+        else:
+            note_failure("deadline" if not f.done() else "error")
+            f.cancel()
+            out.append(default)
+    return out
+
+
+async def gather_async(calls, deadline=None, default=None):
+    """``gather`` for coroutine functions: runs them as tasks on the current loop."""
+    deadline = deadline if deadline is not None else current_deadline()
+    # tasks copy the context they are created in, so they see the deadline like pool threads do
+    token = _deadline.set(deadline)
+    try:
+        tasks = [asyncio.ensure_future(fn(*args)) for fn, *args in calls]
+    finally:
+        _deadline.reset(token)
+    if tasks:
+        await asyncio.wait(tasks, timeout=remaining(deadline))
+    out = []
+    for t in tasks:
+        if t.done() and not t.cancelled() and t.exception() is None:
+            out.append(t.result())
+        else:
+            note_failure("deadline" if not t.done() else "error")
+            t.cancel()
+            out.append(default)
+    return out
@@ -0,0 +1,19 @@
+import json
+import os
+import functools
+
+GROUPS_PATH = os.getenv("GROUPS_PATH", "data/groups.json")
+
+
+@functools.lru_cache(maxsize=1)
+def load_groups():
+    with open(GROUPS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_group(name: str):
+    q = (name or "").lower().strip()
+    for gname, g in load_groups().items():
+        if q in (gname.lower(), g.get("slug", "").lower()):
+            return gname, g
+    return None
@@ -0,0 +1,89 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .ext.http import UpstreamError
+from .ext.orcid import BULK_SIZE, orcid_work_batch, orcid_works_summary
+
+log = logging.getLogger(__name__)
+
+HARVEST_DIR = Path(os.getenv("KNOW_HARVEST_DIR", "data/harvest"))
+HARVEST_WORKERS = int(os.getenv("KNOW_HARVEST_WORKERS", "4"))
+
+
+def _modified(d):
+    return ((d or {}).get("last-modified-date") or {}).get("value")
+
+
+def _load_state(path):
+    if not path.exists():
+        return {"last_modified": None, "works": {}}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(path, state):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+
+
+def harvest_author(orcid: str, state_dir=None) -> list[dict]:
+    """Full ORCID work records for ``orcid``, fetching only new or changed works.
+
+    Per-author state (record last-modified-date plus each put-code's
+    last-modified-date and full record) lives in ``state_dir/<orcid>.json``.
+    """
+    path = Path(state_dir or HARVEST_DIR) / f"{orcid}.json"
+    state = _load_state(path)
+    summary = orcid_works_summary(orcid)
+    top = _modified(summary)
+    known = state["works"]
+
+    wanted = {}
+    for g in summary.get("group", []) or []:
+        for s in g.get("work-summary", []) or []:
+            if s.get("put-code"):
+                wanted[str(s["put-code"])] = _modified(s)
+
+    if top is None or top != state["last_modified"] or set(wanted) != set(known):
+        changed = [p for p, m in wanted.items() if p not in known or known[p]["modified"] != m]
+        complete = True
+        for i in range(0, len(changed), BULK_SIZE):
+            try:
+                for w in orcid_work_batch(orcid, changed[i:i + BULK_SIZE]):
+                    p = str(w.get("put-code"))
+                    known[p] = {"modified": wanted.get(p, _modified(w)), "work": w}
+            except UpstreamError as e:
+                log.warning("ORCID bulk fetch for %s failed: %s", orcid, e)
+                complete = False
+        state = {
+            "last_modified": top if complete else None,
+            "works": {p: known[p] for p in wanted if p in known},
+        }
+        _save_state(path, state)
+        log.info("harvested %s: %d changed of %d works", orcid, len(changed), len(wanted))
+
+    return [state["works"][p]["work"] for p in wanted if p in state["works"]]
+
+
+def _harvest_or_skip(orcid, state_dir):
+    try:
+        return harvest_author(orcid, state_dir)
+    except (UpstreamError, ValueError) as e:
+        log.warning("skipping %s: ORCID harvest failed: %s", orcid, e)
+        return None
+
+
+def harvest(orcids, workers=HARVEST_WORKERS, state_dir=None) -> dict:
+    """Harvest several authors concurrently; ``{orcid: [work, ...]}`` in input order.
+
+    An author whose harvest fails (unknown iD, ORCID outage) is logged and left
+    out, so the rest of the roster still goes through and their saved state stays.
+    """
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="know-harvest") as pool:
+        results = pool.map(lambda o: _harvest_or_skip(o, state_dir), orcids)
+        return {o: works for o, works in zip(orcids, results) if works is not None}
@@ -0,0 +1,147 @@
+"""Keyword automaton and intent rules for routing free-text messages.
+
+Patterns are compiled once; a message is scanned in a single pass no matter
+how many tools or phrases are registered.
+"""
+import re
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton over plain substrings (callers lower-case both sides)."""
+
+    def __init__(self, keywords=()):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for word, value in keywords:
+            self._add(word, value)
+        self._link()
+
+    def _add(self, word, value):
+        if not word:
+            return
+        s = 0
+        for ch in word:
+            nxt = self.goto[s].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[s][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            s = nxt
+        self.out[s].append((len(word), value))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for ch, nxt in self.goto[s].items():
+                queue.append(nxt)
+                f = self.fail[s]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, text):
+        """Yield ``(start, end, value)`` for every keyword occurrence in ``text``."""
+        goto, fail, out = self.goto, self.fail, self.out
+        s = 0
+        for i, ch in enumerate(text):
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            for length, value in out[s]:
+                yield i + 1 - length, i + 1, value
+
+    def values(self, text):
+        return {v for _, _, v in self.scan(text)}
+
+
+class Rules:
+    """First-match-wins rules, each a list of alternatives that need all their keywords.
+
+    ``rules`` is ``[(name, [phrase | (phrase, phrase, ...), ...]), ...]`` in
+    priority order; ``match`` returns the name of the first rule with an
+    alternative whose phrases all occur in the text, or None.
+    """
+
+    def __init__(self, rules):
+        self.names = []
+        self.alts = []  # (rule index, keyword count)
+        self.keywords = keywords = {}
+        for ri, (name, alternatives) in enumerate(rules):
+            self.names.append(name)
+            for alt in alternatives:
+                words = {alt.lower()} if isinstance(alt, str) else {w.lower() for w in alt}
+                ai = len(self.alts)
+                self.alts.append((ri, len(words)))
+                for w in words:
+                    keywords.setdefault(w, []).append(ai)
+        self.automaton = KeywordAutomaton((w, w) for w in keywords)
+
+    def match(self, text):
+        seen = {}
+        for word in self.automaton.values(text.lower()) if text else ():
+            for ai in self.keywords[word]:
+                seen[ai] = seen.get(ai, 0) + 1
+        fired = [self.alts[ai][0] for ai, n in seen.items() if n == self.alts[ai][1]]
+        return self.names[min(fired)] if fired else None
+
+
+YEAR = r"(?:19|20)\d{2}"
+RANGE_RE = re.compile(rf"\b({YEAR})\s*(?:-|–|—|to|until|and)\s*({YEAR})\b")
+YEAR_RE = re.compile(rf"\b(since|from|after|before|until|to|in)?\s*\b({YEAR})\b")
+QUERY_RE = re.compile(
+    rf"\b(?:for|about|on)\s+(.+?)(?=\s+(?:from|between|since|after|before|until|in|type)\b|\s*\b{YEAR}\b|\s*[,.;?!]|$)")
+
+
+def extract_years(text):
+    """``(yearMin, yearMax)`` from spans like "2000–2010", "between 2000 and 2010" or "since 2005"."""
+    m = RANGE_RE.search(text)
+    if m:
+        lo, hi = int(m.group(1)), int(m.group(2))
+        return min(lo, hi), max(lo, hi)
+    found = YEAR_RE.findall(text)
+    if not found:
+        return None, None
+    if len(found) > 1:
+        return int(found[0][1]), int(found[-1][1])
+    word, year = found[0]
+    if word in ("before", "until", "to"):
+        return None, int(year)
+    return int(year), None
+
+
+def slot_extractors(schema):
+    """Compiled slot readers for the properties a tool schema declares."""
+    props = (schema or {}).get("properties", {})
+    readers = {}
+    if "query" in props:
+        def query(text):
+            m = QUERY_RE.search(text)
+            return m.group(1).strip() if m and m.group(1).strip() else None
+        readers["query"] = query
+    if "type" in props and props["type"].get("enum"):
+        type_re = re.compile(r"\btype\s+(" + "|".join(
+            re.escape(t) for t in sorted(props["type"]["enum"], key=len, reverse=True)) + r")\b")
+
+        def type_(text):
+            m = type_re.search(text)
+            return m.group(1) if m else None
+        readers["type"] = type_
+    if "yearMin" in props or "yearMax" in props:
+        readers["years"] = extract_years
+    return readers
+
+
+def extract_slots(readers, text):
+    args = {}
+    for name, read in readers.items():
+        if name == "years":
+            args["yearMin"], args["yearMax"] = read(text)
+        else:
+            args[name] = read(text)
+    return args
@@ -0,0 +1,183 @@
+import csv
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+from .dedupe import work_key
+
+MASTER_DB = os.getenv("KNOW_MASTER_DB", "data/master.sqlite3")
+KEY_VERSION = 1  # bump when dedupe.work_key changes; stores are re-keyed on open
+COLUMNS = [
+    "orcid_id", "title", "type", "date", "year", "journal_or_publisher",
+    "doi", "isbn", "url", "citation", "put_code", "source",
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS works (
+    key TEXT PRIMARY KEY,
+    {", ".join(f"{c} TEXT NOT NULL DEFAULT ''" for c in COLUMNS)},
+    extra TEXT NOT NULL DEFAULT '{{}}'
+);
+CREATE INDEX IF NOT EXISTS works_orcid ON works(orcid_id);
+CREATE INDEX IF NOT EXISTS works_year ON works(year);
+CREATE TABLE IF NOT EXISTS counts (
+    orcid_id TEXT NOT NULL,
+    year TEXT NOT NULL,
+    type TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (orcid_id, year, type)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS works_fts USING fts5(
+    title, content = 'works', content_rowid = 'rowid', tokenize = 'trigram'
+);
+CREATE TRIGGER IF NOT EXISTS works_fts_ai AFTER INSERT ON works BEGIN
+    INSERT INTO works_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS works_fts_ad AFTER DELETE ON works BEGIN
+    INSERT INTO works_fts (works_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS works_fts_au AFTER UPDATE OF title ON works BEGIN
+    INSERT INTO works_fts (works_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    INSERT INTO works_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+"""
+
+
+class MasterStore:
+    """Deduplicated bibliography in SQLite, one row per dedupe key.
+
+    Harvests upsert only what they bring; CSV/Markdown exports are streamed
+    from the table instead of rewriting an in-memory copy of the corpus.
+    """
+
+    def __init__(self, path=MASTER_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.executescript(SCHEMA)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < KEY_VERSION:
+            self._rekey()
+        elif len(self) and not self.db.execute("SELECT 1 FROM counts LIMIT 1").fetchone():
+            with self.db:
+                self._refresh_counts()
+        # stores written before the title index existed get it built once
+        if self.db.execute("SELECT COUNT(*) FROM works_fts_docsize").fetchone()[0] != len(self):
+            with self.db:
+                self.db.execute("INSERT INTO works_fts (works_fts) VALUES ('rebuild')")
+
+    def _rekey(self):
+        rows = list(self.rows())
+        with self.db:
+            self.db.execute("DELETE FROM works")
+            # rows that now share a key collapse onto the first one, as in upsert()
+            self.db.executemany(self._insert_sql("INSERT OR IGNORE"), (self._values(r) for r in rows))
+            self._refresh_counts()
+            self.db.execute(f"PRAGMA user_version = {KEY_VERSION}")
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM works").fetchone()[0]
+
+    def upsert(self, rows) -> int:
+        """Insert new works and refresh ones from the same author; returns rows changed.
+
+        A work already held for a different author keeps its first owner, as
+        the old first-seen-wins CSV dedupe did.
+        """
+        touched = set()
+
+        def values():
+            for r in rows:
+                touched.add(str(r.get("orcid_id") or ""))
+                yield self._values(r)
+
+        with self.db:
+            # rowcount, unlike total_changes, leaves out the title-index triggers
+            changed = self.db.executemany(self._upsert_sql(), values()).rowcount
+            if changed:
+                self._refresh_counts(touched)
+        return changed
+
+    def _refresh_counts(self, orcid_ids=None):
+        """Recompute the (author, year, type) rollup, for some authors or all of them."""
+        group = "INSERT INTO counts SELECT orcid_id, year, type, COUNT(*) FROM works {} GROUP BY orcid_id, year, type"
+        if orcid_ids is None:
+            self.db.execute("DELETE FROM counts")
+            self.db.execute(group.format(""))
+            return
+        ids = sorted(orcid_ids)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ", ".join("?" for _ in chunk)
+            self.db.execute(f"DELETE FROM counts WHERE orcid_id IN ({marks})", chunk)
+            self.db.execute(group.format(f"WHERE orcid_id IN ({marks})"), chunk)
+
+    def counts(self, orcid_ids=None, years=None, types=None):
+        """``(orcid_id, year, type, n)`` rollup rows, optionally filtered.
+
+        ``years`` is an inclusive ``(first, last)`` pair; either end may be None.
+        """
+        where, args = [], []
+        if orcid_ids is not None:
+            ids = list(orcid_ids)
+            where.append(f"orcid_id IN ({', '.join('?' for _ in ids)})")
+            args += ids
+        if years:
+            lo, hi = years
+            where.append("year != ''")
+            if lo is not None:
+                where.append("year >= ?")
+                args.append(f"{int(lo):04d}")
+            if hi is not None:
+                where.append("year <= ?")
+                args.append(f"{int(hi):04d}")
+        if types:
+            types = list(types)
+            where.append(f"type IN ({', '.join('?' for _ in types)})")
+            args += types
+        sql = "SELECT orcid_id, year, type, n FROM counts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.db.execute(sql + " ORDER BY orcid_id, year, type", args).fetchall()
+
+    def _insert_sql(self, verb="INSERT"):
+        cols = ", ".join(COLUMNS)
+        marks = ", ".join("?" for _ in COLUMNS)
+        return f"{verb} INTO works (key, {cols}, extra) VALUES (?, {marks}, ?)"
+
+    def _upsert_sql(self):
+        updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS)
+        differs = " OR ".join(f"{c} IS NOT excluded.{c}" for c in COLUMNS)
+        return (
+            f"{self._insert_sql()} ON CONFLICT(key) DO UPDATE SET {updates}, extra = excluded.extra "
+            f"WHERE works.orcid_id = excluded.orcid_id AND ({differs} OR works.extra IS NOT excluded.extra)"
+        )
+
+    def _values(self, row):
+        extra = {k: v for k, v in row.items() if k not in COLUMNS and k != "key" and v not in (None, "")}
+        return (work_key(row), *[str(row.get(c) or "") for c in COLUMNS], json.dumps(extra, sort_keys=True))
+
+    def rows(self, orcid_id=None):
+        sql = f"SELECT {', '.join(COLUMNS)}, extra FROM works"
+        args = ()
+        if orcid_id:
+            sql += " WHERE orcid_id = ?"
+            args = (orcid_id,)
+        for rec in self.db.execute(sql + " ORDER BY rowid", args):
+            row = dict(zip(COLUMNS, rec[:-1]))
+            row.update(json.loads(rec[-1]))
+            yield row
+
+    def import_csv(self, path) -> int:
+        path = Path(path)
+        if not path.exists():
+            return 0
+        with path.open("r", encoding="utf-8", newline="") as f:
+            return self.upsert(csv.DictReader(f))
+
+    def export_csv(self, path, orcid_id=None):
+        extras = sorted({k for (e,) in self.db.execute("SELECT DISTINCT extra FROM works") for k in json.loads(e)})
+        with Path(path).open("w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=COLUMNS + extras, restval="")
+            w.writeheader()
+            w.writerows(self.rows(orcid_id))
@@ -1,7 +1,13 @@
-from dataclasses import dataclass
-from .catalog import find_scholar
-from .ext.orcid import orcid_lookup_by_name, orcid_person
-from .ext.openalex import openalex_lookup_author
+import re
+from dataclasses import dataclass, replace
+from .catalog import match_scholar, find_scholar_by_orcid, normalize_name
+from .ext.orcid import orcid_lookup_by_name, orcid_lookup_by_name_async, orcid_person, orcid_person_async
+from .ext.openalex import openalex_lookup_author, openalex_lookup_author_async, openalex_author, openalex_author_async
+from .fanout import authors, upstream, gather, gather_async
+from .telemetry import traced
+
+ORCID_ID = re.compile(r"^(?:https?://orcid\.org/)?(\d{4}-\d{4}-\d{4}-\d{3}[\dX])$", re.I)
+OPENALEX_ID = re.compile(r"^(?:https?://openalex\.org/)?(A\d+)$", re.I)
 
 
 @dataclass
@@ -16,30 +22,105 @@ class Person:
     source: str
 
 
-def resolve(names: list[str]) -> list[Person]:
-    out = []
-    for n in names:
-        seed = find_scholar(n)
-        if seed:
-            out.append(Person(
-                name=seed["name"],
-                orcid=seed.get("orcid"),
-                aliases=seed.get("aliases", []),
-                homepage=None,
-                openalex=None,
-                sources=seed.get("sources", []),
-                confidence=0.95,
-                source="seed"
-            ))
-            continue
-        oc = orcid_lookup_by_name(n)
-        if oc:
-            pr = orcid_person(oc)
-            out.append(Person(pr.get("name", n), oc, [], pr.get("homepage"), None, [], 0.9, "orcid"))
-            continue
-        oa = openalex_lookup_author(n)
-        if oa:
-            out.append(Person(oa.get("display_name", n), None, [], None, oa["id"], [oa.get("id")], 0.8, "openalex"))
-            continue
-        out.append(Person(n, None, [], None, None, [], 0.5, "string"))
-    return out
+def identify(entry: str):
+    """Classify a batch entry as ``("orcid"|"openalex"|"name", key)``."""
+    entry = (entry or "").strip()
+    m = ORCID_ID.match(entry)
+    if m:
+        return "orcid", m.group(1).upper()
+    m = OPENALEX_ID.match(entry)
+    if m:
+        return "openalex", "https://openalex.org/" + m.group(1).upper()
+    return "name", normalize_name(entry)
+
+
+def unresolved(name: str) -> Person:
+    return Person(name, None, [], None, None, [], 0.5, "string")
+
+
+def _seeded(seed, score) -> Person:
+    return Person(
+        name=seed["name"],
+        orcid=seed.get("orcid"),
+        aliases=seed.get("aliases", []),
+        homepage=None,
+        openalex=None,
+        sources=seed.get("sources", []),
+        # any catalog match outranks the 0.5 of an unresolved string; exact ones score 0.95
+        confidence=round(0.5 + 0.45 * score, 2),
+        source="seed"
+    )
+
+
+def _from_orcid(oc: str, pr) -> Person:
+    return Person(pr.get("name") or oc, oc, [], pr.get("homepage"), None, [], 0.9, "orcid")
+
+
+def _from_openalex(key: str, oa) -> Person:
+    # OpenAlex knows many authors' ORCID iDs; carrying it lets ORCID works load and
+    # lets batch entries given by ORCID and by OpenAlex id merge into one person
+    m = ORCID_ID.match(oa.get("orcid") or "")
+    oc = m.group(1).upper() if m else None
+    seed = find_scholar_by_orcid(oc) if oc else None
+    if seed:
+        return replace(_seeded(seed, 1.0), openalex=key)
+    return Person(oa.get("display_name") or key, oc, [], None, key, [key], 0.8, "openalex")
+
+
+def _by_orcid(oc: str, deadline=None) -> Person:
+    seed = find_scholar_by_orcid(oc)
+    if seed:
+        return _seeded(seed, 1.0)
+    return _from_orcid(oc, gather(upstream, [(orcid_person, oc)], deadline, default={})[0])
+
+
+async def _by_orcid_async(oc: str, deadline=None) -> Person:
+    seed = find_scholar_by_orcid(oc)
+    if seed:
+        return _seeded(seed, 1.0)
+    return _from_orcid(oc, (await gather_async([(orcid_person_async, oc)], deadline, default={}))[0])
+
+
+@traced("resolve")
+def resolve_one(n: str, deadline=None) -> Person:
+    kind, key = identify(n)
+    if kind == "orcid":
+        return _by_orcid(key, deadline)
+    if kind == "openalex":
+        return _from_openalex(key, gather(upstream, [(openalex_author, key)], deadline)[0] or {})
+    seed, score = match_scholar(n)
+    if seed:
+        return _seeded(seed, score)
+    # ORCID wins over OpenAlex, so OpenAlex is only asked when ORCID has no match
+    oc = gather(upstream, [(orcid_lookup_by_name, n)], deadline)[0]
+    if oc:
+        return _by_orcid(oc, deadline)
+    oa = gather(upstream, [(openalex_lookup_author, n)], deadline)[0]
+    if oa:
+        return _from_openalex(oa["id"], dict(oa, display_name=oa.get("display_name") or n))
+    return unresolved(n)
+
+
+@traced("resolve")
+async def resolve_one_async(n: str, deadline=None) -> Person:
+    """``resolve_one`` on the event loop, for the async server."""
+    kind, key = identify(n)
+    if kind == "orcid":
+        return await _by_orcid_async(key, deadline)
+    if kind == "openalex":
+        return _from_openalex(key, (await gather_async([(openalex_author_async, key)], deadline))[0] or {})
+    seed, score = match_scholar(n)
+    if seed:
+        return _seeded(seed, score)
+    oc = (await gather_async([(orcid_lookup_by_name_async, n)], deadline))[0]
+    if oc:
+        return await _by_orcid_async(oc, deadline)
+    oa = (await gather_async([(openalex_lookup_author_async, n)], deadline))[0]
+    if oa:
+        return _from_openalex(oa["id"], dict(oa, display_name=oa.get("display_name") or n))
+    return unresolved(n)
+
+
+def resolve(names: list[str], deadline=None) -> list[Person]:
+    found = gather(authors, [(resolve_one, n, deadline) for n in names], deadline)
+    return [p or unresolved(n) for n, p in zip(names, found)]
@@ -0,0 +1,119 @@
+"""Materialized cartographies for every ``data/groups.json`` group × its default concepts.
+
+A background thread compiles the standard "compare <concept> across <group>"
+graphs off the request path and swaps each one in when it finishes. It
+recompiles everything every ``KNOW_PREWARM_INTERVAL`` seconds, or sooner
+when the scholar catalog changes. ``/cartography/compile`` answers a prompt
+naming the same roster and concept from these results without touching the
+upstreams. Set the interval to 0 (the default) to leave pre-warming off.
+"""
+import logging
+import os
+import threading
+import time
+
+from .cartography import compile_graph, parse_prompt
+from .catalog import catalog_version, normalize_name
+from .fanout import deadline_in
+from .groups import load_groups
+from .telemetry import failures
+
+log = logging.getLogger(__name__)
+
+PREWARM_INTERVAL = float(os.getenv("KNOW_PREWARM_INTERVAL", "0"))
+PREWARM_POLL = float(os.getenv("KNOW_PREWARM_POLL", "30"))
+PREWARM_DEADLINE = float(os.getenv("KNOW_PREWARM_DEADLINE", "60"))
+MODE = "concept_lineage"
+
+
+def graph_key(prompt, mode=MODE, window=None):
+    """Roster + concept key a prompt compiles to, or None when it can't be served pre-warmed."""
+    if window is not None or mode != MODE:
+        return None
+    names, concepts = parse_prompt(prompt)
+    if not names or len(concepts) != 1:
+        return None
+    return tuple(normalize_name(n) for n in names), concepts[0]
+
+
+def standard_prompts(groups=None):
+    """``{key: prompt}`` for each group crossed with its ``defaultConcepts``."""
+    out = {}
+    for g in (load_groups() if groups is None else groups).values():
+        roster = ", ".join(g.get("members", []))
+        for concept in g.get("defaultConcepts", []):
+            prompt = f"compare {concept} across {roster}"
+            key = graph_key(prompt)
+            if key:
+                out[key] = prompt
+    return out
+
+
+class Prewarmer:
+    def __init__(self, interval=PREWARM_INTERVAL, poll=PREWARM_POLL):
+        self.interval = interval
+        self.poll = poll
+        self.graphs = {}  # key -> (graph, compiled at)
+        self.version = None
+        self.generation = 0
+        self.retry = False  # a refresh hit upstream failures; try again at the next poll
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def lookup(self, prompt, mode=MODE, window=None):
+        if not self.graphs:
+            return None
+        hit = self.graphs.get(graph_key(prompt, mode, window))
+        return hit[0] if hit else None
+
+    def refresh(self, prompts=None):
+        """Compile every standard prompt now; returns how many graphs were swapped in."""
+        version = catalog_version()
+        swapped = 0
+        self.retry = False
+        for key, prompt in (prompts or standard_prompts()).items():
+            with failures() as failed:
+                graph = compile_graph(prompt, MODE, deadline=deadline_in(PREWARM_DEADLINE))
+            # failed upstreams or late authors leave holes in a graph; keep serving the
+            # last complete one, and never serve a partial one as pre-warmed
+            if failed:
+                log.info("pre-warm of %r degraded (%s); retrying next poll", prompt, ", ".join(sorted(set(failed))))
+                self.retry = True
+                if version != self.version and key in self.graphs:
+                    with self.lock:
+                        del self.graphs[key]
+                        self.generation += 1
+                continue
+            with self.lock:
+                self.graphs[key] = (graph, time.time())
+                self.generation += 1
+            swapped += 1
+        self.version = version
+        return swapped
+
+    def stale(self):
+        if self.retry or self.version != catalog_version():
+            return True
+        oldest = min((at for _, at in self.graphs.values()), default=0)
+        return time.time() - oldest >= self.interval
+
+    def _run(self):
+        while True:
+            try:
+                if self.stale():
+                    n = self.refresh()
+                    log.info("pre-warmed %d cartographies for catalog %s", n, self.version)
+            except Exception as e:  # keep the thread alive; the next poll retries
+                log.warning("cartography pre-warm failed: %s", e)
+            time.sleep(self.poll)
+
+    def start(self):
+        if self.interval <= 0 or self.worker is not None:
+            return
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name="know-prewarm", daemon=True)
+                self.worker.start()
+
+
+prewarmer = Prewarmer()
@@ -0,0 +1,226 @@
+"""Opt-in sampling profiler for individual requests.
+
+While a ``Profile`` is open, one daemon thread wakes every
+``KNOW_PROFILE_INTERVAL`` seconds and records the stack of each thread working
+for that request. That covers the request thread plus any fanout worker
+running a ``telemetry.bind``-ed call for it. Stacks are counted in
+flamegraph's collapsed format (``outer;inner count`` lines) and saved under
+``KNOW_PROFILE_DIR``, so every worker process can list and serve them.
+
+Nothing samples unless armed: for the next N requests, for requests slower
+than a threshold (every request is sampled while that is armed, and only
+slow ones are kept), or for one request sent with ``X-Know-Profile``.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+PROFILE_DIR = Path(os.getenv("KNOW_PROFILE_DIR", "data/cache/profiles"))
+PROFILE_INTERVAL = float(os.getenv("KNOW_PROFILE_INTERVAL", "0.005"))
+PROFILE_KEEP = int(os.getenv("KNOW_PROFILE_KEEP", "50"))
+MAX_DEPTH = 128
+
+current = contextvars.ContextVar("know_profile", default=None)
+_ROOT = str(Path(__file__).resolve().parents[2]) + os.sep
+_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def frame_label(code):
+    path = code.co_filename
+    path = path[len(_ROOT):] if path.startswith(_ROOT) else os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+def collapse(frame):
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class Profile:
+    def __init__(self, reason):
+        self.id = uuid.uuid4().hex
+        self.reason = reason
+        self.started = time.time()
+        self.threads = Counter()  # thread id -> open attachments
+        self.samples = Counter()
+        self.lock = threading.Lock()
+
+    def attach(self):
+        with self.lock:
+            self.threads[threading.get_ident()] += 1
+
+    def detach(self):
+        tid = threading.get_ident()
+        with self.lock:
+            self.threads[tid] -= 1
+            if self.threads[tid] <= 0:
+                del self.threads[tid]
+
+    @contextlib.contextmanager
+    def attached(self):
+        self.attach()
+        try:
+            yield
+        finally:
+            self.detach()
+
+    def sample(self, frames):
+        with self.lock:
+            tids = list(self.threads)
+        for tid in tids:
+            frame = frames.get(tid)
+            if frame is not None:
+                stack = collapse(frame)
+                with self.lock:
+                    self.samples[stack] += 1
+
+    def collapsed(self):
+        with self.lock:
+            return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+
+class Sampler:
+    """One sampling thread shared by every open profile; it exits when none are left."""
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.profiles = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, profile):
+        with self.lock:
+            self.profiles.add(profile)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="know-profiler", daemon=True)
+                self.thread.start()
+
+    def discard(self, profile):
+        with self.lock:
+            self.profiles.discard(profile)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                profiles = list(self.profiles)
+                if not profiles:
+                    self.thread = None
+                    return
+            frames = sys._current_frames()
+            frames.pop(me, None)
+            for p in profiles:
+                p.sample(frames)
+
+
+class Arming:
+    """What to profile next: a count of requests and/or a latency threshold, optionally by path prefix."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.remaining = 0
+        self.threshold = None
+        self.prefix = ""
+        self.until = None
+
+    def arm(self, requests=0, threshold_ms=None, prefix="", ttl=None):
+        with self.lock:
+            self.remaining = max(0, int(requests))
+            self.threshold = float(threshold_ms) / 1000 if threshold_ms is not None else None
+            self.prefix = prefix or ""
+            self.until = time.time() + ttl if ttl else None
+        return self.state()
+
+    def disarm(self):
+        return self.arm()
+
+    def state(self):
+        with self.lock:
+            if self.until is not None and time.time() >= self.until:
+                self.remaining, self.threshold, self.until = 0, None, None
+            return {"requests": self.remaining, "thresholdMs": self.threshold and self.threshold * 1000,
+                    "prefix": self.prefix, "until": self.until}
+
+    def claim(self, path):
+        """``reason`` this request should be sampled for, or None."""
+        if not self.remaining and self.threshold is None:
+            return None
+        state = self.state()
+        if not path.startswith(state["prefix"]):
+            return None
+        with self.lock:
+            if self.remaining:
+                self.remaining -= 1
+                return "armed"
+        return "threshold" if state["thresholdMs"] is not None else None
+
+
+sampler = Sampler()
+arming = Arming()
+
+
+def start(reason):
+    profile = Profile(reason)
+    profile.attach()
+    current.set(profile)
+    sampler.add(profile)
+    return profile
+
+
+def stop(profile, path, seconds, keep=True):
+    """Close ``profile``; save it when ``keep`` and it caught any samples. Returns the saved id or None."""
+    sampler.discard(profile)
+    profile.detach()
+    current.set(None)
+    if not keep or not profile.samples:
+        return None
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    meta = {"id": profile.id, "path": path, "reason": profile.reason, "started": profile.started,
+            "ms": round(seconds * 1000, 1), "samples": sum(profile.samples.values()),
+            "intervalMs": sampler.interval * 1000}
+    (PROFILE_DIR / f"{profile.id}.txt").write_text(profile.collapsed(), encoding="utf-8")
+    (PROFILE_DIR / f"{profile.id}.json").write_text(json.dumps(meta), encoding="utf-8")
+    _prune()
+    return profile.id
+
+
+def _prune():
+    metas = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in metas[PROFILE_KEEP:]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".txt").unlink(missing_ok=True)
+
+
+def list_profiles():
+    out = []
+    for path in PROFILE_DIR.glob("*.json") if PROFILE_DIR.exists() else []:
+        try:
+            out.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return sorted(out, key=lambda m: m["started"], reverse=True)
+
+
+def load_profile(profile_id):
+    """Collapsed stacks for ``profile_id``, or None."""
+    if not _ID.match(profile_id or ""):
+        return None
+    path = PROFILE_DIR / f"{profile_id}.txt"
+    return path.read_text(encoding="utf-8") if path.exists() else None
+
+
+def clear_profiles():
+    for path in PROFILE_DIR.glob("*.*") if PROFILE_DIR.exists() else []:
+        path.unlink(missing_ok=True)
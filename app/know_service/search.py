@@ -0,0 +1,224 @@
+"""Bibliography search over the master store: fuzzy titles, facets, cursor pages.
+
+Title candidates come from the store's FTS5 trigram index, so a typo still
+shares most trigrams with the real title; the candidates are then re-scored
+by how much of the query they cover. Pages are keyed on the last result's
+sort key rather than an offset, so they stay stable while harvests land.
+"""
+import base64
+import binascii
+import json
+import sqlite3
+import threading
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+from .catalog import find_scholar_by_orcid
+from .concepts import tagger
+from .dedupe import norm_title
+from .master import MASTER_DB, MasterStore
+
+MAX_LIMIT = 100
+MAX_CANDIDATES = 5000
+MIN_SCORE = 0.5
+MEMO_SIZE = 32
+FIELDS = ["title", "type", "year", "journal_or_publisher", "doi", "isbn", "url", "orcid_id"]
+
+# openBibliography's type vocabulary -> ORCID work types
+TYPE_ALIASES = {
+    "article": ["journal-article"],
+    "chapter": ["book-chapter"],
+    "edited volume": ["edited-book"],
+    "thesis": ["dissertation-thesis", "dissertation"],
+    "other": ["other"],
+}
+
+
+class SearchError(ValueError):
+    pass
+
+
+@lru_cache(maxsize=65536)
+def concept_tags(title):
+    return tuple(tagger().tag(title))
+
+
+def _grams(s):
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def title_score(q, title):
+    """1.0 for a prefix, 0.9 for a substring, else the share of the query's trigrams in the title."""
+    t = norm_title(title)
+    if t.startswith(q):
+        return 1.0
+    if q in t:
+        return 0.9
+    qg = _grams(q)
+    return 0.8 * len(qg & _grams(t)) / len(qg) if qg else 0.0
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise SearchError("bad cursor")
+    if not (isinstance(key, list) and len(key) == 3 and all(isinstance(k, (int, float)) for k in key[:2])
+            and isinstance(key[2], str)):
+        raise SearchError("bad cursor")
+    return key
+
+
+def expand_types(types):
+    out = []
+    for t in types or []:
+        out += TYPE_ALIASES.get(t.lower(), [t])
+    return out
+
+
+class WorkSearch:
+    """Search over one master store, with a ranked-match memo shared by every thread.
+
+    Each thread queries through its own sqlite connection (connections stay on
+    the thread that opened them); the schema and title index are set up once.
+    """
+
+    def __init__(self, path=MASTER_DB):
+        self.path = str(path)
+        MasterStore(self.path).db.close()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.memo = OrderedDict()
+        self.generation = 0
+
+    @property
+    def db(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = sqlite3.connect(self.path)
+        return conn
+
+    def _generation(self):
+        # data_version only tells a connection about other connections' commits, so a
+        # thread that sees one (or opens its connection) starts a new, empty memo
+        db = self.db
+        seen = (db.execute("PRAGMA data_version").fetchone()[0], db.total_changes)
+        if seen != getattr(self.local, "seen", None):
+            self.local.seen = seen
+            with self.lock:
+                self.generation += 1
+                self.memo.clear()
+        return self.generation
+
+    def _candidates(self, q, ymin, ymax, types, authors):
+        where, args = [], []
+        if q and len(q) >= 3:
+            grams = sorted(_grams(q))
+            where.append("rowid IN (SELECT rowid FROM works_fts WHERE works_fts MATCH ? ORDER BY rank LIMIT ?)")
+            args += [" OR ".join('"' + g.replace('"', '""') + '"' for g in grams), MAX_CANDIDATES]
+        elif q:
+            where.append("title LIKE ? ESCAPE '\\'")
+            args.append(q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if ymin is not None:
+            where += ["year != ''", "year >= ?"]
+            args.append(f"{ymin:04d}")
+        if ymax is not None:
+            where += ["year != ''", "year <= ?"]
+            args.append(f"{ymax:04d}")
+        if types:
+            where.append(f"type IN ({', '.join('?' for _ in types)})")
+            args += types
+        if authors:
+            where.append(f"orcid_id IN ({', '.join('?' for _ in authors)})")
+            args += authors
+        sql = f"SELECT key, {', '.join(FIELDS)} FROM works"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        for rec in self.db.execute(sql, args):
+            yield dict(zip(["key"] + FIELDS, rec))
+
+    def _matches(self, q, ymin, ymax, types, authors, concepts):
+        matches = []
+        for row in self._candidates(q, ymin, ymax, types, authors):
+            score = title_score(q, row["title"]) if q else 0.0
+            if q and score < MIN_SCORE:
+                continue
+            row["concepts"] = list(concept_tags(row["title"]))
+            if concepts and not concepts.intersection(row["concepts"]):
+                continue
+            row["score"] = round(score, 3)
+            # best score first, then newest, then key for a total order
+            year = row["year"][:4]
+            row["_sort"] = [-row["score"], -int(year) if year.isdigit() else 0, row["key"]]
+            matches.append(row)
+        matches.sort(key=lambda r: r["_sort"])
+
+        facets = {"year": Counter(), "type": Counter(), "author": Counter(), "concept": Counter()}
+        for r in matches:
+            facets["year"][r["year"] or "n.d."] += 1
+            facets["type"][r["type"] or "other"] += 1
+            facets["author"][r["orcid_id"]] += 1
+            facets["concept"].update(r["concepts"])
+        facets = {
+            "year": dict(sorted(facets["year"].items(), reverse=True)),
+            "type": dict(facets["type"].most_common()),
+            "author": [{"orcid": o, "name": _author_name(o), "count": n} for o, n in facets["author"].most_common()],
+            "concept": dict(facets["concept"].most_common()),
+        }
+        return matches, facets
+
+    def search(self, q=None, ymin=None, ymax=None, types=None, authors=None, concepts=None,
+               limit=20, cursor=None):
+        """One page of matches plus facet counts over every match."""
+        q = norm_title(q)
+        types = expand_types(types)
+        concepts = frozenset(tagger().resolve(c) for c in concepts or [])
+        after = decode_cursor(cursor) if cursor else None
+        # following pages of one search reuse its ranked matches until the store changes
+        generation = self._generation()
+        key = (q, ymin, ymax, tuple(types), tuple(authors or ()), concepts)
+        with self.lock:
+            hit = self.memo.get(key)
+            if hit:
+                self.memo.move_to_end(key)
+        matches, facets = hit or self._matches(q, ymin, ymax, types, authors, concepts)
+        with self.lock:
+            # a result computed before another thread saw a commit is not kept
+            if generation == self.generation:
+                self.memo[key] = matches, facets
+                while len(self.memo) > MEMO_SIZE:
+                    self.memo.popitem(last=False)
+
+        start = bisect_right(matches, after, key=lambda r: r["_sort"]) if after else 0
+        page = matches[start:start + limit]
+        more = start + limit < len(matches)
+        return {
+            "total": len(matches),
+            "results": [{k: v for k, v in r.items() if k != "_sort"} for r in page],
+            "facets": facets,
+            "next": encode_cursor(page[-1]["_sort"]) if more and page else None,
+        }
+
+
+def _author_name(orcid):
+    seed = find_scholar_by_orcid(orcid) if orcid else None
+    return seed.get("name") if seed else None
+
+
+_search = None
+_search_lock = threading.Lock()
+
+
+def work_search():
+    """The process's searcher over ``MASTER_DB``."""
+    global _search
+    if _search is None:
+        with _search_lock:
+            if _search is None:
+                _search = WorkSearch(MASTER_DB)
+    return _search
@@ -0,0 +1,231 @@
+"""Request tracing and Prometheus metrics.
+
+A request opens a ``Trace``; ``span(name)`` blocks and ``@traced`` functions
+add their wall time to it, including work done on fanout threads, which
+inherit the trace through ``bind``. The totals become the response's
+``Server-Timing`` header and feed the ``know_span_seconds`` histogram.
+
+With ``KNOW_TELEMETRY=0`` no trace is ever opened: ``span`` hands back one
+shared no-op context manager and the metric hooks are skipped, so the hot path
+pays one context-variable read per span.
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from . import profiler
+
+ENABLED = os.getenv("KNOW_TELEMETRY", "1") not in ("0", "false", "")
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NOOP = contextlib.nullcontext()
+_current = contextvars.ContextVar("know_trace", default=None)
+_failures = contextvars.ContextVar("know_failures", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            s = self.series.get(labels)
+            if s is None:
+                s = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = {k: list(v) for k, v in self.series.items()}
+        for values, s in sorted(series.items()):
+            cumulative = 0
+            for le, n in zip([*map(str, self.buckets), "+Inf"], s[:-1]):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), values + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {s[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help, labels=(), kind="counter"):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.kind = kind
+        self.values = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def inc(self, labels=(), n=1):
+        with self.lock:
+            self.values[labels] += n
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            values = dict(self.values)
+        lines += [f"{self.name}{_labels(self.labels, k)} {v:g}" for k, v in sorted(values.items())]
+        return lines
+
+
+def gauge(name, help, samples, labels=(), kind="gauge"):
+    """Exposition lines for values read at scrape time: ``samples`` is ``{label values: value}``."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    return lines + [f"{name}{_labels(labels, k)} {v:g}" for k, v in sorted(samples.items())]
+
+
+def counter(name, help, samples, labels=()):
+    """``gauge`` for running totals kept elsewhere; ``name`` should end in ``_total``."""
+    return gauge(name, help, samples, labels, kind="counter")
+
+
+REQUEST_SECONDS = Histogram("know_request_seconds", "Request latency by endpoint.", ("endpoint", "method", "status"))
+IN_FLIGHT = Counter("know_requests_in_flight", "Requests being served.", ("endpoint",), kind="gauge")
+UPSTREAM_SECONDS = Histogram("know_upstream_seconds", "Upstream HTTP attempt latency.", ("host", "status"))
+SPAN_SECONDS = Histogram("know_span_seconds", "Time spent in traced stages of a request.", ("span",))
+ADAPTER_FAILURES = Counter("know_adapter_failures_total", "Adapter calls that fell back to their default.",
+                           ("adapter",))
+COALESCED = Counter("know_upstream_coalesced_total", "Adapter calls that joined an identical call in flight.",
+                    ("source",))
+REGISTRY = [REQUEST_SECONDS, IN_FLIGHT, UPSTREAM_SECONDS, SPAN_SECONDS, ADAPTER_FAILURES, COALESCED]
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}  # name -> [seconds, count], in first-seen order
+        self.lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self.lock:
+            s = self.spans.get(name)
+            if s is None:
+                self.spans[name] = [seconds, 1]
+            else:
+                s[0] += seconds
+                s[1] += 1
+
+    def server_timing(self):
+        """``Server-Timing`` value: summed duration per span (parallel spans can exceed ``total``)."""
+        with self.lock:
+            spans = list(self.spans.items())
+        parts = [f'{name};dur={s * 1000:.1f}' + (f';desc="x{n}"' if n > 1 else "") for name, (s, n) in spans]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def start():
+    """Open a trace for the current request (None when disabled)."""
+    if not ENABLED:
+        return None
+    t = Trace()
+    _current.set(t)
+    return t
+
+
+def finish():
+    # plain set, not reset(token): a streamed response ends in another context than it began
+    _current.set(None)
+
+
+class _Span:
+    __slots__ = ("trace", "name", "t0")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        self.trace.add(self.name, elapsed)
+        SPAN_SECONDS.observe(elapsed, (self.name,))
+
+
+def span(name):
+    t = _current.get()
+    return _NOOP if t is None else _Span(t, name)
+
+
+def traced(name):
+    """Decorator: run the function (sync or ``async def``) inside ``span(name)``."""
+    def deco(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+@contextlib.contextmanager
+def failures():
+    """Collect what degraded the work done in this block: adapter calls that fell
+    back to their default, calls cut off by a deadline, unresolved authors."""
+    seen = []
+    token = _failures.set(seen)
+    try:
+        yield seen
+    finally:
+        _failures.reset(token)
+
+
+def note_failure(name):
+    seen = _failures.get()
+    if seen is not None:
+        seen.append(name)
+
+
+def bind(fn):
+    """``fn`` bound to the caller's trace, profile and failure log, for handing to a thread pool."""
+    if _current.get() is None and profiler.current.get() is None and _failures.get() is None:
+        return fn
+    return functools.partial(contextvars.copy_context().run, _bound, fn)
+
+
+def _bound(fn, *args, **kwargs):
+    p = profiler.current.get()
+    if p is None:
+        return fn(*args, **kwargs)
+    # the worker thread is sampled for this request while it runs the call
+    with p.attached():
+        return fn(*args, **kwargs)
+
+
+def observe_upstream(host, status, elapsed):
+    if ENABLED:
+        UPSTREAM_SECONDS.observe(elapsed, (host, str(status or "error")))
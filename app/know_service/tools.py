@@ -1,8 +1,15 @@
+TOOLS = [
+    {"name":"openBibliography","description":"Open the Bibliography page with filters",
+     "schema":{"type":"object","properties":{"query":{"type":"string"},
+               "type":{"type":"string","enum":["book","article","chapter","edited volume","thesis","other"]},
+               "yearMin":{"type":"integer"},"yearMax":{"type":"integer"}}},"confirm":False,
+     "triggers":["open bibliography","open the bibliography"]},
+    {"name":"copyWikiBlock","description":"Copy the current Wikipedia block to clipboard",
+     "schema":{"type":"object","properties":{"selection":{"type":"string"}}},"confirm":True,
+     "triggers":["copy wikipedia block","copy wiki block"]}
+]
+
+INTERNAL_KEYS = {"triggers"}  # matching rules for prompts.propose_tool, not part of the public listing
+
 def list_tools(site_id: str):
-    return [
-        {"name":"openBibliography","description":"Open the Bibliography page with filters",
-         "schema":{"type":"object","properties":{"query":{"type":"string"},"type":{"type":"string"},
-                   "yearMin":{"type":"integer"},"yearMax":{"type":"integer"}}},"confirm":False},
-        {"name":"copyWikiBlock","description":"Copy the current Wikipedia block to clipboard",
-         "schema":{"type":"object","properties":{"selection":{"type":"string"}}},"confirm":True}
-    ]
+    return [{k: v for k, v in t.items() if k not in INTERNAL_KEYS} for t in TOOLS]
@@ -0,0 +1,230 @@
+"""Full-text index of vault pages and bibliography records for grounding /query.
+
+Documents are split into chunks and kept in an SQLite FTS5 table, which is an
+on-disk inverted index ranked with BM25. Ingest is incremental: a document
+whose content hash is unchanged is skipped. A run is one transaction, so an
+error anywhere in a stream (a bad line, a failed signature check at its end)
+leaves the index as it was; under WAL, readers keep going meanwhile.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .dedupe import work_key
+from .master import MASTER_DB, MasterStore
+
+VAULT_DB = os.getenv("KNOW_VAULT_DB", "data/vault.sqlite3")
+CHUNK_CHARS = int(os.getenv("KNOW_CHUNK_CHARS", "1200"))
+QA_FEED = os.getenv("KNOW_QA_FEED", "qa-feed.json")
+RECORD_FIELDS = ["title", "journal_or_publisher", "year", "type", "citation", "doi", "isbn"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    site_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    chunks INTEGER NOT NULL,
+    rowids TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (site_id, id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+    title, body, site_id UNINDEXED, doc_id UNINDEXED, url UNINDEXED,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+STOPWORDS = frozenset("""a an and are as at be by did do does for from how in is it of on or tell the
+this to was what when where which who why with about me please""".split())
+
+
+def chunk_text(text, size=CHUNK_CHARS):
+    """Split on paragraphs, packing them into chunks of at most ``size`` characters."""
+    pieces = []
+    for para in re.split(r"\n\s*\n", text or ""):
+        para = " ".join(para.split())
+        if len(para) <= size:
+            pieces.append(para)
+            continue
+        for sentence in SENTENCE_RE.split(para):
+            while len(sentence) > size:
+                cut = sentence.rfind(" ", 0, size)
+                cut = cut if cut > 0 else size
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:].strip()
+            pieces.append(sentence)
+    chunks, cur = [], ""
+    for p in filter(None, pieces):
+        if cur and len(cur) + 1 + len(p) > size:
+            chunks.append(cur)
+            cur = p
+        else:
+            cur = f"{cur} {p}" if cur else p
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def as_document(item):
+    """Normalize a page (``text``/``content``/``body``) or a bibliography record into a doc dict."""
+    text = item.get("text") or item.get("content") or item.get("body") or item.get("answer")
+    if text:
+        kind = "page"
+    else:
+        kind = "record"
+        text = ". ".join(str(item[f]) for f in RECORD_FIELDS if item.get(f))
+    title = item.get("title") or item.get("question") or ""
+    url = item.get("url") or (f"https://doi.org/{item['doi']}" if item.get("doi") else "")
+    doc_id = str(item.get("id") or item.get("key") or url or item.get("doi") or item.get("isbn") or title)
+    if not doc_id or not text:
+        return None
+    return {"id": doc_id, "kind": kind, "title": title, "url": url, "text": text}
+
+
+def match_query(text):
+    """FTS5 query OR-ing the words of free text, each quoted so user input is never syntax."""
+    words = [w for w in WORD_RE.findall((text or "").lower()) if len(w) > 1 and w not in STOPWORDS]
+    return " OR ".join(f'"{w}"' for w in dict.fromkeys(words))
+
+
+def vault_sources(qa_feed=QA_FEED, master_db=MASTER_DB):
+    """The vault's own content: the Q&A feed, then every master bibliography record."""
+    if Path(qa_feed).exists():
+        with open(qa_feed, encoding="utf-8") as f:
+            try:
+                feed = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"bad {qa_feed}: {e}")
+        yield from feed
+    if Path(master_db).exists():
+        for row in MasterStore(master_db).rows():
+            yield {"id": work_key(row), **row}
+
+
+class VaultIndex:
+    def __init__(self, path=VAULT_DB):
+        self.path = path
+        self.local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db.executescript(SCHEMA)
+
+    @property
+    def db(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def ingest(self, site_id, items, full=False):
+        """Index an iterable of pages/records; returns real counts for this run.
+
+        With ``full`` the site's documents not seen in ``items`` are dropped,
+        so a full ingest leaves the index matching its input exactly. Any
+        exception raised while ``items`` is consumed rolls the whole run back.
+        """
+        stats = {"docs": 0, "added": 0, "updated": 0, "unchanged": 0, "skipped": 0, "removed": 0, "chunks": 0}
+        seen = set()
+        db = self.db
+        db.execute("BEGIN")
+        try:
+            for item in items:
+                doc = as_document(item) if isinstance(item, dict) else None
+                if doc is None:
+                    stats["skipped"] += 1
+                    continue
+                stats["docs"] += 1
+                seen.add(doc["id"])
+                digest = hashlib.sha1(json.dumps([doc["title"], doc["url"], doc["text"]]).encode()).hexdigest()
+                row = db.execute("SELECT hash, rowids FROM docs WHERE site_id = ? AND id = ?",
+                                 (site_id, doc["id"])).fetchone()
+                if row and row[0] == digest:
+                    stats["unchanged"] += 1
+                    continue
+                if row:
+                    self._drop_chunks(row[1])
+                stats["updated" if row else "added"] += 1
+                chunks = chunk_text(doc["text"])
+                rowids = [db.execute("INSERT INTO chunks (title, body, site_id, doc_id, url) VALUES (?, ?, ?, ?, ?)",
+                                     (doc["title"], c, site_id, doc["id"], doc["url"])).lastrowid for c in chunks]
+                db.execute(
+                    "INSERT OR REPLACE INTO docs (site_id, id, kind, title, url, hash, chunks, rowids, updated)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (site_id, doc["id"], doc["kind"], doc["title"], doc["url"], digest, len(chunks),
+                     json.dumps(rowids), time.time()),
+                )
+                stats["chunks"] += len(chunks)
+            if full:
+                stale = [(i, r) for i, r in db.execute("SELECT id, rowids FROM docs WHERE site_id = ?", (site_id,))
+                         if i not in seen]
+                for doc_id, rowids in stale:
+                    self._drop_chunks(rowids)
+                    db.execute("DELETE FROM docs WHERE site_id = ? AND id = ?", (site_id, doc_id))
+                stats["removed"] = len(stale)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        stats.update(self.stats(site_id))
+        return stats
+
+    def _drop_chunks(self, rowids):
+        # FTS5 rows are found by rowid; filtering on the UNINDEXED doc_id would scan the table
+        self.db.executemany("DELETE FROM chunks WHERE rowid = ?", [(r,) for r in json.loads(rowids)])
+
+    def version(self):
+        """Changes whenever any document is added, replaced or removed."""
+        count, updated = self.db.execute("SELECT COUNT(*), MAX(updated) FROM docs").fetchone()
+        return f"{count}:{updated}"
+
+    def stats(self, site_id):
+        pages, records, chunks = self.db.execute(
+            "SELECT COALESCE(SUM(kind = 'page'), 0), COALESCE(SUM(kind = 'record'), 0), COALESCE(SUM(chunks), 0)"
+            " FROM docs WHERE site_id = ?", (site_id,)).fetchone()
+        return {"pages": pages, "records": records, "total_chunks": chunks}
+
+    def search(self, site_id, text, limit=5):
+        """Best chunks for free text, BM25-ranked with title matches weighted up."""
+        q = match_query(text)
+        if not q:
+            return []
+        rows = self.db.execute(
+            "SELECT doc_id, title, url, snippet(chunks, 1, '', '', '…', 40), bm25(chunks, 4.0, 1.0) AS score"
+            " FROM chunks WHERE chunks MATCH ? AND site_id = ? ORDER BY score LIMIT ?",
+            (q, site_id, limit * 3),
+        ).fetchall()
+        hits, docs = [], set()
+        for doc_id, title, url, snippet, score in rows:
+            if doc_id in docs:
+                continue
+            docs.add(doc_id)
+            hits.append({"id": doc_id, "title": title, "url": url, "snippet": snippet, "score": round(-score, 3)})
+            if len(hits) == limit:
+                break
+        return hits
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def vault_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VaultIndex(VAULT_DB)
+    return _index
@@ -0,0 +1,143 @@
+"""Wire formats for cartography graphs.
+
+``json`` is the graph as compiled. ``compact`` is a columnar form of the same
+graph for large rosters:
+
+    {"format": "know-graph/compact-1",
+     "strings": [null, "concept:assemblage", "concept", ...],  # every string, once
+     "nodes": {"id": [1, 1, ...], "type": [2, 0, ...], "label": [...], "code": [...],
+               "orcid": [...], "url": [...], "doi": [...], "year": [2020, ...]},
+     "edges": {"source": [...], "target": [...], "kind": [...]},
+     "refs": {"#ASS": [...]}}
+
+String columns hold indices into ``strings`` (0 is null), edges and refs hold
+node positions, and every one of those integer lists is delta-coded: each
+entry is the difference from the previous one. Strings are numbered column by
+column, so a column of fresh titles or DOIs codes as a run of 1s; that keeps
+the body small both raw and gzipped. ``year`` holds plain integers or null. A
+ref's title, url and year are its work node's label, url and year; its DOI
+goes in the ``doi`` column. ``expand`` turns the compact form back into the
+compiled graph.
+
+Both forms are encoded as JSON with orjson or, when the ``msgpack`` package
+is installed, as MessagePack.
+"""
+import itertools
+import operator
+from operator import itemgetter
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+COMPACT = "know-graph/compact-1"
+STRING_COLUMNS = ["id", "type", "label", "code", "orcid", "url", "doi"]
+MEDIA_TYPES = {
+    "json": "application/json",
+    "compact": "application/vnd.know.graph+json",
+    "compact-msgpack": "application/vnd.know.graph+msgpack",
+}
+
+
+class WireFormatError(ValueError):
+    pass
+
+
+def dumps(value) -> bytes:
+    return orjson.dumps(value)
+
+
+def _delta(xs):
+    return list(map(operator.sub, xs, [0] + xs[:-1]))
+
+
+def _undelta(xs):
+    return list(itertools.accumulate(xs))
+
+
+def compact(graph):
+    nodes, edges = graph["nodes"], graph["edges"]
+    ids = [n["id"] for n in nodes]
+    # the first node with an id wins, as in the compiled graph's edges
+    position = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+    at = position.__getitem__
+
+    dois = [None] * len(nodes)
+    refs = {}
+    for code, items in graph.get("refs", {}).items():
+        # refs are built from work nodes, whose id is doi, else url, else title
+        out = refs[code] = [at(r.get("doi") or r.get("url") or r["title"]) for r in items]
+        for i, r in zip(out, items):
+            dois[i] = r.get("doi")
+
+    # one string table for every column, numbered column by column in order of
+    # first appearance, so a column of fresh titles or DOIs delta-codes as 1s
+    values = [None]
+    for c in STRING_COLUMNS:
+        values += ids if c == "id" else dois if c == "doi" else [n.get(c) for n in nodes]
+    values += map(itemgetter("kind"), edges)
+    strings = list(dict.fromkeys(values))
+    codes = list(map(dict(zip(strings, range(len(strings)))).__getitem__, values))
+
+    n = len(nodes)
+    columns = {c: _delta(codes[1 + k * n:1 + (k + 1) * n]) for k, c in enumerate(STRING_COLUMNS)}
+    columns["year"] = [node.get("year") for node in nodes]
+    links = {"source": _delta(list(map(at, map(itemgetter("source"), edges)))),
+             "target": _delta(list(map(at, map(itemgetter("target"), edges)))),
+             "kind": _delta(codes[1 + len(STRING_COLUMNS) * n:])}
+    return {"format": COMPACT, "strings": strings, "nodes": columns, "edges": links,
+            "refs": {code: _delta(items) for code, items in refs.items()}}
+
+
+def expand(data):
+    """The compiled graph back from ``compact`` output."""
+    strings = data["strings"]
+    cols = {c: [strings[i] for i in _undelta(data["nodes"][c])] for c in STRING_COLUMNS}
+    years = data["nodes"]["year"]
+    nodes = []
+    for i, (nid, kind, label) in enumerate(zip(cols["id"], cols["type"], cols["label"])):
+        n = {"id": nid, "type": kind, "label": label}
+        if kind == "concept":
+            n["code"] = cols["code"][i]
+        elif kind == "author":
+            n.update(orcid=cols["orcid"][i], code=cols["code"][i])
+        else:
+            n.update(year=years[i], url=cols["url"][i])
+        nodes.append(n)
+    e = data["edges"]
+    edges = [{"source": cols["id"][a], "target": cols["id"][b], "kind": strings[k]}
+             for a, b, k in zip(_undelta(e["source"]), _undelta(e["target"]), _undelta(e["kind"]))]
+    refs = {code: [{"title": cols["label"][i], "url": cols["url"][i], "doi": cols["doi"][i], "year": years[i]}
+                   for i in _undelta(items)]
+            for code, items in data["refs"].items()}
+    return {"nodes": nodes, "edges": edges, "refs": refs}
+
+
+def negotiate(requested, accept):
+    """Wire format from an explicit ``format`` value or the Accept header (a werkzeug MIMEAccept)."""
+    if requested:
+        if requested not in MEDIA_TYPES:
+            raise WireFormatError(f"format must be one of {', '.join(MEDIA_TYPES)}")
+        fmt = requested
+    else:
+        fmt = max(MEDIA_TYPES, key=lambda f: accept.quality(MEDIA_TYPES[f]))
+        if accept.quality(MEDIA_TYPES[fmt]) <= accept.quality("application/json"):
+            fmt = "json"
+    if fmt == "compact-msgpack" and msgpack is None:
+        raise WireFormatError("MessagePack is not available on this server; use format=compact")
+    return fmt
+
+
+def encode(graph, fmt="json"):
+    """``(body bytes, media type)`` for ``graph`` in wire format ``fmt``."""
+    if fmt == "json":
+        return dumps(graph), MEDIA_TYPES[fmt]
+    data = compact(graph)
+    if fmt == "compact-msgpack":
+        if msgpack is None:
+            raise WireFormatError("MessagePack is not available on this server; use format=compact")
+        return msgpack.packb(data, use_bin_type=True), MEDIA_TYPES[fmt]
+    return dumps(data), MEDIA_TYPES[fmt]
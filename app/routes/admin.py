@@ -0,0 +1,101 @@
+"""Operator routes behind ``KNOW_ADMIN_TOKEN``: arm the sampling profiler and fetch its captures.
+
+    curl -XPOST -H "Authorization: Bearer $TOKEN" $API/api/admin/profile -d '{"requests": 5}'
+    curl -XPOST -H "Authorization: Bearer $TOKEN" $API/api/admin/profile -d '{"thresholdMs": 2000, "ttlSeconds": 600}'
+    curl -H "Authorization: Bearer $TOKEN" $API/api/admin/profiles/<id> | flamegraph.pl > compile.svg
+
+A single request can also ask for itself to be profiled with ``X-Know-Profile: 1``
+plus the same Authorization header; its capture id comes back in ``X-Know-Profile-Id``.
+"""
+import hmac
+import os
+import time
+
+from flask import Blueprint, Response, g, request
+
+from ..know_service import profiler
+
+ADMIN_TOKEN = os.getenv("KNOW_ADMIN_TOKEN", "")
+
+bp = Blueprint("admin", __name__)
+
+
+def authorized():
+    given = request.headers.get("Authorization", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(given.encode(), f"Bearer {ADMIN_TOKEN}".encode())
+
+
+@bp.before_request
+def require_token():
+    if not ADMIN_TOKEN:
+        return {"ok": False, "error": "admin routes are disabled (set KNOW_ADMIN_TOKEN)"}, 403
+    if not authorized():
+        return {"ok": False, "error": "unauthorized"}, 401
+
+
+@bp.post("/profile")
+def arm_profiler():
+    body = request.get_json(force=True, silent=True) or {}
+    try:
+        state = profiler.arming.arm(
+            requests=int(body.get("requests") or 0),
+            threshold_ms=float(body["thresholdMs"]) if body.get("thresholdMs") is not None else None,
+            prefix=str(body.get("prefix") or ""),
+            ttl=float(body["ttlSeconds"]) if body.get("ttlSeconds") is not None else None,
+        )
+    except (TypeError, ValueError):
+        return {"ok": False, "error": "requests, thresholdMs and ttlSeconds must be numbers"}, 400
+    return {"ok": True, "armed": state}
+
+
+@bp.delete("/profile")
+def disarm_profiler():
+    return {"ok": True, "armed": profiler.arming.disarm()}
+
+
+@bp.get("/profiles")
+def profiles():
+    return {"ok": True, "armed": profiler.arming.state(), "profiles": profiler.list_profiles()}
+
+
+@bp.get("/profiles/<profile_id>")
+def profile(profile_id):
+    stacks = profiler.load_profile(profile_id)
+    if stacks is None:
+        return {"ok": False, "error": "no such profile"}, 404
+    return Response(stacks, mimetype="text/plain")
+
+
+@bp.delete("/profiles")
+def clear_profiles():
+    profiler.clear_profiles()
+    return {"ok": True}
+
+
+def profile_requests(app):
+    @app.before_request
+    def open_profile():
+        if request.blueprint == "admin":
+            return
+        reason = "header" if request.headers.get("X-Know-Profile") and authorized() else None
+        reason = reason or profiler.arming.claim(request.path)
+        if reason:
+            g.profile = profiler.start(reason)
+            g.profile_t0 = time.perf_counter()
+
+    @app.after_request
+    def profile_id(resp):
+        p = g.get("profile")
+        if p is not None and p.reason != "threshold":
+            resp.headers["X-Know-Profile-Id"] = p.id
+        return resp
+
+    @app.teardown_request
+    def close_profile(exc):
+        p = g.pop("profile", None)
+        if p is None:
+            return
+        seconds = time.perf_counter() - g.profile_t0
+        threshold = profiler.arming.state()["thresholdMs"]
+        keep = p.reason != "threshold" or (threshold is not None and seconds * 1000 >= threshold)
+        profiler.stop(p, request.path, seconds, keep=keep)
@@ -0,0 +1,129 @@
+"""Conditional-response cache for deterministic JSON views.
+
+A view's serialized body is memoized under its canonicalized request (path,
+sorted query args, Accept, JSON body with sorted keys) plus a version string, e.g.
+the scholar catalog's content hash. Responses carry a strong ETag over the
+exact bytes, and a matching ``If-None-Match`` gets an empty 304.
+
+That includes POST views such as /query and /cartography/compile, whose
+request is their body. This departs from RFC 9110 §13.1.2, which answers
+If-None-Match on other methods than GET/HEAD with 412. It is deliberate:
+the widget and graph page revalidate their own POSTs this way. Shared
+caches do not store POST responses, so only a client that sent the ETag
+back ever sees such a 304.
+
+A view that built its answer from partial upstream data calls ``degraded()``
+so the entry expires after ``KNOW_DEGRADED_TTL`` seconds instead of the
+view's ttl.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, current_app, g, request
+
+from ..know_service.telemetry import span
+
+MAX_ENTRIES = int(os.getenv("KNOW_RESPONSE_CACHE_SIZE", "512"))
+DEGRADED_TTL = float(os.getenv("KNOW_DEGRADED_TTL", "15"))
+
+
+class ResponseMemo:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] <= time.time():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, body, ttl, mimetype="application/json"):
+        entry = (body, hashlib.sha256(body).hexdigest()[:32], time.time() + ttl, mimetype)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+memo = ResponseMemo()
+
+
+def canonical_key(method, path, args, accept, body, version=""):
+    canonical = json.dumps([method, path, sorted(args), accept, body, version],
+                           sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def request_key(version=""):
+    body = request.get_json(silent=True)
+    if body is None:
+        body = request.get_data(as_text=True)
+    return canonical_key(request.method, request.path, request.args.items(multi=True),
+                         request.headers.get("Accept"), body, version)
+
+
+def degraded(ttl=DEGRADED_TTL):
+    """Memoize the current request's response for at most ``ttl`` seconds."""
+    g.memo_ttl = min(ttl, g.get("memo_ttl", ttl))
+
+
+def http_cached(ttl=300, cache_control="no-cache", version=None, vary=None):
+    """Memoize a JSON view for ``ttl`` seconds and answer revalidations with 304.
+
+    ``version`` is a callable whose result joins the key, so a catalog or
+    index change misses immediately instead of waiting out the ttl. ``vary``
+    names the request headers the view negotiates on; it is sent as ``Vary``
+    on every response, streamed ones included. Streamed and non-200 responses
+    are otherwise passed through untouched.
+    """
+    def deco(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request_key(version() if version else "")
+            entry = memo.get(key)
+            if entry is None:
+                result = view(*args, **kwargs)
+                with span("serialize"):
+                    resp = current_app.make_response(result)
+                    if resp.status_code != 200 or resp.is_streamed:
+                        if vary:
+                            resp.vary.add(vary)
+                        return resp
+                    entry = memo.put(key, resp.get_data(), g.pop("memo_ttl", ttl), resp.mimetype)
+            body, etag, _, mimetype = entry
+            if request.if_none_match.contains(etag):
+                resp = Response(status=304)
+            else:
+                resp = Response(body, mimetype=mimetype)
+            resp.set_etag(etag)
+            resp.headers["Cache-Control"] = cache_control
+            if vary:
+                resp.vary.add(vary)
+            return resp
+        return wrapper
+    return deco
@@ -1,12 +1,34 @@
-from flask import Blueprint, request
+import base64
+import hashlib
+import hmac
+import json
+import os
+from flask import Blueprint, Response, request, stream_with_context
 from ..know_service.prompts import answer_stub, propose_tool
 from ..know_service.tools import list_tools
-from ..know_service.people import resolve
-from ..know_service.works import fetch_for
+from ..know_service.cartography import compile_events, compile_graph
+from ..know_service.batch import MAX_AUTHORS, expand_authors, fetch_batch, resolve_batch
+from ..know_service.works import window_from
+from ..know_service.vault import vault_index, vault_sources
+from ..know_service.search import MAX_LIMIT, SearchError, work_search
+from ..know_service.catalog import catalog_version
+from ..know_service.prewarm import prewarmer
+from ..know_service.telemetry import failures, span
+from ..know_service.wire import WireFormatError, dumps, encode, negotiate
+from .http_cache import degraded, http_cached
+from dataclasses import asdict
 
 bp = Blueprint("know_v1", __name__)
 
+# the ingest workflow signs its body with this: base64(HMAC-SHA256(secret, body)) in X-Signature
+INGEST_SECRET = os.getenv("KNOW_INGEST_SECRET") or os.getenv("HMAC_SECRET", "")
+
+def _query_version():
+    return f"{catalog_version()}:{vault_index().version()}"
+
+
 @bp.post("/query")
+@http_cached(ttl=300, version=_query_version)
 def query():
     body = request.get_json(force=True)
     site_id = body.get("siteId","buchanan-vault")
@@ -14,60 +36,222 @@ def query():
     tool = propose_tool(msg)
     if tool:
         return tool
-    return {"answer": answer_stub(site_id, msg), "citations": [{"title":"Bibliography","url":"/bibliography"}]}
+    hits = vault_index().search(site_id, msg, limit=3) if msg else []
+    citations = [{"title": h["title"] or h["url"], "url": h["url"]} for h in hits if h["url"]]
+    return {"answer": answer_stub(site_id, msg, hits),
+            "citations": citations or [{"title":"Bibliography","url":"/bibliography"}]}
 
 @bp.get("/tools")
+@http_cached(ttl=3600, cache_control="public, max-age=300, s-maxage=3600, stale-while-revalidate=86400")
 def tools():
     site_id = request.args.get("siteId") or "buchanan-vault"
     return list_tools(site_id)
 
+class SignatureError(Exception):
+    pass
+
+
+def _signer(data=b""):
+    return hmac.new(INGEST_SECRET.encode(), data, hashlib.sha256)
+
+
+def _signed(mac):
+    given = request.headers.get("X-Signature", "").encode()
+    return hmac.compare_digest(given, base64.b64encode(mac.digest()))
+
+
+def _signed_lines(stream):
+    """Yield ``stream``'s lines, hashing them as they go; a signature mismatch
+    raises at the end, after the last line, so the ingest rolls back."""
+    mac = _signer()
+    for line in stream:
+        mac.update(line)
+        yield line
+    if not _signed(mac):
+        raise SignatureError("bad or missing X-Signature")
+
+
 @bp.post("/ingest")
 def ingest():
-    # stub: accept payload so you can wire this later
-    body = request.get_json(force=True)
-    return {"ok": True, "stats": {"pages": 3, "chunks": 42}}
+    # NDJSON bodies (one page/record per line) are indexed line by line;
+    # a JSON body carries small batches, or just {siteId, forceFull} to reindex the vault's own content
+    if not INGEST_SECRET:
+        return {"ok": False, "error": "ingest is disabled (set KNOW_INGEST_SECRET)"}, 403
+    site_id = request.headers.get("X-Site-Id") or request.args.get("siteId") or "buchanan-vault"
+    full = request.args.get("forceFull") in ("1", "true")
+    if request.mimetype == "application/x-ndjson":
+        items = _ndjson(_signed_lines(request.stream))
+    else:
+        if not _signed(_signer(request.get_data(cache=True))):
+            return {"ok": False, "error": "bad or missing X-Signature"}, 401
+        body = request.get_json(force=True, silent=True)
+        if not isinstance(body, dict):
+            return {"ok": False, "error": "body must be a JSON object or NDJSON"}, 400
+        site_id = body.get("siteId") or site_id
+        full = full or bool(body.get("forceFull"))
+        items = list(body.get("pages") or []) + list(body.get("records") or [])
+        if not items:
+            items = vault_sources()
+    try:
+        stats = vault_index().ingest(site_id, items, full=full)
+    except SignatureError as e:
+        return {"ok": False, "error": str(e)}, 401
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}, 400
+    return {"ok": True, "siteId": site_id, "stats": stats}
+
+
+def _ndjson(stream):
+    for n, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"bad NDJSON line {n}: {e}")
+
+
+def compile_version():
+    return f"{catalog_version()}:{prewarmer.generation}"
 
 
 @bp.post("/cartography/compile")
+@http_cached(ttl=600, version=compile_version, vary="Accept")
 def compile_cartography():
     body = request.get_json(force=True) or {}
-    prompt = body.get("prompt", "")
-    mode = body.get("mode", "concept_lineage")
-
-    names = []
-    concepts = []
-    lower = prompt.lower()
-    if "assemblage" in lower:
-        concepts.append("assemblage")
-    if "across" in lower:
-        after = prompt.split("across", 1)[1]
-        names = [n.strip(" .") for n in after.replace(" and ", ",").split(",") if n.strip()]
-    else:
-        names = [prompt]
-
-    persons = resolve(names)
-    nodes = []
-    edges = []
-    refs = {}
-    for c in concepts:
-        cid = f"concept:{c}"
-        code = f"#{c[:3].upper()}"
-        nodes.append({"id": cid, "type": "concept", "label": c, "code": code})
-        refs[code] = []
-
-    for p in persons:
-        aid = p.orcid or p.name
-        code = "".join(w[0].upper() for w in p.name.split())
-        nodes.append({"id": aid, "type": "author", "label": p.name, "orcid": p.orcid, "code": code})
-        works = fetch_for(p, concepts)
-        for w in works:
-            wid = w.get("doi") or w.get("url") or w["title"]
-            nodes.append({"id": wid, "type": "work", "label": w["title"], "year": w.get("year"), "url": w.get("url")})
-            edges.append({"source": aid, "target": wid, "kind": "authored"})
-            for c in concepts:
-                if c.lower() in (w.get("title", "").lower()):
-                    edges.append({"source": f"concept:{c}", "target": wid, "kind": "concept"})
-                    code = f"#{c[:3].upper()}"
-                    refs[code].append({"title": w["title"], "url": w.get("url"), "doi": w.get("doi"), "year": w.get("year")})
-
-    return {"nodes": nodes, "edges": edges, "refs": refs}
+    try:
+        prompt, mode, window = compile_args(body)
+    except ValueError:
+        return {"ok": False, "error": "ymin and ymax must be integers"}, 400
+    stream = _stream_format(body)
+    if stream:
+        return _stream(compile_events(prompt, mode, window=window), stream)
+    try:
+        fmt = negotiate(request.args.get("format") or body.get("format"), request.accept_mimetypes)
+    except WireFormatError as e:
+        return {"ok": False, "error": str(e)}, 400
+    graph = prewarmer.lookup(prompt, mode, window)
+    if graph is None:
+        with failures() as failed:
+            graph = compile_graph(prompt, mode, window=window)
+        if failed:
+            degraded()
+    with span("serialize"):
+        payload, mimetype = encode(graph, fmt)
+    return Response(payload, mimetype=mimetype)
+
+
+STREAM_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def stream_format(requested, accept):
+    """``ndjson``/``sse`` from an explicit ``stream`` value or the Accept header, else None."""
+    if requested in STREAM_TYPES:
+        return requested
+    for fmt, mimetype in STREAM_TYPES.items():
+        if accept.quality(mimetype) > accept.quality("application/json"):
+            return fmt
+    return None
+
+
+def encode_event(ev, fmt):
+    data = dumps(ev).decode()
+    if fmt == "sse":
+        return f"event: {ev['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def compile_args(body):
+    """``(prompt, mode, window)`` from a compile body; raises ValueError on bad years."""
+    try:
+        window = window_from(body.get("ymin"), body.get("ymax"))
+    except TypeError as e:
+        raise ValueError(e)
+    return body.get("prompt", ""), body.get("mode", "concept_lineage"), window
+
+
+def _stream_format(body):
+    return stream_format(request.args.get("stream") or body.get("stream"), request.accept_mimetypes)
+
+
+def _stream(events, fmt):
+    lines = (encode_event(ev, fmt) for ev in events)
+    return Response(stream_with_context(lines), mimetype=STREAM_TYPES[fmt], headers=STREAM_HEADERS)
+
+
+def _split(v):
+    if isinstance(v, str):
+        return [x.strip() for x in v.split(",") if x.strip()]
+    return [x for x in (v or []) if isinstance(x, str) and x.strip()]
+
+
+def _works_batch(args, authors=None):
+    entries, group_concepts = expand_authors(_split(args.get("authors")) if authors is None else authors,
+                                             args.get("group"))
+    if not entries:
+        return None
+    concepts = _split(args.get("concepts")) or group_concepts
+    window = window_from(args.get("ymin"), args.get("ymax"))
+    return fetch_batch(entries, concepts, window, args.get("limit") or 5), concepts, window
+
+
+@bp.post("/people/resolve")
+def people_resolve():
+    body = request.get_json(force=True) or {}
+    names = _split(body.get("names"))
+    if not names:
+        return {"ok": False, "error": "names required"}, 400
+    if len(names) > MAX_AUTHORS:
+        return {"ok": False, "error": f"at most {MAX_AUTHORS} names per request"}, 400
+    return {"ok": True, "people": [{"query": q, "person": asdict(p)} for p, q in resolve_batch(names)]}
+
+
+@bp.post("/works/batch")
+def works_batch():
+    body = request.get_json(force=True) or {}
+    try:
+        res = _works_batch(body)
+    except (TypeError, ValueError):
+        return {"ok": False, "error": "ymin, ymax and limit must be integers"}, 400
+    if res is None:
+        return {"ok": False, "error": "authors or group required"}, 400
+    results, concepts, window = res
+    return {"ok": True, "concepts": concepts, "window": window, "results": results}
+
+
+@bp.get("/catalog/works")
+def catalog_works():
+    try:
+        # repeat authors= for names with commas ("Buchanan, Ian"); a single value is a comma list
+        authors = request.args.getlist("authors")
+        res = _works_batch(request.args, _split(authors) if len(authors) > 1 else None)
+    except (TypeError, ValueError):
+        return {"ok": False, "error": "ymin, ymax and limit must be integers"}, 400
+    if res is None:
+        return {"ok": False, "error": "authors or group required"}, 400
+    works = [dict(w, author=r["person"]["name"], orcid=r["person"]["orcid"]) for r in res[0] for w in r["works"]]
+    return {"ok": True, "works": works}
+
+
+@bp.get("/search")
+def search_works():
+    # parameter names also accept openBibliography's tool args (query, yearMin, yearMax)
+    args = request.args
+    try:
+        ymin = args.get("ymin") or args.get("yearMin")
+        ymax = args.get("ymax") or args.get("yearMax")
+        ymin = int(ymin) if ymin else None
+        ymax = int(ymax) if ymax else None
+        limit = max(1, min(int(args.get("limit") or 20), MAX_LIMIT))
+    except ValueError:
+        return {"ok": False, "error": "ymin, ymax and limit must be integers"}, 400
+    try:
+        res = work_search().search(
+            q=args.get("q") or args.get("query"), ymin=ymin, ymax=ymax,
+            types=_split(args.get("type")), authors=_split(args.get("author")),
+            concepts=_split(args.get("concept")), limit=limit, cursor=args.get("cursor"),
+        )
+    except SearchError as e:
+        return {"ok": False, "error": str(e)}, 400
+    return {"ok": True, **res}
@@ -0,0 +1,69 @@
+"""Server-Timing on every response and Prometheus metrics at ``/api/metrics``."""
+import time
+
+from flask import Blueprint, Response, g, request
+
+from ..know_service import telemetry
+from ..know_service.ext import cache, http
+from .http_cache import memo
+
+bp = Blueprint("metrics", __name__)
+
+
+def _endpoint():
+    # the URL rule, not the path, so label cardinality stays bounded
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def instrument(app):
+    if not telemetry.ENABLED:
+        return
+
+    @app.before_request
+    def open_trace():
+        g.trace = telemetry.start()
+        g.endpoint = _endpoint()
+        telemetry.IN_FLIGHT.inc((g.endpoint,))
+
+    @app.after_request
+    def server_timing(resp):
+        trace = g.get("trace")
+        if trace is not None:
+            resp.headers["Server-Timing"] = trace.server_timing()
+            g.status = resp.status_code
+        return resp
+
+    @app.teardown_request
+    def close_trace(exc):
+        # runs after a streamed body is drained, so streams are timed in full
+        trace = g.pop("trace", None)
+        if trace is None:
+            return
+        status = 500 if exc is not None else g.get("status", 500)
+        telemetry.REQUEST_SECONDS.observe(time.perf_counter() - trace.started, (g.endpoint, request.method, str(status)))
+        telemetry.IN_FLIGHT.inc((g.endpoint,), -1)
+        telemetry.finish()
+
+
+def render():
+    lines = []
+    for metric in telemetry.REGISTRY:
+        lines += metric.render()
+    hosts = http.metrics()
+    lines += telemetry.counter("know_upstream_calls_total", "Upstream HTTP attempts by host.",
+                               {(h,): s["calls"] for h, s in hosts.items()}, ("host",))
+    lines += telemetry.counter("know_upstream_retries_total", "Upstream retries by host.",
+                               {(h,): s["retries"] for h, s in hosts.items()}, ("host",))
+    caches = {"upstream": cache.store().stats() if cache.store() else {}, "response": memo.stats()}
+    for name, s in caches.items():
+        lookups = s.get("hits", 0) + s.get("stale_hits", 0) + s.get("misses", 0)
+        lines += telemetry.counter(f"know_{name}_cache_lookups_total", f"{name.title()} cache lookups by outcome.",
+                                   {(k,): s[k] for k in ("hits", "stale_hits", "misses") if k in s}, ("outcome",))
+        lines += telemetry.gauge(f"know_{name}_cache_hit_ratio", f"{name.title()} cache hits (stale included) per lookup.",
+                                 {(): (lookups - s.get("misses", 0)) / lookups if lookups else 0.0})
+    return "\n".join(lines) + "\n"
+
+
+@bp.get("/metrics")
+def metrics():
+    return Response(render(), mimetype="text/plain; version=0.0.4")
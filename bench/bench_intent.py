@@ -0,0 +1,43 @@
+"""Per-call latency of /query intent routing as the tool list grows.
+
+    python bench/bench_intent.py [calls]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app.know_service.intent import Rules, extract_slots
+from app.know_service.prompts import SLOTS, TOOL_RULES, answer_stub, propose_tool
+from app.know_service.tools import TOOLS
+
+MESSAGES = [
+    "open bibliography for assemblage 2000–2010",
+    "Open the bibliography for war machine type edited volume since 1995",
+    "copy wiki block",
+    "what is assemblage theory?",
+    "hello there",
+]
+
+
+def per_call(fn, calls):
+    return min(timeit.repeat(fn, number=calls, repeat=5)) / calls * 1e6
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for m in MESSAGES:
+        us = per_call(lambda: (propose_tool(m), answer_stub("bench", m)), calls)
+        print(f"{us:8.2f} us  {m}")
+
+    # synthetic tools: routing is one automaton pass, so cost should stay flat
+    m = MESSAGES[0]
+    for n in (len(TOOLS), 100, 1000):
+        extra = [(f"tool{i}", [f"open tool {i} panel", (f"tool{i}", "now")]) for i in range(n - len(TOOLS))]
+        rules = Rules([(t["name"], t["triggers"]) for t in TOOLS] + extra)
+        us = per_call(lambda: extract_slots(SLOTS[rules.match(m)], m), calls)
+        print(f"{us:8.2f} us  route+slots with {n} tools")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""Offline benchmark suite: the service's hot paths against a local stand-in upstream.
+
+    python bench/run.py                           # all scenarios -> bench/results/<commit>-<time>.json
+    python bench/run.py --only compile --sizes 5,20 --latency 0.1 --errors 0.05
+    python bench/run.py --compare bench/results/A.json bench/results/B.json
+
+Every run uses a fresh upstream cache, catalog snapshot and harvest state in a
+temp directory, and a 100-scholar catalog (the real seed list padded with
+synthetic scholars). ``cold`` timings start from an empty upstream cache;
+``warm`` ones repeat the same work against the cache the cold pass filled.
+Results record medians, p95 and upstream request counts per scenario, so
+two result files from different commits can be compared with ``--compare``.
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "bench"))
+from upstream import LIVE, Corpus, serve_all  # noqa: E402  (no app imports yet: base URLs come from env)
+
+RESULTS_DIR = ROOT / "bench" / "results"
+SCENARIOS = ["find_scholar", "resolve", "fetch_for", "compile", "pipeline"]
+CATALOG_SIZE = 100
+CONCEPTS = ["assemblage"]
+
+
+def bench_catalog(corpus, real):
+    """The real seed list padded to ``CATALOG_SIZE`` with corpus people; every third has no ORCID, like DeLanda."""
+    out = list(real)
+    for i, p in enumerate(corpus.people[len(real):CATALOG_SIZE]):
+        out.append({"name": p["name"], "orcid": None if i % 3 == 2 else p["orcid"], "aliases": [], "sources": []})
+    return out
+
+
+def summarize(seconds, requests):
+    ordered = sorted(seconds)
+    return {
+        "runs": len(seconds),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+        "upstream_requests": statistics.median(requests),
+        "seconds": [round(s, 6) for s in seconds],
+    }
+
+
+class Bench:
+    def __init__(self, args, servers, tmp):
+        self.args = args
+        self.servers = servers
+        self.tmp = tmp
+        self.results = {}
+
+    def requests(self):
+        return sum(s.stats["requests"] for s in self.servers.values())
+
+    def measure(self, name, fn, setup=None, repeats=None):
+        seconds, requests = [], []
+        for _ in range(repeats or self.args.repeats):
+            if setup:
+                setup()
+            before = self.requests()
+            t0 = time.perf_counter()
+            fn()
+            seconds.append(time.perf_counter() - t0)
+            requests.append(self.requests() - before)
+        self.results[name] = summarize(seconds, requests)
+        self.report(name)
+
+    def measure_stages(self, name, stages, setup=None):
+        """Time each ``(stage, fn)`` of a chain separately; every repeat runs the whole chain."""
+        seconds = {stage: [] for stage, _ in stages}
+        requests = {stage: [] for stage, _ in stages}
+        for _ in range(self.args.repeats):
+            if setup:
+                setup()
+            for stage, fn in stages:
+                before = self.requests()
+                t0 = time.perf_counter()
+                fn()
+                seconds[stage].append(time.perf_counter() - t0)
+                requests[stage].append(self.requests() - before)
+        for stage, _ in stages:
+            self.results[f"{name}/{stage}"] = summarize(seconds[stage], requests[stage])
+            self.report(f"{name}/{stage}")
+
+    def report(self, name):
+        r = self.results[name]
+        print(f"{name:36s} median {r['median'] * 1000:10.2f} ms  p95 {r['p95'] * 1000:10.2f} ms"
+              f"  upstream {r['upstream_requests']:6.0f}", flush=True)
+
+
+def clear_cache():
+    from app.know_service.ext import cache
+    cache.store().db.execute("DELETE FROM entries")
+
+
+def run_find_scholar(b, catalog):
+    from app.know_service.catalog import find_scholar
+    names = []
+    for s in catalog:
+        first, _, last = s["name"].rpartition(" ")
+        names += [s["name"], f"{last}, {first}", s["name"][:-1]]
+    b.measure(f"find_scholar/{len(names)}", lambda: [find_scholar(n) for n in names], repeats=b.args.repeats * 3)
+
+
+def run_resolve(b, corpus, catalog, n):
+    from app.know_service.people import resolve
+    # half catalog names (seeded), half names only the upstreams know
+    unseeded = [p["name"] for p in corpus.people[CATALOG_SIZE:]]
+    names = [catalog[i // 2]["name"] if i % 2 == 0 else unseeded[i // 2] for i in range(n)]
+    b.measure(f"resolve/{n}/cold", lambda: resolve(names), setup=clear_cache)
+
+
+def run_fetch_for(b, catalog, n):
+    from app.know_service.fanout import authors, deadline_in, gather
+    from app.know_service.people import resolve
+    from app.know_service.works import fetch_for
+    people = resolve([s["name"] for s in catalog[:n]])
+
+    def fetch():
+        deadline = deadline_in(b.args.deadline)
+        gather(authors, [(fetch_for, p, CONCEPTS, None, 5, deadline) for p in people], deadline)
+
+    b.measure(f"fetch_for/{n}/cold", fetch, setup=clear_cache)
+    b.measure(f"fetch_for/{n}/warm", fetch)
+
+
+def run_compile(b, catalog, n):
+    from app.know_service.cartography import compile_graph
+    from app.know_service.fanout import deadline_in
+    prompt = f"compare {CONCEPTS[0]} across " + ", ".join(s["name"] for s in catalog[:n])
+
+    def compile_():
+        compile_graph(prompt, deadline=deadline_in(b.args.deadline))
+
+    b.measure(f"compile/{n}/cold", compile_, setup=clear_cache)
+    b.measure(f"compile/{n}/warm", compile_)
+
+
+def load_compare_orcids(out_dir):
+    spec = importlib.util.spec_from_file_location("compare_orcids", ROOT / "scripts" / "compare_orcids.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    compare = out_dir / "compare"
+    mod.ROOT_SITE, mod.COMPARE_DIR = out_dir, compare
+    mod.MATRIX_CSV, mod.SUMMARY_JSON, mod.AUTHORS_DIR = compare / "matrix.csv", compare / "summary.json", compare / "authors"
+    compare.mkdir(parents=True, exist_ok=True)
+    return mod
+
+
+def run_pipeline(b, catalog, n):
+    """compare_orcids.py end to end: harvest -> rows + dedupe -> master upsert -> matrix, per stage."""
+    from app.know_service.harvest import harvest
+    from app.know_service.master import MasterStore
+    work = b.tmp / f"pipeline-{n}"
+    co = load_compare_orcids(work / "site")
+    orcids = [s["orcid"] for s in catalog if s.get("orcid")][:n]
+    state = {}
+
+    def reset():
+        shutil.rmtree(work / "harvest", ignore_errors=True)
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{work / 'master.sqlite3'}{suffix}").unlink(missing_ok=True)
+        state.clear()
+
+    def stage_harvest():
+        state["works"] = harvest(orcids, state_dir=work / "harvest")
+
+    def stage_rows():
+        state["rows"] = {o: co.rows_from_works(o, ws) for o, ws in state["works"].items()}
+
+    def stage_upsert():
+        store = state["store"] = MasterStore(str(work / "master.sqlite3"))
+        state["changed"] = {o for o, rows in state["rows"].items() if store.upsert(rows)}
+
+    def stage_matrix():
+        co.build_matrix(state["store"], None, [], state["changed"])
+
+    stages = [("harvest", stage_harvest), ("dedupe", stage_rows), ("upsert", stage_upsert), ("matrix", stage_matrix)]
+    b.measure_stages(f"pipeline/{n}/cold", stages, setup=reset)
+    # the same roster again: harvest only re-reads summaries, the store sees no changes
+    b.measure_stages(f"pipeline/{n}/incremental", stages)
+
+
+def git_meta():
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=ROOT, capture_output=True, text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "HEAD"), "subject": git("log", "-1", "--format=%s"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def compare(base_path, head_path, threshold):
+    base = json.loads(Path(base_path).read_text(encoding="utf-8"))
+    head = json.loads(Path(head_path).read_text(encoding="utf-8"))
+    print(f"base {base['meta']['commit'][:10]}  head {head['meta']['commit'][:10]}")
+    regressed = False
+    for name in sorted(set(base["results"]) | set(head["results"])):
+        a, b = base["results"].get(name), head["results"].get(name)
+        if not a or not b:
+            print(f"{name:36s} {'only in ' + ('head' if b else 'base'):>30s}")
+            continue
+        ratio = b["median"] / a["median"] if a["median"] else float("inf")
+        flag = " REGRESSION" if ratio > threshold else ""
+        regressed = regressed or bool(flag)
+        print(f"{name:36s} {a['median'] * 1000:10.2f} -> {b['median'] * 1000:10.2f} ms  x{ratio:5.2f}"
+              f"  upstream {a['upstream_requests']:.0f} -> {b['upstream_requests']:.0f}{flag}")
+    return 1 if regressed else 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the service offline against recorded/synthetic upstreams.")
+    ap.add_argument("--only", help=f"comma-separated scenarios ({', '.join(SCENARIOS)})")
+    ap.add_argument("--sizes", default="1,5,20,100", help="author counts for the per-roster scenarios")
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--latency", type=float, default=0.05, help="seconds the stand-in adds to each response")
+    ap.add_argument("--jitter", type=float, default=0.02)
+    ap.add_argument("--errors", type=float, default=0.0, help="share of upstream requests answered 503")
+    ap.add_argument("--limits", choices=["real", "none"], default="real",
+                    help="apply each real API's rate limits to its stand-in, or lift them")
+    ap.add_argument("--deadline", type=float, default=120, help="per-operation deadline in seconds")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", help="result file (default bench/results/<commit>-<time>.json)")
+    ap.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="compare two result files and exit")
+    ap.add_argument("--threshold", type=float, default=1.2, help="median ratio flagged as a regression")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args()
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+
+    os.chdir(ROOT)  # groups, concepts and compare_orcids paths are repo-relative
+    only = set((args.only or ",".join(SCENARIOS)).split(","))
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    random.seed(args.seed)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+
+    tmp = Path(tempfile.mkdtemp(prefix="know-bench-"))
+    real = json.loads((ROOT / "data" / "scholars.json").read_text(encoding="utf-8"))
+    corpus = Corpus(real, args.seed)
+    catalog = bench_catalog(corpus, real)
+    (tmp / "scholars.json").write_text(json.dumps(catalog), encoding="utf-8")
+    servers = serve_all(corpus, latency=args.latency, jitter=args.jitter, error_rate=args.errors, seed=args.seed)
+    os.environ.update({
+        "SCHOLAR_CATALOG_PATH": str(tmp / "scholars.json"),
+        "SCHOLAR_CATALOG_POLL": "0",
+        "SCHOLAR_SNAPSHOT_DIR": str(tmp / "snapshots"),
+        "KNOW_CACHE_PATH": str(tmp / "upstream.sqlite3"),
+        "KNOW_HARVEST_DIR": str(tmp / "harvest"),
+        "KNOW_PREWARM_INTERVAL": "0",
+        **{f"{kind.upper()}_BASE": s.base for kind, s in servers.items()},
+    })
+
+    from app.know_service.ext import http
+    for kind, s in servers.items():
+        stand_in = urlsplit(s.base).netloc
+        http.LIMITS[stand_in] = http.LIMITS[urlsplit(LIVE[kind]).netloc] if args.limits == "real" else (1e6, 1e6, 64)
+
+    b = Bench(args, servers, tmp)
+    try:
+        if "find_scholar" in only:
+            run_find_scholar(b, catalog)
+        for n in sizes:
+            if "resolve" in only:
+                run_resolve(b, corpus, catalog, n)
+            if "fetch_for" in only:
+                run_fetch_for(b, catalog, n)
+            if "compile" in only:
+                run_compile(b, catalog, n)
+            if "pipeline" in only:
+                run_pipeline(b, catalog, n)
+    finally:
+        for s in servers.values():
+            s.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    meta = {
+        **git_meta(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "out", "verbose")},
+        "upstream": {kind: dict(s.stats) for kind, s in servers.items()},
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{meta['commit'][:10] or 'nogit'}-{int(time.time())}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"meta": meta, "results": b.results}, indent=1), encoding="utf-8")
+    print(f"wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""Local stand-in for ORCID, OpenAlex and Crossref, for offline benchmarks.
+
+Each upstream gets its own server (so each keeps its own host limits in
+``ext/http``). A request is answered from recorded fixtures when one matches
+its path and query; otherwise a deterministic synthetic corpus answers in the
+same JSON shape. Latency, jitter and error injection are configurable, and
+injected errors depend only on the request and how often it was seen, so two
+runs with the same seed fail the same calls.
+
+    python bench/upstream.py                  # serve on 8701-8703 until ^C
+    python bench/upstream.py --record orcid   # proxy the real ORCID API and record into bench/fixtures/
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+CATALOG = Path(__file__).resolve().parents[1] / "data" / "scholars.json"
+LIVE = {
+    "orcid": "https://pub.orcid.org/v3.0",
+    "openalex": "https://api.openalex.org",
+    "crossref": "https://api.crossref.org",
+}
+PREFIX = {"orcid": "/v3.0", "openalex": "", "crossref": ""}
+
+CONCEPT_WORDS = ["assemblage", "affect", "deterritorialization", "becoming", "war machine", "rhizome",
+                 "schizoanalysis", "desire", "the virtual", "control societies"]
+TOPICS = ["cinema", "capitalism", "ecology", "literature", "politics", "the body", "music", "architecture",
+          "technology", "ethics", "pedagogy", "colonialism", "memory", "the city", "images", "materialism"]
+FORMS = ["{c} and {t}", "On {c}", "Rethinking {c}: {t}", "{t} after Deleuze", "The {c} of {t}",
+         "{c}, {t} and the event", "Towards a theory of {t}", "Deleuze, Guattari and {t}"]
+TYPES = ["journal-article"] * 6 + ["book-chapter"] * 3 + ["book", "edited-book"]
+JOURNALS = ["Deleuze and Guattari Studies", "Theory, Culture & Society", "Angelaki", "Parrhesia",
+            "Continental Philosophy Review", "SubStance"]
+FIRST = ["Ada", "Bruno", "Chiara", "Dmitri", "Elena", "Farid", "Greta", "Hugo", "Ines", "Jonas", "Kaori", "Lucas",
+         "Mira", "Nadia", "Oskar", "Priya", "Quentin", "Rosa", "Stefan", "Tomas"]
+LAST = ["Albrecht", "Brennan", "Castell", "Dufour", "Eklund", "Ferreira", "Grimaldi", "Halvorsen", "Ibarra",
+        "Jansen", "Kowalski", "Lindqvist", "Moreau", "Nakamura", "Okafor", "Petrov", "Quist", "Rinaldi"]
+
+
+def normalize_name(name):
+    # kept free of app imports: the app reads its upstream base URLs at import time
+    s = unicodedata.normalize("NFKD", name or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+    return " ".join(re.sub(r"[^\w\s]+", " ", s).split())
+
+
+def _seed(*parts):
+    return int.from_bytes(hashlib.sha256("\x1f".join(map(str, parts)).encode()).digest()[:8], "big")
+
+
+def _orcid(seed):
+    digits = f"{seed % 10**15:015d}"
+    return f"0000-{digits[0:4]}-{digits[4:8]}-{digits[8:11]}X"
+
+
+class Corpus:
+    """Deterministic people and works: the same seed always yields the same bytes."""
+
+    def __init__(self, catalog, seed=1, extra=200):
+        self.seed = seed
+        self.people = []
+        for s in catalog:
+            self.people.append({"name": s["name"], "orcid": s.get("orcid") or _orcid(_seed(seed, s["name"]))})
+        for i in range(extra):
+            name = f"{FIRST[i % len(FIRST)]} {LAST[(i * 7 + i // len(FIRST)) % len(LAST)]} {i}"
+            self.people.append({"name": name, "orcid": _orcid(_seed(seed, name))})
+        for p in self.people:
+            p["openalex"] = f"https://openalex.org/A{_seed(seed, 'oa', p['name']) % 10**10}"
+        self.by_orcid = {p["orcid"]: p for p in self.people}
+        self.by_openalex = {p["openalex"].rsplit("/", 1)[-1]: p for p in self.people}
+        self.by_name = {normalize_name(p["name"]): p for p in self.people}
+        self._works = {}
+
+    def find(self, name):
+        """Best person for a free-text name: exact match, else the first whose name has every query token."""
+        q = normalize_name(name)
+        if q in self.by_name:
+            return self.by_name[q]
+        tokens = set(q.split())
+        for key, p in self.by_name.items():
+            if tokens and tokens <= set(key.split()):
+                return p
+        return None
+
+    def works(self, person):
+        ws = self._works.get(person["orcid"])
+        if ws is None:
+            rng = random.Random(_seed(self.seed, "works", person["orcid"]))
+            ws = []
+            for i in range(rng.randint(15, 60)):
+                title = rng.choice(FORMS).format(c=rng.choice(CONCEPT_WORDS), t=rng.choice(TOPICS))
+                ws.append({
+                    "put-code": 100000 + i,
+                    "title": title[0].upper() + title[1:],
+                    "year": rng.randint(1988, 2024),
+                    "type": rng.choice(TYPES),
+                    "doi": f"10.5555/{person['orcid'][-5:-1]}.{i}" if rng.random() < 0.7 else None,
+                    "journal": rng.choice(JOURNALS),
+                    "modified": 1500000000000 + rng.randint(0, 10**11),
+                })
+            ws = self._works[person["orcid"]] = ws
+        return ws
+
+
+def _window(works, lo=None, hi=None):
+    return [w for w in works if (lo is None or w["year"] >= lo) and (hi is None or w["year"] <= hi)]
+
+
+def _search(works, text):
+    terms = [t.lower() for t in re.split(r"\s+OR\s+|\s+", text or "") if t]
+    if not terms:
+        return works
+    return [w for w in works if any(t in w["title"].lower() for t in terms)]
+
+
+def _cursor_page(items, cursor, size):
+    start = 0 if cursor in (None, "*") else int(cursor)
+    page = items[start:start + size]
+    return page, (str(start + size) if start + size < len(items) else None)
+
+
+def orcid_summary(w):
+    ids = [{"external-id-type": "doi", "external-id-value": w["doi"]}] if w["doi"] else []
+    return {
+        "put-code": w["put-code"],
+        "type": w["type"],
+        "title": {"title": {"value": w["title"]}},
+        "publication-date": {"year": {"value": str(w["year"])}},
+        "external-ids": {"external-id": ids},
+        "journal-title": {"value": w["journal"]},
+        "last-modified-date": {"value": w["modified"]},
+    }
+
+
+def synthesize(corpus, kind, path, query):
+    """``(status, body)`` for one request against the synthetic corpus."""
+    if kind == "orcid":
+        parts = path.strip("/").split("/")
+        if parts[:1] == ["search"]:
+            p = corpus.find(query.get("q", "").removeprefix("name:"))
+            return 200, {"num-found": int(p is not None),
+                         "result": [{"orcid-identifier": {"path": p["orcid"]}}] if p else []}
+        p = corpus.by_orcid.get(parts[0])
+        if p is None:
+            return 404, {"error": "not found"}
+        if parts[1:] == ["person"]:
+            given, _, family = p["name"].rpartition(" ")
+            return 200, {"name": {"given-names": {"value": given}, "family-name": {"value": family}},
+                         "researcher-urls": {"researcher-url": []}}
+        works = corpus.works(p)
+        if parts[1:] == ["works"]:
+            return 200, {"last-modified-date": {"value": max(w["modified"] for w in works)},
+                         "group": [{"work-summary": [orcid_summary(w)]} for w in works]}
+        if len(parts) == 3 and parts[1] == "works":
+            codes = {int(c) for c in parts[2].split(",") if c.isdigit()}
+            return 200, {"bulk": [{"work": orcid_summary(w)} for w in works if w["put-code"] in codes]}
+    elif kind == "openalex":
+        if path == "/authors":
+            p = corpus.find(query.get("search", ""))
+            return 200, {"results": [{"id": p["openalex"], "display_name": p["name"]}] if p else []}
+        if path.startswith("/authors/"):
+            p = corpus.by_openalex.get(path.rsplit("/", 1)[-1])
+            if p is None:
+                return 404, {"error": "not found"}
+            return 200, {"id": p["openalex"], "display_name": p["name"], "orcid": f"https://orcid.org/{p['orcid']}"}
+        if path == "/works":
+            filters = dict(f.split(":", 1) for f in query.get("filter", "").split(",") if ":" in f)
+            p = corpus.by_openalex.get(filters.get("author.id", "").rsplit("/", 1)[-1])
+            works = corpus.works(p) if p else []
+            span = filters.get("publication_year", "")
+            if "-" in span:
+                lo, hi = span.split("-")
+                works = _window(works, int(lo), int(hi))
+            elif span[:1] == ">":
+                works = _window(works, lo=int(span[1:]) + 1)
+            elif span[:1] == "<":
+                works = _window(works, hi=int(span[1:]) - 1)
+            page, cursor = _cursor_page(_search(works, query.get("search")), query.get("cursor"),
+                                        int(query.get("per-page", 25)))
+            return 200, {"meta": {"count": len(works), "next_cursor": cursor}, "results": [
+                {"id": f"https://openalex.org/W{_seed(p['orcid'], w['put-code']) % 10**10}", "title": w["title"],
+                 "publication_year": w["year"], "doi": f"https://doi.org/{w['doi']}" if w["doi"] else None,
+                 "keywords": [], "abstract_inverted_index": None} for w in page]}
+    elif kind == "crossref" and path == "/works":
+        p = corpus.find(query.get("query.author", ""))
+        works = [w for w in corpus.works(p) if w["doi"]] if p else []
+        years = dict(f.split(":", 1) for f in query.get("filter", "").split(",") if ":" in f)
+        works = _window(works, int(years["from-pub-date"]) if "from-pub-date" in years else None,
+                        int(years["until-pub-date"]) if "until-pub-date" in years else None)
+        page, cursor = _cursor_page(_search(works, query.get("query.bibliographic")), query.get("cursor"),
+                                    int(query.get("rows", 20)))
+        return 200, {"status": "ok", "message": {"total-results": len(works), "next-cursor": cursor, "items": [
+            {"DOI": w["doi"], "title": [w["title"]], "issued": {"date-parts": [[w["year"]]]},
+             "URL": f"https://doi.org/{w['doi']}", "subject": []} for w in page]}}
+    return 404, {"error": "not found"}
+
+
+def request_key(path, query):
+    return f"{path}?{urlencode(sorted(query.items()))}"
+
+
+def load_fixtures(kind, fixtures_dir=FIXTURES_DIR):
+    """Recorded ``{key: (status, body)}`` from ``<fixtures_dir>/<kind>.ndjson``, if present."""
+    path = Path(fixtures_dir) / f"{kind}.ndjson"
+    out = {}
+    if path.exists():
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    rec = json.loads(line)
+                    out[request_key(rec["path"], rec["query"])] = (rec["status"], rec["body"])
+    return out
+
+
+class Upstream(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, kind, corpus, port=0, latency=0.0, jitter=0.0, error_rate=0.0, seed=1,
+                 fixtures=None, record=None):
+        super().__init__(("127.0.0.1", port), Handler)
+        self.kind = kind
+        self.corpus = corpus
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.fixtures = fixtures or {}
+        self.record = record
+        self.seen = Counter()
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}{PREFIX[self.kind]}"
+
+    def answer(self, path, query):
+        key = request_key(path, query)
+        with self.lock:
+            self.seen[key] += 1
+            nth = self.seen[key]
+            self.stats["requests"] += 1
+        roll = _seed(self.seed, key, nth)
+        delay = self.latency + self.jitter * ((roll >> 8) % 1000 / 1000 * 2 - 1)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and roll % 10000 < self.error_rate * 10000:
+            with self.lock:
+                self.stats["injected"] += 1
+            return 503, {"error": "injected"}
+        if self.record:
+            return self._proxy(path, query)
+        if key in self.fixtures:
+            with self.lock:
+                self.stats["replayed"] += 1
+            return self.fixtures[key]
+        with self.lock:
+            self.stats["synthetic"] += 1
+        return synthesize(self.corpus, self.kind, path, query)
+
+    def _proxy(self, path, query):
+        import requests
+        r = requests.get(LIVE[self.kind] + path, params=query, headers={"Accept": "application/json"}, timeout=30)
+        status, body = r.status_code, r.json()
+        with self.lock, Path(self.record).open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"path": path, "query": query, "status": status, "body": body}) + "\n")
+        return status, body
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real APIs
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.removeprefix(PREFIX[self.server.kind]) or "/"
+        status, body = self.server.answer(path, dict(parse_qsl(url.query)))
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_all(corpus, fixtures_dir=FIXTURES_DIR, **kw):
+    """Start one daemon server per upstream on free ports; returns ``{kind: Upstream}``."""
+    servers = {}
+    for kind in LIVE:
+        s = servers[kind] = Upstream(kind, corpus, fixtures=load_fixtures(kind, fixtures_dir), **kw)
+        threading.Thread(target=s.serve_forever, name=f"bench-{kind}", daemon=True).start()
+    return servers
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve recorded/synthetic ORCID, OpenAlex and Crossref responses.")
+    ap.add_argument("--port", type=int, default=8701, help="first of three ports (orcid, openalex, crossref)")
+    ap.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    ap.add_argument("--jitter", type=float, default=0.02, help="± seconds of deterministic jitter")
+    ap.add_argument("--errors", type=float, default=0.0, help="share of requests answered 503")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--record", choices=list(LIVE), help="proxy this upstream live and append to its fixture file")
+    args = ap.parse_args()
+
+    catalog = json.loads(Path(CATALOG).read_text(encoding="utf-8"))
+    corpus = Corpus(catalog, args.seed)
+    kinds = [args.record] if args.record else list(LIVE)
+    for i, kind in enumerate(LIVE):
+        if kind not in kinds:
+            continue
+        record = None
+        if args.record:
+            FIXTURES_DIR.mkdir(exist_ok=True)
+            record = FIXTURES_DIR / f"{kind}.ndjson"
+        s = Upstream(kind, corpus, args.port + i, latency=0 if record else args.latency,
+                     jitter=0 if record else args.jitter, error_rate=0 if record else args.errors,
+                     seed=args.seed, fixtures=load_fixtures(kind), record=record)
+        threading.Thread(target=s.serve_forever, daemon=True).start()
+        print(f"{kind.upper()}_BASE={s.base}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
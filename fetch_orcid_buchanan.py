@@ -1,11 +1,12 @@
-import csv, re, sys, requests
+import csv, sys
 from pathlib import Path
 from typing import Dict, List
 from slugify import slugify
+from app.know_service.dedupe import dedupe, norm_title
+from app.know_service.harvest import harvest_author
+from app.know_service.master import MasterStore
 
 ORCID_ID = "0000-0003-4864-6495"
-BASE = f"https://pub.orcid.org/v3.0/{ORCID_ID}"
-HEADERS = {"Accept": "application/json"}
 
 OUT_DIR = Path("data")
 OUT_DIR.mkdir(exist_ok=True, parents=True)
@@ -13,6 +14,7 @@ OUT_DIR.mkdir(exist_ok=True, parents=True)
 CSV_ORCID = OUT_DIR / "ian_buchanan_orcid.csv"
 MD_ORCID  = OUT_DIR / "ian_buchanan_orcid.md"
 CSV_MASTER = OUT_DIR / "ian_buchanan_master.csv"
+DB_MASTER = OUT_DIR / "ian_buchanan_master.sqlite3"
 
 # -------- helpers --------
 def get(d: Dict, path: List[str], default=""):
@@ -30,12 +32,6 @@ def first_ext_id(work: Dict, id_type: str) -> str:
             return e.get("external-id-value", "") or ""
     return ""
 
-def normalize_title(t: str) -> str:
-    t = (t or "").lower().strip()
-    t = re.sub(r"\s+", " ", t)
-    t = re.sub(r"[^\w\s]", "", t)
-    return t
-
 def row_from_work(w: Dict) -> Dict[str, str]:
     title = get(w, ["title","title","value"])
     subtitle = get(w, ["title","subtitle","value"])
@@ -61,35 +57,9 @@ def row_from_work(w: Dict) -> Dict[str, str]:
         "source": "ORCID"
     }
 
-def fetch_json(url: str) -> Dict:
-    r = requests.get(url, headers=HEADERS, timeout=30)
-    r.raise_for_status()
-    return r.json()
-
 def fetch_all_orcid_rows() -> List[Dict[str,str]]:
-    works = fetch_json(f"{BASE}/works")
-    rows: List[Dict[str,str]] = []
-    for g in works.get("group", []) or []:
-        for s in g.get("work-summary", []) or []:
-            put = s.get("put-code")
-            if not put:
-                continue
-            w = fetch_json(f"{BASE}/work/{put}")
-            rows.append(row_from_work(w))
-    return rows
-
-def dedupe(rows: List[Dict[str,str]]) -> List[Dict[str,str]]:
-    seen, out = set(), []
-    for r in rows:
-        doi = (r.get("doi") or "").lower()
-        if doi:
-            key = f"doi:{doi}"
-        else:
-            key = f"titleyear:{normalize_title(r.get('title',''))}|{r.get('year','')}"
-        if key not in seen:
-            seen.add(key)
-            out.append(r)
-    return out
+    # bulk + incremental: only new or changed works are fetched from ORCID
+    return [row_from_work(w) for w in harvest_author(ORCID_ID)]
 
 def write_csv(rows: List[Dict[str,str]], path: Path):
     if not rows:
@@ -108,7 +78,7 @@ def write_csv(rows: List[Dict[str,str]], path: Path):
     print(f"Wrote CSV → {path}")
 
 def write_md(rows: List[Dict[str,str]], path: Path):
-    rows_sorted = sorted(rows, key=lambda r: (r.get("year","9999"), normalize_title(r.get("title",""))))
+    rows_sorted = sorted(rows, key=lambda r: (r.get("year","9999"), norm_title(r.get("title",""))))
     lines = ["# Ian Buchanan — ORCID Works (public feed)\n"]
     cur_year = None
     for r in rows_sorted:
@@ -127,33 +97,13 @@ def write_md(rows: List[Dict[str,str]], path: Path):
     path.write_text("\n".join(lines), encoding="utf-8")
     print(f"Wrote Markdown → {path}")
 
-def load_csv(path: Path) -> List[Dict[str,str]]:
-    if not path.exists():
-        return []
-    with path.open("r", encoding="utf-8", newline="") as f:
-        return list(csv.DictReader(f))
-
-def unify_fields(rows: List[Dict[str,str]]) -> List[Dict[str,str]]:
-    # ensure consistent headers across heterogenous sources
-    canonical = [
-        "orcid_id","title","type","date","year","journal_or_publisher",
-        "doi","isbn","url","citation","put_code","source"
-    ]
-    # add any extras that appear
-    extras = set()
-    for r in rows:
-        for k in r.keys():
-            if k not in canonical:
-                extras.add(k)
-    headers = canonical + sorted(extras)
-    unified = []
-    for r in rows:
-        unified.append({k: r.get(k,"") for k in headers})
-    return unified
-
-def merge_rows(base_rows: List[Dict[str,str]], add_rows: List[Dict[str,str]]) -> List[Dict[str,str]]:
-    combined = unify_fields(base_rows + add_rows)
-    return dedupe(combined)
+def merge_into_master(merge_target: Path, add_rows: List[Dict[str,str]]) -> int:
+    # dedupe happens on the store's unique key; only changed rows are written
+    store = MasterStore(DB_MASTER)
+    changed = store.import_csv(merge_target) + store.upsert(add_rows)
+    if changed or not CSV_MASTER.exists():
+        store.export_csv(CSV_MASTER)
+    return changed
 
 def main():
     # optional arg: path to existing master CSV to merge into
@@ -170,10 +120,8 @@ def main():
     # merge with existing CSV if supplied
     if merge_target:
         print(f"Merging with existing CSV: {merge_target}")
-        existing = load_csv(merge_target)
-        merged = merge_rows(existing, orcid_rows)
-        write_csv(merged, CSV_MASTER)
-        print("Merged master written →", CSV_MASTER)
+        changed = merge_into_master(merge_target, orcid_rows)
+        print(f"Merged master ({changed} changed) →", CSV_MASTER)
 
 if __name__ == "__main__":
     main()
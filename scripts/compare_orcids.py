@@ -1,8 +1,13 @@
-import csv, re, sys, json, requests
+import argparse, csv, sys, json
 from pathlib import Path
-from collections import defaultdict, Counter
 
-HEADERS = {"Accept":"application/json"}
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app.know_service.catalog import find_scholar
+from app.know_service.dedupe import dedupe, norm_title
+from app.know_service.groups import find_group
+from app.know_service.harvest import harvest, harvest_author
+from app.know_service.master import MasterStore
+from app.know_service.matrix import author_rollups, group_members, group_rollups, last_years, parse_years, year_columns
 
 ROOT_SITE = Path("site/public/data")
 ROOT_SITE.mkdir(parents=True, exist_ok=True)
@@ -12,14 +17,10 @@ DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
 MASTER = DATA_DIR / "master.csv"
+MASTER_DB = DATA_DIR / "master.sqlite3"
 MATRIX_CSV = COMPARE_DIR / "matrix.csv"
 SUMMARY_JSON = COMPARE_DIR / "summary.json"
-
-def norm_title(t:str)->str:
-    import re
-    t = (t or "").lower().strip()
-    t = re.sub(r"\s+"," ",t)
-    return re.sub(r"[^\w\s]","",t)
+AUTHORS_DIR = COMPARE_DIR / "authors"
 
 def get(d, path, default=""):
     cur = d
@@ -33,37 +34,41 @@ def first_id(w, t):
             return e.get("external-id-value","" ) or ""
     return ""
 
-def fetch_orcid(orcid:str):
-    base = f"https://pub.orcid.org/v3.0/{orcid}"
-    works = requests.get(f"{base}/works", headers=HEADERS, timeout=30).json()
+def rows_from_works(orcid:str, works):
     rows = []
-    for g in works.get("group",[]) or []:
-        for s in g.get("work-summary",[]) or []:
-            put = s.get("put-code")
-            if not put: continue
-            w = requests.get(f"{base}/work/{put}", headers=HEADERS, timeout=30).json()
-            title = get(w,["title","title","value"])
-            sub   = get(w,["title","subtitle","value"])
-            if sub: title = f"{title}: {sub}"
-            year  = get(w,["publication-date","year","value"])
-            rows.append({
-                "orcid_id": orcid,
-                "title": title or "",
-                "type": w.get("type",""),
-                "year": year or "",
-                "journal_or_publisher": get(w,["journal-title","value"]) or w.get("publisher",""),
-                "doi": first_id(w,"doi"),
-                "isbn": first_id(w,"isbn"),
-                "url": first_id(w,"uri") or first_id(w,"url"),
-                "source": "ORCID"
-            })
-    # dedupe per author
-    seen, out = set(), []
-    for r in rows:
-        key = ("doi:"+r["doi"].lower()) if r["doi"] else "ty:"+norm_title(r["title"]) +"|"+ r["year"]
-        if key in seen: continue
-        seen.add(key); out.append(r)
-    return out
+    for w in works:
+        title = get(w,["title","title","value"])
+        sub   = get(w,["title","subtitle","value"])
+        if sub: title = f"{title}: {sub}"
+        year  = get(w,["publication-date","year","value"])
+        rows.append({
+            "orcid_id": orcid,
+            "title": title or "",
+            "type": w.get("type",""),
+            "year": year or "",
+            "journal_or_publisher": get(w,["journal-title","value"]) or w.get("publisher",""),
+            "doi": first_id(w,"doi"),
+            "isbn": first_id(w,"isbn"),
+            "url": first_id(w,"uri") or first_id(w,"url"),
+            "source": "ORCID"
+        })
+    return dedupe(rows)
+
+def fetch_orcid(orcid:str):
+    return rows_from_works(orcid, harvest_author(orcid))
+
+def expand_roster(arg:str):
+    # each comma-separated entry is an ORCID or a data/groups.json group name/slug
+    orcids = []
+    for part in (p.strip() for p in arg.split(",")):
+        if not part: continue
+        hit = find_group(part)
+        if not hit:
+            orcids.append(part); continue
+        for name in hit[1].get("members", []):
+            seed = find_scholar(name)
+            if seed and seed.get("orcid"): orcids.append(seed["orcid"])
+    return list(dict.fromkeys(orcids))
 
 def write_csv(rows, path):
     if not rows: return
@@ -87,77 +92,72 @@ def write_md(rows, path, orcid):
         lines.append("- " + " — ".join(parts))
     path.write_text("\n".join(lines), encoding="utf-8")
 
-def load_csv(path):
-    if not path.exists(): return []
-    with path.open("r", encoding="utf-8", newline="") as f:
-        return list(csv.DictReader(f))
-
-def dedupe_all(rows):
-    seen, out = set(), []
-    for r in rows:
-        key = ("doi:"+ (r.get("doi","" ).lower())) if r.get("doi") else "ty:"+norm_title(r.get("title","")) +"|"+ r.get("year","")
-        if key in seen: continue
-        seen.add(key); out.append(r)
-    return out
-
-def build_matrix(all_rows):
-    # Aggregate by author -> year/type counts
-    by_author = defaultdict(lambda: {"total":0, "by_year":Counter(), "by_type":Counter()})
-    for r in all_rows:
-        a = r["orcid_id"]; y = r.get("year","n.d."); t = r.get("type","")
-        by_author[a]["total"] += 1
-        by_author[a]["by_year"][y] += 1
-        by_author[a]["by_type"][t] += 1
-
-    # Select top year buckets for compact matrix
-    years = sorted({y for a in by_author for y in by_author[a]["by_year"] if y and y != "n.d."})
-    years = years[-10:]  # last 10 years available
+def build_matrix(store, years=None, types=None, changed=None):
+    # Aggregate by author -> year/type counts straight from the store's rollup table
+    years = years or last_years(store)
+    authors = author_rollups(store, years=years, types=types)
+    cols = year_columns(authors, years)
 
     # CSV matrix: rows=author, cols=total + per-year counts
-    header = ["orcid_id","total"] + years
-    rows = []
-    for a, agg in by_author.items():
-        row = {"orcid_id": a, "total": agg["total"]}
-        for y in years:
-            row[y] = agg["by_year"].get(y, 0)
-        rows.append(row)
-
-    # write matrix.csv
+    header = ["orcid_id","total"] + cols
     with MATRIX_CSV.open("w", encoding="utf-8", newline="") as f:
         w = csv.DictWriter(f, fieldnames=header)
-        w.writeheader(); w.writerows(rows)
-
-    # write summary.json (for UI)
+        w.writeheader()
+        for a, agg in authors.items():
+            w.writerow({"orcid_id": a, "total": agg["total"], **{y: agg["by_year"].get(y, 0) for y in cols}})
+
+    # per-author files, loaded lazily by the UI; only rewritten when that author changed,
+    # or for everyone when the year window / type filter differs from the last run's
+    spec = {"years": list(years) if years else None, "types": sorted(types or [])}
+    try:
+        previous = json.loads(SUMMARY_JSON.read_text(encoding="utf-8")).get("spec")
+    except (OSError, ValueError):
+        previous = None
+    if previous != spec:
+        changed = None
+    AUTHORS_DIR.mkdir(parents=True, exist_ok=True)
+    for a, agg in authors.items():
+        path = AUTHORS_DIR / f"{a}.json"
+        if changed is None or a in changed or not path.exists():
+            path.write_text(json.dumps({"orcid_id": a, **agg}, separators=(",", ":")), encoding="utf-8")
+
+    # write summary.json (compact index for UI)
     summary = {
-        "years": years,
-        "authors": [{
-            "orcid_id": a,
-            "total": by_author[a]["total"],
-            "by_year": dict(by_author[a]["by_year"]),
-            "by_type": dict(by_author[a]["by_type"])
-        } for a in by_author]
+        "years": cols,
+        "types": list(types or []),
+        "spec": spec,
+        "authors": [{"orcid_id": a, "total": agg["total"], "href": f"authors/{a}.json"} for a, agg in authors.items()],
+        "groups": group_rollups(store, group_members(), years, types),
     }
-    SUMMARY_JSON.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    SUMMARY_JSON.write_text(json.dumps(summary, separators=(",", ":")), encoding="utf-8")
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/compare_orcids.py ORCID1,ORCID2,...")
-        sys.exit(1)
-
-    orcids = [o.strip() for o in sys.argv[1].split(",") if o.strip()]
-    all_rows = load_csv(MASTER)
-
-    for orcid in orcids:
-        rows = fetch_orcid(orcid)
+    ap = argparse.ArgumentParser(description="Harvest ORCID rosters and build the comparison matrix.")
+    ap.add_argument("roster", help="ORCID1,ORCID2,...|GROUP")
+    ap.add_argument("--years", help="year span such as 1990-2024 (default: last 10 years on record)")
+    ap.add_argument("--types", help="comma-separated work types to count, e.g. book,journal-article")
+    args = ap.parse_args()
+    years = parse_years(args.years)
+    types = [t.strip() for t in (args.types or "").split(",") if t.strip()]
+
+    orcids = expand_roster(args.roster)
+    store = MasterStore(MASTER_DB)
+    if not len(store):
+        store.import_csv(MASTER)
+
+    changed = set()
+    for orcid, works in harvest(orcids).items():
+        rows = rows_from_works(orcid, works)
         # write per-author dumps into site/public/data
         write_csv(rows, ROOT_SITE / f"{orcid}.csv")
         write_md(rows, ROOT_SITE / f"{orcid}.md", orcid)
         # merge into master
-        all_rows.extend(rows)
+        if store.upsert(rows):
+            changed.add(orcid)
 
-    all_rows = dedupe_all(all_rows)
-    write_csv(all_rows, MASTER)
-    build_matrix(all_rows)
+    if changed or not MASTER.exists():
+        store.export_csv(MASTER)
+    build_matrix(store, years, types, changed)
 
 if __name__ == "__main__":
     main()
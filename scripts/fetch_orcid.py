@@ -1,9 +1,12 @@
-import csv, re, sys, requests
+import csv, sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app.know_service.dedupe import dedupe, norm_title
+from app.know_service.harvest import harvest_author
+from app.know_service.master import MasterStore
+
 ORCID = sys.argv[1] if len(sys.argv) > 1 else "0000-0003-4864-6495"
-BASE = f"https://pub.orcid.org/v3.0/{ORCID}"
-HEADERS = {"Accept":"application/json"}
 
 OUT_SITE = Path("site/public/data"); OUT_SITE.mkdir(parents=True, exist_ok=True)
 OUT_DATA = Path("data"); OUT_DATA.mkdir(exist_ok=True)
@@ -13,6 +16,7 @@ MD_ORCID  = OUT_SITE / f"{ORCID}.md"
 CSV_LATEST = OUT_SITE / "author_latest.csv"
 MD_LATEST  = OUT_SITE / "author_latest.md"
 CSV_MASTER = OUT_DATA / "master.csv"
+DB_MASTER = OUT_DATA / "master.sqlite3"
 
 def get(d, p, default=""):
     for k in p:
@@ -25,43 +29,25 @@ def first_id(w, t):
             return e.get("external-id-value","") or ""
     return ""
 
-def norm_title(t):
-    t = (t or "").lower().strip()
-    t = re.sub(r"\s+"," ",t)
-    return re.sub(r"[^\w\s]","",t)
-
-def fetch_json(url): return requests.get(url, headers=HEADERS, timeout=30).json()
-
 def rows_from_orcid():
-    works = fetch_json(f"{BASE}/works")
     rows = []
-    for g in works.get("group",[]) or []:
-        for s in g.get("work-summary",[]) or []:
-            put = s.get("put-code")
-            if not put: continue
-            w = fetch_json(f"{BASE}/work/{put}")
-            title = get(w,["title","title","value"])
-            sub   = get(w,["title","subtitle","value"])
-            if sub: title = f"{title}: {sub}"
-            year  = get(w,["publication-date","year","value"])
-            rows.append({
-                "orcid_id": ORCID,
-                "title": title,
-                "type": w.get("type",""),
-                "year": year or "",
-                "journal_or_publisher": get(w,["journal-title","value"]) or w.get("publisher",""),
-                "doi": first_id(w,"doi"),
-                "isbn": first_id(w,"isbn"),
-                "url": first_id(w,"uri") or first_id(w,"url"),
-                "source": "ORCID"
-            })
-    # dedupe (DOI else title+year)
-    out, seen = [], set()
-    for r in rows:
-        key = ("doi:"+r["doi"].lower()) if r["doi"] else "ty:"+norm_title(r["title"])+"|"+r["year"]
-        if key in seen: continue
-        seen.add(key); out.append(r)
-    return out
+    for w in harvest_author(ORCID):
+        title = get(w,["title","title","value"])
+        sub   = get(w,["title","subtitle","value"])
+        if sub: title = f"{title}: {sub}"
+        year  = get(w,["publication-date","year","value"])
+        rows.append({
+            "orcid_id": ORCID,
+            "title": title,
+            "type": w.get("type",""),
+            "year": year or "",
+            "journal_or_publisher": get(w,["journal-title","value"]) or w.get("publisher",""),
+            "doi": first_id(w,"doi"),
+            "isbn": first_id(w,"isbn"),
+            "url": first_id(w,"uri") or first_id(w,"url"),
+            "source": "ORCID"
+        })
+    return dedupe(rows)
 
 def write_csv(rows, p):
     if not rows: return
@@ -85,19 +71,11 @@ def write_md(rows, p):
     p.write_text("\n".join(lines), encoding="utf-8")
 
 def append_master(rows):
-    # load existing
-    master = []
-    if CSV_MASTER.exists():
-        with CSV_MASTER.open("r",encoding="utf-8",newline="") as f:
-            master = list(csv.DictReader(f))
-    allrows = master + rows
-    # re-dedupe
-    seen, out = set(), []
-    for r in allrows:
-        key = ("doi:"+r.get("doi","" ).lower()) if r.get("doi") else "ty:"+norm_title(r.get("title",""))+"|"+r.get("year","" )
-        if key in seen: continue
-        seen.add(key); out.append(r)
-    write_csv(out, CSV_MASTER)
+    store = MasterStore(DB_MASTER)
+    if not len(store):
+        store.import_csv(CSV_MASTER)
+    if store.upsert(rows) or not CSV_MASTER.exists():
+        store.export_csv(CSV_MASTER)
 
 def main():
     rows = rows_from_orcid()
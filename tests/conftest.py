@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# route-level stores default to files under data/; keep test runs out of the repo tree
+_tmp = tempfile.mkdtemp(prefix="know-tests-")
+os.environ.setdefault("KNOW_MASTER_DB", os.path.join(_tmp, "master.sqlite3"))
+os.environ.setdefault("KNOW_VAULT_DB", os.path.join(_tmp, "vault.sqlite3"))
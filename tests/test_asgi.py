@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+import pytest
+
+pytest.importorskip("asgiref")
+
+from app import asgi
+from app.know_service import works
+from app.know_service.wire import expand
+from app.routes.http_cache import memo
+
+
+def stub_async_upstreams(monkeypatch):
+    calls = []
+
+    async def orcid_works_async(orcid, concepts, window=None):
+        calls.append(orcid)
+        await asyncio.sleep(0.05)
+        return [{"title": f"Assemblage work of {orcid}", "year": 2001, "doi": f"10.1/{orcid}", "url": None}]
+
+    async def nothing(*a, **k):
+        return []
+
+    monkeypatch.setattr(works, "orcid_works_async", orcid_works_async)
+    monkeypatch.setattr(works, "openalex_works_by_author_async", nothing)
+    monkeypatch.setattr(works, "crossref_search_async", nothing)
+    return calls
+
+
+def call(path, body, headers=()):
+    sent = []
+    data = json.dumps(body).encode()
+    chunks = [{"type": "http.request", "body": data, "more_body": False}]
+
+    async def receive():
+        return chunks.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "http_version": "1.1", "scheme": "http", "method": "POST", "path": path,
+             "root_path": "", "query_string": b"", "server": ("testserver", 80),
+             "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode()),
+                         *headers]}
+    asyncio.run(asgi.app(scope, receive, send))
+    status = sent[0]["status"]
+    return status, dict(sent[0]["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+
+
+def test_async_compile_multiplexes_authors(monkeypatch):
+    memo.clear()
+    calls = stub_async_upstreams(monkeypatch)
+    prompt = "Compare assemblage across Ian Buchanan, Brian Massumi, Claire Colebrook"
+    status, headers, body = call(asgi.COMPILE_PATH, {"prompt": prompt})
+    graph = json.loads(body)
+    assert status == 200 and len(calls) == 3
+    assert [n["label"] for n in graph["nodes"] if n["type"] == "author"] == ["Ian Buchanan", "Brian Massumi", "Claire Colebrook"]
+    assert len(graph["refs"]["#ASS"]) == 3
+
+    status, _, _ = call(asgi.COMPILE_PATH, {"prompt": prompt}, [(b"if-none-match", headers[b"etag"])])
+    assert status == 304 and len(calls) == 3
+
+    status, headers, body = call(asgi.COMPILE_PATH, {"prompt": prompt, "format": "compact"})
+    assert headers[b"content-type"] == b"application/vnd.know.graph+json" and headers[b"vary"] == b"Accept"
+    assert expand(json.loads(body)) == graph
+
+
+def test_async_compile_streams_ndjson(monkeypatch):
+    stub_async_upstreams(monkeypatch)
+    status, headers, body = call(asgi.COMPILE_PATH, {"prompt": "assemblage across Ian Buchanan", "stream": "ndjson"})
+    events = [json.loads(line)["event"] for line in body.decode().splitlines()]
+    assert headers[b"content-type"] == b"application/x-ndjson" and headers[b"vary"] == b"Accept"
+    assert events == ["concepts", "author", "summary"]
+
+
+def test_other_routes_fall_through_to_flask():
+    status, _, body = call("/api/know/v1/query", {"msg": "copy wiki block"})
+    assert status == 200 and json.loads(body)["call"]["name"] == "copyWikiBlock"
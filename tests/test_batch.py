@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from app.know_service import people, works
+from app.know_service.batch import MAX_AUTHORS
+from app import app as flask_app
+
+
+def stub_upstreams(monkeypatch):
+    calls = []
+
+    def orcid_works(orcid, concepts, window=None):
+        calls.append(orcid)
+        return [{"title": f"Work of {orcid}", "year": 2001, "doi": f"10.1/{orcid}", "url": None}]
+
+    monkeypatch.setattr(works, "orcid_works", orcid_works)
+    monkeypatch.setattr(works, "openalex_works_by_author", lambda *a, **k: [])
+    monkeypatch.setattr(works, "crossref_search", lambda *a, **k: [])
+    return calls
+
+
+def test_works_batch_dedupes_entries_for_one_person(monkeypatch):
+    calls = stub_upstreams(monkeypatch)
+    client = flask_app.test_client()
+    r = client.post("/api/know/v1/works/batch", json={
+        "authors": ["Buchanan", "Buchanan, Ian", "https://orcid.org/0000-0002-6797-3638", "Massumi"],
+        "concepts": ["assemblage"], "ymin": 2000, "ymax": 2010,
+    })
+    assert r.status_code == 200
+    data = r.get_json()
+    assert [x["person"]["name"] for x in data["results"]] == ["Ian Buchanan", "Brian Massumi"]
+    assert data["results"][0]["query"] == ["Buchanan", "Buchanan, Ian", "https://orcid.org/0000-0002-6797-3638"]
+    assert data["window"] == [2000, 2010]
+    assert sorted(calls) == ["0000-0002-4384-3615", "0000-0002-6797-3638"]
+
+
+def test_catalog_works_for_group(monkeypatch):
+    stub_upstreams(monkeypatch)
+    client = flask_app.test_client()
+    r = client.get("/api/know/v1/catalog/works?group=deleuzian-scholars&limit=1")
+    assert r.status_code == 200
+    authors = {w["author"] for w in r.get_json()["works"]}
+    assert {"Ian Buchanan", "Claire Colebrook"} <= authors
+    assert client.get("/api/know/v1/catalog/works").status_code == 400
+
+
+def test_resolve_caps_names_and_merges_openalex_orcids(monkeypatch):
+    client = flask_app.test_client()
+    r = client.post("/api/know/v1/people/resolve", json={"names": [f"Name {i}" for i in range(MAX_AUTHORS + 1)]})
+    assert r.status_code == 400
+
+    # OpenAlex returns the author's ORCID iD, so both entries are one person
+    monkeypatch.setattr(people, "openalex_author",
+                        lambda key: {"id": key, "display_name": "Ian Buchanan",
+                                     "orcid": "https://orcid.org/0000-0002-6797-3638"})
+    r = client.post("/api/know/v1/people/resolve",
+                    json={"names": ["https://openalex.org/A123", "0000-0002-6797-3638"]})
+    [hit] = r.get_json()["people"]
+    assert hit["person"]["orcid"] == "0000-0002-6797-3638" and hit["person"]["openalex"] == "https://openalex.org/A123"
+    assert hit["query"] == ["https://openalex.org/A123", "0000-0002-6797-3638"]
+
+
+def test_catalog_works_takes_repeated_authors(monkeypatch):
+    stub_upstreams(monkeypatch)
+    client = flask_app.test_client()
+    r = client.get("/api/know/v1/catalog/works?authors=Buchanan, Ian&authors=Massumi, Brian&limit=1")
+    assert {w["author"] for w in r.get_json()["works"]} == {"Ian Buchanan", "Brian Massumi"}
@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "bench")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from upstream import Corpus, serve_all
+from app.know_service.ext import crossref, openalex, orcid
+from app.know_service.harvest import harvest_author
+
+
+def test_stand_in_answers_in_each_upstreams_shape(monkeypatch, tmp_path):
+    corpus = Corpus([{"name": "Ian Buchanan", "orcid": "0000-0002-6797-3638"}], seed=1, extra=2)
+    servers = serve_all(corpus, fixtures_dir=tmp_path)
+    try:
+        monkeypatch.setattr(orcid, "ORCID_BASE", servers["orcid"].base)
+        monkeypatch.setattr(openalex, "OPENALEX_BASE", servers["openalex"].base)
+        monkeypatch.setattr(crossref, "CROSSREF_BASE", servers["crossref"].base)
+        oid = "0000-0002-6797-3638"
+        assert orcid.orcid_works_summary(oid)["group"]
+        assert len(harvest_author(oid, state_dir=tmp_path)) == len(corpus.works(corpus.by_orcid[oid]))
+        author = openalex.iter_openalex_works(corpus.people[0]["openalex"])
+        assert next(author)["title"]
+        assert all(r["doi"] for r in crossref.iter_crossref_works("Ian Buchanan", rows=5))
+    finally:
+        for s in servers.values():
+            s.shutdown()
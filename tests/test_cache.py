@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.know_service.ext import cache
+
+
+def test_negative_hits_and_stale_while_revalidate(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_store", cache.UpstreamCache(str(tmp_path / "c.sqlite3")))
+    calls = []
+
+    @cache.cached("orcid")
+    def lookup(name):
+        calls.append(name)
+        return None if name.startswith("Manuel") else f"id:{len(calls)}"
+
+    assert lookup("Manuel DeLanda") is None
+    assert lookup("  manuel   delanda ") is None
+    assert calls == ["Manuel DeLanda"]
+
+    assert lookup("Ian Buchanan") == "id:2"
+    cache.store().db.execute("UPDATE entries SET expires = ?", (time.time() - 1,))
+    assert lookup("Ian Buchanan") == "id:2"  # stale value served immediately
+    for _ in range(100):
+        if len(calls) == 3 and not cache._refreshing:
+            break
+        time.sleep(0.01)
+    assert lookup("Ian Buchanan") == "id:3"  # refreshed in the background
+    assert cache.store().stats()["stale_hits"] >= 1
+
+
+def test_lru_eviction(tmp_path):
+    c = cache.UpstreamCache(str(tmp_path / "c.sqlite3"), max_entries=2)
+    for k in "abc":
+        c.put(k, "orcid", k, ttl=60)
+    c.db.execute("UPDATE entries SET accessed = 0 WHERE key = 'a'")
+    c.evict()
+    assert c.get("a") == (None, None)
+    assert c.get("c") == ("c", "fresh")
+
+
+def test_concurrent_misses_share_one_call(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.know_service.ext import singleflight
+
+    monkeypatch.setattr(cache, "_store", cache.UpstreamCache(str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(singleflight, "PROCESS_LOCKS", True)
+    monkeypatch.setattr(singleflight, "LOCK_DIR", str(tmp_path / "locks"))
+    calls = []
+
+    @cache.cached("orcid")
+    def works(orcid):
+        calls.append(orcid)
+        time.sleep(0.1)
+        if orcid == "bad":
+            raise ValueError("upstream said no")
+        return [{"title": orcid}]
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(works, ["0000-0001"] * 8))
+    assert calls == ["0000-0001"] and all(r == [{"title": "0000-0001"}] for r in results)
+    assert results[0] is not results[1]  # waiters get their own copy
+
+    with ThreadPoolExecutor(4) as pool:
+        errors = [f.exception() for f in [pool.submit(works, "bad") for _ in range(4)]]
+    assert calls.count("bad") == 1 and all(isinstance(e, ValueError) for e in errors)
+
+
+def test_concurrent_async_misses_share_one_call(tmp_path, monkeypatch):
+    import asyncio
+
+    monkeypatch.setattr(cache, "_store", cache.UpstreamCache(str(tmp_path / "c.sqlite3")))
+    calls = []
+
+    @cache.cached("openalex")
+    async def lookup_async(name):
+        calls.append(name)
+        await asyncio.sleep(0.05)
+        return {"id": "A1"}
+
+    async def burst():
+        return await asyncio.gather(*[lookup_async("Ian Buchanan") for _ in range(5)])
+
+    assert asyncio.run(burst()) == [{"id": "A1"}] * 5
+    assert calls == ["Ian Buchanan"]
+
+    # with no cache configured, concurrent calls still share one, as in the sync path
+    monkeypatch.setattr(cache, "_store", None)
+    monkeypatch.setattr(cache, "CACHE_PATH", "")
+    assert asyncio.run(burst()) == [{"id": "A1"}] * 5
+    assert calls == ["Ian Buchanan"] * 2
+
+
+def test_async_adapters_keep_sqlite_off_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+    import threading
+
+    threads = []
+
+    class Recording(cache.UpstreamCache):
+        def get(self, key, count=True):
+            threads.append(threading.get_ident())
+            return super().get(key, count)
+
+        def put(self, *args, **kwargs):
+            threads.append(threading.get_ident())
+            return super().put(*args, **kwargs)
+
+    monkeypatch.setattr(cache, "_store", Recording(str(tmp_path / "c.sqlite3")))
+
+    @cache.cached("openalex")
+    async def lookup_async(name):
+        return {"id": "A1"}
+
+    async def twice():
+        loop_thread = threading.get_ident()
+        await lookup_async("Ian Buchanan")
+        await lookup_async("Ian Buchanan")
+        return loop_thread
+
+    loop_thread = asyncio.run(twice())
+    assert len(threads) == 4 and loop_thread not in threads
@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from app.know_service import cartography, people, works
+from app.know_service.prewarm import Prewarmer, prewarmer, standard_prompts
+from app.know_service.fanout import deadline_in
+from app.know_service.ext.http import UpstreamError, upstream
+from app.routes.http_cache import DEGRADED_TTL, memo
+from app import app as flask_app
+
+
+def test_compile_keeps_prompt_order_and_deadline(monkeypatch):
+    running, overlap = [], []
+
+    def slow_orcid(orcid, concepts, window=None):
+        running.append(orcid)
+        overlap.append(len(running))
+        time.sleep(0.3 if orcid.endswith("3638") else 0.05)
+        running.remove(orcid)
+        return [{"title": f"Assemblage work {orcid}", "year": 2020, "doi": f"10.1/{orcid}", "url": None}]
+
+    monkeypatch.setattr(works, "orcid_works", slow_orcid)
+    monkeypatch.setattr(works, "openalex_works_by_author", lambda *a, **k: [])
+    monkeypatch.setattr(works, "crossref_search", lambda *a, **k: [])
+
+    g = cartography.compile_graph("compare assemblage across Buchanan, Massumi, Protevi")
+    assert max(overlap) > 1  # authors were fetched side by side
+    labels = [n["label"] for n in g["nodes"] if n["type"] == "author"]
+    assert labels == ["Ian Buchanan", "Brian Massumi", "John Protevi"]
+    assert len(g["refs"]["#ASS"]) == 3
+
+    g = cartography.compile_graph("compare assemblage across Buchanan, Massumi", deadline=deadline_in(0.15))
+    authored = [e["source"] for e in g["edges"] if e["kind"] == "authored"]
+    assert authored == ["0000-0002-4384-3615"]
+
+
+def test_compile_streams_fastest_author_first(monkeypatch):
+    def orcid_works(orcid, concepts, window=None):
+        time.sleep(0.2 if orcid.endswith("3638") else 0.0)
+        return [{"title": f"Assemblage work {orcid}", "year": 2020, "doi": f"10.1/{orcid}", "url": None}]
+
+    monkeypatch.setattr(works, "orcid_works", orcid_works)
+    monkeypatch.setattr(works, "openalex_works_by_author", lambda *a, **k: [])
+    monkeypatch.setattr(works, "crossref_search", lambda *a, **k: [])
+
+    client = flask_app.test_client()
+    r = client.post("/api/know/v1/cartography/compile?stream=ndjson",
+                    json={"prompt": "compare assemblage across Buchanan, Massumi"})
+    assert r.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in r.get_data(as_text=True).splitlines()]
+    assert [e["event"] for e in events] == ["concepts", "author", "author", "summary"]
+    assert [e["index"] for e in events[1:3]] == [1, 0]
+    assert [ref["doi"] for ref in events[-1]["refs"]["#ASS"]] == ["10.1/0000-0002-6797-3638", "10.1/0000-0002-4384-3615"]
+
+    r = client.post("/api/know/v1/cartography/compile", headers={"Accept": "text/event-stream"},
+                    json={"prompt": "compare assemblage across Massumi"})
+    assert r.get_data(as_text=True).startswith("event: concepts\ndata: ")
+
+
+def test_concept_codes_never_collide():
+    codes = cartography.concept_codes(["assemblage", "assembly", "ass", "affect"])
+    assert codes == {"assemblage": "#ASS", "assembly": "#ASSE", "ass": "#ASS2", "affect": "#AFF"}
+
+    work = {"title": "On assembly", "year": 2020, "doi": "10.1/x", "url": None, "concepts": ["assembly"]}
+    nodes, edges, refs = cartography.author_fragment(people.unresolved("A"), [work], ["assemblage", "assembly"])
+    assert refs == {"#ASS": [], "#ASSE": [{"title": "On assembly", "url": None, "doi": "10.1/x", "year": 2020}]}
+
+
+def test_closed_stream_stops_its_authors(monkeypatch):
+    fetched = []
+
+    def resolve_one(name, deadline=None):
+        time.sleep(0.0 if name == "Fast" else 0.2)
+        return people.unresolved(name)
+
+    monkeypatch.setattr(cartography, "resolve_one", resolve_one)
+    monkeypatch.setattr(cartography, "fetch_for", lambda p, *a, **k: fetched.append(p.name) or [])
+    events = cartography.compile_events("assemblage across Fast, Slow, Slower")
+    assert next(events)["event"] == "concepts" and next(events)["index"] == 0
+    events.close()  # the client went away
+    time.sleep(0.4)
+    assert fetched == ["Fast"]
+
+
+def test_prewarmed_group_graphs_serve_matching_prompts(monkeypatch):
+    calls = []
+
+    def orcid_works(orcid, concepts, window=None):
+        calls.append(orcid)
+        return [{"title": f"War machines {orcid}", "year": 2020, "doi": f"10.1/{orcid}", "url": None}]
+
+    monkeypatch.setattr(works, "orcid_works", orcid_works)
+    monkeypatch.setattr(works, "openalex_works_by_author", lambda *a, **k: [])
+    monkeypatch.setattr(works, "crossref_search", lambda *a, **k: [])
+    monkeypatch.setattr(prewarmer, "graphs", {})
+
+    groups = {"Pair": {"members": ["Buchanan", "Massumi"], "defaultConcepts": ["war machine"]}}
+    assert prewarmer.refresh(standard_prompts(groups)) == 1
+    warmed = len(calls)
+
+    r = flask_app.test_client().post("/api/know/v1/cartography/compile",
+                                     json={"prompt": "compare war machine across Buchanan and Massumi"})
+    assert len(calls) == warmed
+    assert len(r.get_json()["refs"]["#WAR"]) == 2
+    assert prewarmer.lookup("compare war machine across Buchanan") is None
+    assert Prewarmer(interval=60).stale()
+
+
+def test_degraded_graphs_are_not_kept(monkeypatch):
+    @upstream([])
+    def failing_orcid(orcid, concepts, window=None):
+        raise UpstreamError("pub.orcid.org: 503")
+
+    good = lambda orcid, concepts, window=None: [{"title": f"War machines {orcid}", "year": 2020,
+                                                   "doi": f"10.1/{orcid}", "url": None}]
+    monkeypatch.setattr(works, "orcid_works", good)
+    monkeypatch.setattr(works, "openalex_works_by_author", lambda *a, **k: [])
+    monkeypatch.setattr(works, "crossref_search", lambda *a, **k: [])
+    monkeypatch.setattr(prewarmer, "graphs", {})
+    groups = {"Pair": {"members": ["Buchanan", "Massumi"], "defaultConcepts": ["war machine"]}}
+    assert prewarmer.refresh(standard_prompts(groups)) == 1
+    generation, graph = prewarmer.generation, prewarmer.lookup("compare war machine across Buchanan, Massumi")
+
+    # a partial outage keeps the last complete graph and asks for a retry
+    monkeypatch.setattr(works, "orcid_works", failing_orcid)
+    assert prewarmer.refresh(standard_prompts(groups)) == 0
+    assert prewarmer.generation == generation and prewarmer.retry and prewarmer.stale()
+    assert prewarmer.lookup("compare war machine across Buchanan, Massumi") is graph
+
+    # a degraded compile is memoized only briefly
+    memo.clear()
+    r = flask_app.test_client().post("/api/know/v1/cartography/compile",
+                                     json={"prompt": "compare war machine across Buchanan"})
+    assert r.status_code == 200
+    [(_, _, expires, _)] = memo.entries.values()
+    assert expires - time.time() <= DEGRADED_TTL
+
+
+def test_fetch_for_falls_through_only_when_short(monkeypatch):
+    calls = []
+
+    def source(name, n):
+        def fetch(key, concepts, window=None, limit=5):
+            calls.append(name)
+            return [{"title": f"{name} {i}", "year": 2000 + i, "doi": None, "url": None} for i in range(n)]
+        return fetch
+
+    person = people.Person("Ian Buchanan", "0000-0002-6797-3638", [], None, "https://openalex.org/A1", [], 1.0, "seed")
+    monkeypatch.setattr(works, "orcid_works", source("orcid", 5))
+    monkeypatch.setattr(works, "openalex_works_by_author", source("openalex", 5))
+    monkeypatch.setattr(works, "crossref_search", source("crossref", 5))
+    assert len(works.fetch_for(person, ["assemblage"])) == 5
+    assert calls == ["orcid"]
+
+    calls.clear()
+    monkeypatch.setattr(works, "orcid_works", source("orcid", 1))
+    titles = [w["title"] for w in works.fetch_for(person, ["assemblage"])]
+    assert sorted(calls) == ["crossref", "openalex", "orcid"] and titles[0] == "orcid 0"
@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 import pytest
@@ -5,7 +6,8 @@ import pytest
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
 
-from app.know_service.catalog import load_scholar_catalog
+from app.know_service.catalog import CatalogStore, find_scholar, load_scholar_catalog, match_scholar
+from app.know_service import people
 from app.know_service.people import resolve
 from app.know_service.works import fetch_for
 from app import app as flask_app
@@ -33,3 +35,56 @@ def test_compile_flex_many():
     data = r.get_json()
     assert any(n["type"] == "author" and "DeLanda" in n["label"] for n in data["nodes"])
     assert any(n["type"] == "concept" and n["label"] == "assemblage" and n["code"] == "#ASS" for n in data["nodes"])
+
+
+def test_find_scholar_normalizes_and_ranks():
+    assert find_scholar("Béistegui, Miguel de")["name"] == "Miguel de Beistegui"
+    assert find_scholar("Pearson, Keith Ansell")["name"] == "Keith Ansell-Pearson"
+    scholar, score = match_scholar("Smith")
+    assert scholar["name"] == "Daniel W. Smith" and 0.5 < score < 1.0
+    assert match_scholar("Gilles Deleuze") == (None, 0.0)
+
+
+def test_resolve_confidence_follows_match_score():
+    exact, fuzzy = resolve(["Buchanan, Ian", "Brian Masumi"])
+    assert exact.confidence == 0.95
+    assert fuzzy.name == "Brian Massumi" and 0.5 < fuzzy.confidence < exact.confidence
+
+
+def test_same_surname_is_not_the_same_scholar(monkeypatch):
+    for name in ("Paul Smith", "Anne Patton", "Smith, Paul"):
+        assert match_scholar(name) == (None, 0.0)
+    assert find_scholar("Dan Smith")["name"] == "Daniel W. Smith"
+    assert find_scholar("D. W. Smith")["name"] == "Daniel W. Smith"
+
+    # no seed, so the name goes to the upstream lookups
+    monkeypatch.setattr(people, "orcid_lookup_by_name", lambda n: None)
+    monkeypatch.setattr(people, "openalex_lookup_author", lambda n: {"id": "https://openalex.org/A1", "display_name": n})
+    p = resolve(["Paul Smith"])[0]
+    assert (p.name, p.source, p.openalex) == ("Paul Smith", "openalex", "https://openalex.org/A1")
+
+    # an ORCID match means OpenAlex is never asked
+    monkeypatch.setattr(people, "orcid_lookup_by_name", lambda n: "0000-0002-1825-0097")
+    monkeypatch.setattr(people, "orcid_person", lambda oc: {"name": "Paul Smith"})
+    asked = []
+    monkeypatch.setattr(people, "openalex_lookup_author", asked.append)
+    assert resolve(["Paul Smith"])[0].orcid == "0000-0002-1825-0097" and asked == []
+
+
+def test_catalog_store_reloads_on_change(tmp_path):
+    path = tmp_path / "scholars.json"
+    path.write_text(json.dumps([{"name": "Ian Buchanan", "aliases": []}]), encoding="utf-8")
+    store = CatalogStore(str(path), poll=0, snapshot_dir=str(tmp_path / "snap"))
+    v1, _, index = store.current()
+    assert all(s["name"] != "Brian Massumi" for s, _ in index.search("Massumi"))
+
+    path.write_text(json.dumps([{"name": "Brian Massumi", "aliases": []}]), encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    store.check()
+    v2, _, index = store.current()
+    assert v2 != v1 and index.search("Massumi")[0][0]["name"] == "Brian Massumi"
+
+    # another worker with the same content loads the compiled snapshot instead of re-indexing
+    other = CatalogStore(str(path), poll=0, snapshot_dir=str(tmp_path / "snap"))
+    assert other._load_snapshot(v2) is not None
+    assert other.current()[2].search("massumi, brian")[0][1] == 1.0
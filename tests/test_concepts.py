@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.know_service.concepts import ConceptTagger, abstract_text, tagger, work_concepts
+
+
+def test_aliases_plurals_and_prefixes_share_one_id():
+    t = ConceptTagger({"assemblage": ["assemblage", "agencement"], "deterritorialization": ["deterritoriali*"]})
+    assert t.tag("Assemblages and the Agencement") == ["assemblage"]
+    assert t.tag("Déterritorialisation") == ["deterritorialization"]
+    assert t.tag("Massage parlours") == []
+
+
+def test_find_keeps_mention_order_and_resolve_folds_names():
+    t = tagger()
+    assert t.find("war machine then assemblage") == ["war-machine", "assemblage"]
+    assert t.resolve("War Machine") == "war-machine"
+    assert t.resolve("unknown idea") == "unknown idea"
+
+
+def test_works_fall_back_to_title_and_abstracts_rebuild():
+    assert work_concepts({"title": "On assemblages"}) == ["assemblage"]
+    assert work_concepts({"title": "On assemblages", "concepts": []}) == []
+    assert abstract_text({"machine": [1], "war": [0]}) == "war machine"
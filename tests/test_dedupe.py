@@ -0,0 +1,55 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.know_service.dedupe import dedupe, normalize_doi, normalize_isbn, work_key
+
+
+def test_canonical_identifiers():
+    assert normalize_doi("https://doi.org/10.1215/ABC") == "10.1215/abc"
+    assert normalize_doi("doi: 10.1215/abc") == "10.1215/abc"
+    assert normalize_isbn("0-306-40615-2") == "9780306406157"
+    assert normalize_isbn("030640615X") == "9780306406157"
+    assert normalize_isbn("123X567890") == normalize_isbn("12345678Y0") == ""
+    assert work_key({"doi": "HTTPS://DX.DOI.ORG/10.1/X", "title": "T"}) == "doi:10.1/x"
+
+
+def test_cross_source_duplicates_collapse():
+    rows = [
+        {"title": "Deleuzism: A Metacommentary", "year": 2000, "doi": "10.1/ABC"},   # ORCID
+        {"title": "Deleuzism", "year": 2000, "doi": "https://doi.org/10.1/abc"},     # OpenAlex
+        {"title": "Deleuzism — a meta-commentary.", "year": 2001, "doi": None},      # Crossref
+        {"title": "The Incomplete Project of Schizoanalysis", "year": 2021},
+        {"title": "Incomplete Project of Schizoanalysis", "year": 2021},
+        {"title": "Assemblage Theory and Method", "type": "book", "isbn": "9781350014671", "year": 2021},
+        {"title": "Assemblage Theory & Method: An Introduction", "type": "book", "isbn": "978-1-350-01467-1"},
+        {"title": "Chapter one", "type": "book-chapter", "isbn": "9781350014671", "year": 2021},
+    ]
+    assert [r["title"] for r in dedupe(rows)] == [
+        "Deleuzism: A Metacommentary",
+        "The Incomplete Project of Schizoanalysis",
+        "Assemblage Theory and Method",
+        "Chapter one",
+    ]
+    assert len(dedupe(rows, limit=2)) == 2
+
+
+def test_numbered_volumes_stay_distinct():
+    rows = [
+        {"title": "Deleuze and Guattari, Volume 1", "year": 2019},
+        {"title": "Deleuze and Guattari, Volume 2", "year": 2019},
+        {"title": "Deleuze and Guattari: Volume I.", "year": 2019},
+        {"title": "Anti-Oedipus Part 1", "year": 1972},
+        {"title": "Anti-Oedipus Part 2", "year": 1972},
+        {"title": "Assemblage Theory, 2nd edition", "year": 2021},
+        {"title": "Assemblage Theory, 3rd edition", "year": 2021},
+    ]
+    assert [r["title"] for r in dedupe(rows)] == [
+        "Deleuze and Guattari, Volume 1",
+        "Deleuze and Guattari, Volume 2",
+        "Anti-Oedipus Part 1",
+        "Anti-Oedipus Part 2",
+        "Assemblage Theory, 2nd edition",
+        "Assemblage Theory, 3rd edition",
+    ]
@@ -0,0 +1,83 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from app.know_service.ext import cache, crossref, openalex, orcid
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_PATH", "")
+    monkeypatch.setattr(cache, "_store", None)
+
+
+def recorder(monkeypatch, module, payload):
+    seen = []
+
+    def get_json(url, params=None, **kw):
+        seen.append((url, params))
+        return payload
+
+    monkeypatch.setattr(module, "get_json", get_json)
+    return seen
+
+
+def test_openalex_pushes_year_and_concepts_upstream(monkeypatch):
+    seen = recorder(monkeypatch, openalex, {"results": []})
+    openalex.openalex_works_by_author("https://openalex.org/A1", ["assemblage", "affect"], (2000, 2010))
+    params = seen[0][1]
+    assert params["filter"] == "author.id:https://openalex.org/A1,publication_year:2000-2010"
+    assert params["search"] == "assemblage OR affect"
+    assert openalex.year_filter((2000, None)) == "publication_year:>1999"
+
+
+def test_crossref_pushes_date_window_upstream(monkeypatch):
+    seen = recorder(monkeypatch, crossref, {"message": {"items": []}})
+    crossref.crossref_search("Ian Buchanan", ["assemblage"], (None, 2010))
+    params = seen[0][1]
+    assert params["filter"] == "until-pub-date:2010"
+    assert params["query.author"] == "Ian Buchanan"
+
+
+def test_orcid_filters_window_locally_and_ranks_concepts(monkeypatch):
+    def summary(title, year):
+        return {"work-summary": [{"title": {"title": {"value": title}}, "publication-date": {"year": {"value": str(year)}}}]}
+
+    recorder(monkeypatch, orcid, {"group": [summary("Deleuze", 2005), summary("Assemblage", 2008), summary("Late", 2020)]})
+    rows = orcid.orcid_works("0000-0002-6797-3638", ["assemblage"], (2000, 2010))
+    assert [r["title"] for r in rows] == ["Assemblage", "Deleuze"]
+
+    recorder(monkeypatch, orcid, {"group": [summary("Deleuze", 2005), summary("Déterritorialisation", 2006),
+                                            summary("The war machines", 2007)]})
+    rows = orcid.orcid_works("0000-0002-6797-3638", ["War Machine", "deterritorialization"])
+    assert [r["title"] for r in rows] == ["Déterritorialisation", "The war machines", "Deleuze"]
+
+
+def test_openalex_cursor_paging_stops_early_or_drains(monkeypatch):
+    pages = {"*": (["a", "b"], "c2"), "c2": (["c", "d"], "c3"), "c3": ([], None)}
+    seen = []
+
+    def get_json(url, params=None, **kw):
+        seen.append(dict(params))
+        titles, nxt = pages[params["cursor"]]
+        return {"results": [{"title": t} for t in titles], "meta": {"next_cursor": nxt}}
+
+    monkeypatch.setattr(openalex, "get_json", get_json)
+    rows = openalex.openalex_works_by_author("A1", [], None, limit=2)
+    assert [r["title"] for r in rows] == ["a", "b"] and len(seen) == 1
+    assert seen[0]["per-page"] == 2 and seen[0]["select"] == openalex.WORK_FIELDS
+
+    seen.clear()
+    assert [r["title"] for r in openalex.iter_openalex_works("A1")] == ["a", "b", "c", "d"]
+    assert [p["cursor"] for p in seen] == ["*", "c2", "c3"]
+
+
+def test_malformed_payloads_fall_back_to_the_default(monkeypatch):
+    recorder(monkeypatch, orcid, {"name": {"given-names": {"value": "Ian"}}, "researcher-urls": None})
+    assert orcid.orcid_person("0000-0002-6797-3638") == {"name": None}
+
+    recorder(monkeypatch, orcid, {"group": [{"work-summary": [{"publication-date": {"year": None}}]},
+                                            {"work-summary": [{"publication-date": {"year": {"value": None}}}]}]})
+    assert orcid.orcid_works("0000-0002-6797-3638", ["assemblage"]) == []
@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.know_service import harvest
+from app.know_service.ext.http import UpstreamError
+
+
+def summary(mods, top):
+    return {
+        "last-modified-date": {"value": top},
+        "group": [{"work-summary": [{"put-code": p, "last-modified-date": {"value": m}}]} for p, m in mods.items()],
+    }
+
+
+def test_harvest_fetches_only_new_or_changed_works(tmp_path, monkeypatch):
+    remote = {"summary": summary({1: 10, 2: 10, 3: 10}, 10)}
+    batches = []
+
+    def work_batch(orcid, codes):
+        batches.append(list(codes))
+        return [{"put-code": int(c), "title": {"title": {"value": f"w{c}"}}} for c in codes]
+
+    monkeypatch.setattr(harvest, "orcid_works_summary", lambda orcid: remote["summary"])
+    monkeypatch.setattr(harvest, "orcid_work_batch", work_batch)
+    monkeypatch.setattr(harvest, "BULK_SIZE", 2)
+
+    works = harvest.harvest(["0000-0000-0000-0001"], state_dir=tmp_path)["0000-0000-0000-0001"]
+    assert [w["put-code"] for w in works] == [1, 2, 3]
+    assert batches == [["1", "2"], ["3"]]
+
+    batches.clear()
+    harvest.harvest_author("0000-0000-0000-0001", tmp_path)
+    assert batches == []
+
+    remote["summary"] = summary({1: 10, 3: 11, 4: 11}, 11)
+    works = harvest.harvest_author("0000-0000-0000-0001", tmp_path)
+    assert batches == [["3", "4"]]
+    assert [w["put-code"] for w in works] == [1, 3, 4]
+
+
+def test_one_failing_orcid_does_not_abort_the_roster(tmp_path, monkeypatch):
+    def works_summary(orcid):
+        if orcid == "0000-0000-0000-0404":
+            raise UpstreamError("pub.orcid.org: HTTP 404")
+        return summary({1: 10}, 10)
+
+    monkeypatch.setattr(harvest, "orcid_works_summary", works_summary)
+    monkeypatch.setattr(harvest, "orcid_work_batch", lambda orcid, codes: [{"put-code": int(c)} for c in codes])
+
+    out = harvest.harvest(["0000-0000-0000-0001", "0000-0000-0000-0404", "0000-0000-0000-0002"], state_dir=tmp_path)
+    assert list(out) == ["0000-0000-0000-0001", "0000-0000-0000-0002"]
+    assert not (tmp_path / "0000-0000-0000-0404.json").exists()
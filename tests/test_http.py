@@ -0,0 +1,95 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from app.know_service.ext import http
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None, headers=None):
+        self.status_code = status
+        self.ok = status < 400
+        self.headers = headers or {}
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def test_retries_throttle_then_succeeds(monkeypatch):
+    c = http.HostClient("example.test", rate=1000, burst=10, concurrency=2, retries=3)
+    replies = [FakeResponse(429, headers={"Retry-After": "0"}), FakeResponse(503), FakeResponse(200, {"ok": 1})]
+    monkeypatch.setattr(c.session, "get", lambda *a, **k: replies.pop(0))
+    monkeypatch.setattr(http, "BACKOFF", 0.001)
+    assert c.get_json("https://example.test/x") == {"ok": 1}
+    snap = c.snapshot()
+    assert snap["retries"] == 2
+    assert snap["status"] == {429: 1, 503: 1, 200: 1}
+
+
+def test_exhausted_retries_raise_and_adapter_falls_back(monkeypatch):
+    c = http.HostClient("example.test", rate=1000, burst=10, concurrency=2, retries=1)
+    monkeypatch.setattr(c.session, "get", lambda *a, **k: FakeResponse(429, headers={"Retry-After": "0"}))
+    with pytest.raises(http.UpstreamError) as e:
+        c.get("https://example.test/x")
+    assert e.value.status == 429
+
+    @http.upstream([])
+    def adapter():
+        return c.get_json("https://example.test/x")
+
+    assert adapter() == []
+
+
+def test_calls_past_their_gather_deadline_give_up(monkeypatch):
+    from app.know_service import fanout
+
+    c = http.HostClient("example.test", rate=1000, burst=10, concurrency=2, retries=3)
+    timeouts = []
+
+    def get(*a, timeout=None, **k):
+        timeouts.append(timeout)
+        return FakeResponse(503, headers={"Retry-After": "5"})
+
+    monkeypatch.setattr(c.session, "get", get)
+    [out] = fanout.gather(fanout.upstream, [(lambda: c.get("https://example.test/x"),)],
+                          fanout.deadline_in(0.5), default="gave up")
+    # the attempt's timeout shrank to the deadline and the 5 s retry was never slept
+    assert out == "gave up" and len(timeouts) == 1 and timeouts[0] <= 0.5
+    with pytest.raises(http.UpstreamError):
+        fanout._within(fanout.deadline_in(-1), c.get, "https://example.test/x")
+
+    # an empty bucket whose next token is past the deadline fails now instead of sleeping
+    slow = http.HostClient("example.test", rate=0.1, burst=1, concurrency=1, retries=0)
+    monkeypatch.setattr(slow.session, "get", lambda *a, **k: FakeResponse(200, {}))
+    slow.get("https://example.test/x")
+    start = fanout.time.monotonic()
+    with pytest.raises(http.UpstreamError):
+        fanout._within(fanout.deadline_in(1), slow.get, "https://example.test/x")
+    assert fanout.time.monotonic() - start < 0.5
+
+
+def test_async_client_shares_the_hosts_budget_and_deadline(monkeypatch):
+    import asyncio
+    from app.know_service import fanout
+    from app.know_service.ext import ahttp
+
+    timeouts = []
+
+    async def get(url, timeout=None, **k):
+        timeouts.append(timeout)
+        return FakeResponse(503, headers={"Retry-After": "5"})
+
+    async def call():
+        c = ahttp.client("https://api.openalex.org/works")
+        monkeypatch.setattr(c.session, "get", get)
+        return c, await fanout.gather_async([(c.get_json, "https://api.openalex.org/works")],
+                                            fanout.deadline_in(0.5), default="gave up")
+
+    c, [out] = asyncio.run(call())
+    sync = http.client("https://api.openalex.org/works")
+    assert c.bucket is sync.bucket and c.slots is sync.slots
+    # capped to the deadline, and the 5 s retry was never slept
+    assert out == "gave up" and len(timeouts) == 1 and timeouts[0] <= 0.5
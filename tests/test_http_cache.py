@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from app.routes import know_v1
+from app.routes.http_cache import memo
+from app import app as flask_app
+
+
+def test_tools_etag_and_304():
+    memo.clear()
+    client = flask_app.test_client()
+    r = client.get("/api/know/v1/tools")
+    etag = r.headers["ETag"]
+    assert r.status_code == 200 and "s-maxage" in r.headers["Cache-Control"]
+    assert [t["name"] for t in r.get_json()] == ["openBibliography", "copyWikiBlock"]
+    assert not any("triggers" in t for t in r.get_json())
+    r = client.get("/api/know/v1/tools", headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.data == b"" and r.headers["ETag"] == etag
+
+
+def test_query_is_memoized_on_canonical_body(monkeypatch):
+    memo.clear()
+    calls = []
+
+    def propose(msg):
+        calls.append(msg)
+        return {"needsTool": False, "answer": msg}
+
+    monkeypatch.setattr(know_v1, "propose_tool", propose)
+    client = flask_app.test_client()
+    a = client.post("/api/know/v1/query", data='{"msg": "hi", "siteId": "s"}', content_type="application/json")
+    # POSTs revalidate with 304 too, on purpose (see the http_cache docstring), not RFC 9110's 412
+    b = client.post("/api/know/v1/query", data='{"siteId":"s","msg":"hi"}', content_type="application/json",
+                    headers={"If-None-Match": a.headers["ETag"]})
+    assert b.status_code == 304 and b.data == b"" and b.headers["ETag"] == a.headers["ETag"] and calls == ["hi"]
+    c = client.post("/api/know/v1/query", json={"siteId": "s", "msg": "hi"}, headers={"If-None-Match": '"stale"'})
+    assert c.status_code == 200 and c.get_json() == a.get_json() and calls == ["hi"]
+    client.post("/api/know/v1/query", json={"siteId": "s", "msg": "other"})
+    assert calls == ["hi", "other"]
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.know_service.intent import KeywordAutomaton, Rules, extract_years
+from app.know_service.prompts import answer_stub, propose_tool
+
+
+def test_automaton_finds_overlapping_keywords():
+    ac = KeywordAutomaton([("he", 1), ("she", 2), ("hers", 3)])
+    assert sorted(ac.scan("ushers")) == [(1, 4, 2), (2, 4, 1), (2, 6, 3)]
+
+
+def test_rules_need_every_phrase_and_keep_priority():
+    rules = Rules([("both", [("wiki", "block")]), ("one", ["wiki"])])
+    assert rules.match("copy the WIKI block") == "both"
+    assert rules.match("wiki page") == "one"
+    assert rules.match("nothing") is None
+
+
+def test_year_spans():
+    assert extract_years("2000–2010") == (2000, 2010)
+    assert extract_years("between 1990 and 1995") == (1990, 1995)
+    assert extract_years("since 2005") == (2005, None)
+    assert extract_years("before 2010") == (None, 2010)
+
+
+def test_propose_tool_slots():
+    call = propose_tool("Open bibliography for assemblage type book 2000–2010")["call"]
+    assert call == {"name": "openBibliography",
+                    "args": {"query": "assemblage", "type": "book", "yearMin": 2000, "yearMax": 2010}}
+    assert propose_tool("copy wiki block")["call"]["name"] == "copyWikiBlock"
+    assert propose_tool("hello") is None
+    assert answer_stub("x", "Wikipedia block?").startswith("Use the Wikipedia block")
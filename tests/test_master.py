@@ -0,0 +1,47 @@
+import csv
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.know_service.master import MasterStore
+
+
+def row(orcid, title, year="2001", doi="", **extra):
+    return {"orcid_id": orcid, "title": title, "year": year, "doi": doi, "source": "ORCID", **extra}
+
+
+def test_upsert_is_incremental_and_keeps_first_owner(tmp_path):
+    store = MasterStore(tmp_path / "m.sqlite3")
+    a = [row("A", "Deleuzism", doi="10.1/X"), row("A", "On Jameson", "2006")]
+    assert store.upsert(a) == 2
+    assert store.upsert(a) == 0
+    assert store.upsert([row("A", "On  Jameson!", "2006", note="2nd ed")]) == 1
+    assert store.upsert([row("B", "Deleuzism (co-authored)", doi="10.1/x")]) == 0
+    assert len(store) == 2
+    assert [r["orcid_id"] for r in store.rows()] == ["A", "A"]
+
+    out = tmp_path / "master.csv"
+    store.export_csv(out)
+    with out.open(encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["title"] == "On  Jameson!" and rows[1]["note"] == "2nd ed"
+
+
+def test_counts_follow_upserts_and_roll_up_groups(tmp_path):
+    from app.know_service.matrix import author_rollups, group_rollups, parse_years
+
+    store = MasterStore(tmp_path / "m.sqlite3")
+    store.upsert([row("A", "One", "1999", type="book"), row("A", "Two", "2004", type="journal-article"),
+                  row("B", "Three", "2004", type="book"), row("B", "Undated", "")])
+    store.upsert([row("A", "Four", "2004", type="book")])
+
+    span = parse_years("2000–2010")
+    assert span == (2000, 2010)
+    a = author_rollups(store, years=span)
+    assert a["A"] == {"total": 2, "by_year": {"2004": 2}, "by_type": {"journal-article": 1, "book": 1}}
+    assert author_rollups(store, types=["book"])["B"]["total"] == 1
+    assert author_rollups(store)["B"]["by_year"] == {"2004": 1, "n.d.": 1}
+
+    g = group_rollups(store, {"G": ["A", "B"]}, years=span, types=["book"])["G"]
+    assert g["members"] == ["A", "B"] and g["total"] == 2 and g["by_year"] == {"2004": 2}
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from app.know_service import telemetry, works
+from app.routes.http_cache import memo
+from app import app as flask_app
+
+
+def test_compile_reports_server_timing_and_metrics(monkeypatch):
+    monkeypatch.setattr(works, "orcid_works", lambda *a, **k: [{"title": "Assemblage", "year": 2020, "doi": "10.1/x", "url": None}])
+    monkeypatch.setattr(works, "openalex_works_by_author", lambda *a, **k: [])
+    monkeypatch.setattr(works, "crossref_search", lambda *a, **k: [])
+    memo.clear()
+
+    client = flask_app.test_client()
+    r = client.post("/api/know/v1/cartography/compile", json={"prompt": "compare assemblage across Buchanan, Massumi"})
+    timing = r.headers["Server-Timing"]
+    for name in ("resolve", "fetch_for", "dedupe", "assemble", "serialize", "total"):
+        assert f"{name};dur=" in timing
+    assert 'fetch_for;dur=' in timing and ';desc="x2"' in timing
+
+    text = client.get("/api/metrics").get_data(as_text=True)
+    assert 'know_request_seconds_count{endpoint="/api/know/v1/cartography/compile",method="POST",status="200"}' in text
+    assert 'know_span_seconds_bucket{span="fetch_for",le="+Inf"}' in text
+    assert "know_response_cache_hit_ratio" in text and 'know_requests_in_flight{endpoint="/api/metrics"} 1' in text
+    assert "# TYPE know_response_cache_lookups_total counter" in text
+    assert 'know_response_cache_lookups_total{outcome="misses"}' in text
+
+
+def test_spans_are_free_without_a_trace():
+    assert telemetry.span("x") is telemetry.span("y")
+    h = telemetry.Histogram("t_seconds", "test", ("k",), buckets=(0.1, 1.0))
+    h.observe(0.5, ("a",))
+    assert 't_seconds_bucket{k="a",le="1.0"} 1' in h.render() and 't_seconds_bucket{k="a",le="0.1"} 0' in h.render()
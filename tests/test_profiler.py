@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from app.know_service import profiler, works
+from app.routes import admin
+from app.routes.http_cache import memo
+from app import app as flask_app
+
+AUTH = {"Authorization": "Bearer s3cret"}
+
+
+def slow_orcid_works(orcid, concepts, window=None):
+    time.sleep(0.1)
+    return [{"title": "Assemblage", "year": 2020, "doi": f"10.1/{orcid}", "url": None}]
+
+
+def test_armed_requests_capture_worker_stacks(monkeypatch, tmp_path):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(profiler, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(works, "orcid_works", slow_orcid_works)
+    monkeypatch.setattr(works, "openalex_works_by_author", lambda *a, **k: [])
+    monkeypatch.setattr(works, "crossref_search", lambda *a, **k: [])
+    memo.clear()
+    client = flask_app.test_client()
+
+    assert client.post("/api/admin/profile", json={"requests": 1}).status_code == 401
+    assert client.post("/api/admin/profile", json={"requests": 1}, headers=AUTH).get_json()["armed"]["requests"] == 1
+    r = client.post("/api/know/v1/cartography/compile", json={"prompt": "compare assemblage across Buchanan"})
+    pid = r.headers["X-Know-Profile-Id"]
+    r = client.post("/api/know/v1/cartography/compile", json={"prompt": "compare assemblage across Massumi"})
+    assert "X-Know-Profile-Id" not in r.headers
+
+    listed = client.get("/api/admin/profiles", headers=AUTH).get_json()["profiles"]
+    assert [p["id"] for p in listed] == [pid] and listed[0]["reason"] == "armed"
+    stacks = client.get(f"/api/admin/profiles/{pid}", headers=AUTH).get_data(as_text=True)
+    assert "slow_orcid_works (tests/test_profiler.py:" in stacks
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks.splitlines())
+
+
+def test_threshold_keeps_only_slow_requests(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(profiler, "arming", profiler.Arming())
+    profiler.arming.arm(threshold_ms=50)
+    for path, pause in (("/fast", 0.0), ("/slow", 0.08)):
+        assert profiler.arming.claim(path) == "threshold"
+        p = profiler.start("threshold")
+        time.sleep(pause + 0.02)
+        elapsed = time.time() - p.started
+        profiler.stop(p, path, elapsed, keep=elapsed * 1000 >= 50)
+    assert [m["path"] for m in profiler.list_profiles()] == ["/slow"]
@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from app.know_service import search
+from app.know_service.master import MasterStore
+from app.know_service.search import WorkSearch
+from app import app as flask_app
+
+BUCHANAN = "0000-0002-6797-3638"
+
+
+def seeded(tmp_path):
+    store = MasterStore(tmp_path / "m.sqlite3")
+    store.upsert([
+        {"orcid_id": BUCHANAN, "title": "Deleuzism: A Metacommentary", "year": "2000", "type": "book"},
+        {"orcid_id": BUCHANAN, "title": "Assemblage Theory and Method", "year": "2021", "type": "book"},
+        {"orcid_id": BUCHANAN, "title": "The War Machine and its assemblages", "year": "2015", "type": "journal-article"},
+        {"orcid_id": "X", "title": "Affect and the city", "year": "2012", "type": "book-chapter"},
+    ])
+    return WorkSearch(store.path)
+
+
+def test_fuzzy_titles_and_facets(tmp_path):
+    ws = seeded(tmp_path)
+    res = ws.search("asemblage theory")
+    assert res["results"][0]["title"] == "Assemblage Theory and Method"
+    assert ws.search("Deleu")["results"][0]["score"] == 1.0
+
+    res = ws.search(types=["article"], concepts=["war-machine"])
+    assert [r["year"] for r in res["results"]] == ["2015"]
+    facets = ws.search()["facets"]
+    assert facets["type"]["book"] == 2 and facets["concept"]["assemblage"] == 2
+    assert facets["author"][0] == {"orcid": BUCHANAN, "name": "Ian Buchanan", "count": 3}
+
+
+def test_cursor_pages_cover_everything_once(tmp_path):
+    ws = seeded(tmp_path)
+    seen, cursor = [], None
+    while True:
+        res = ws.search(limit=1, cursor=cursor)
+        seen += [r["key"] for r in res["results"]]
+        cursor = res["next"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 4
+
+
+def test_threads_share_one_memo_that_sees_new_harvests(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    ws = seeded(tmp_path)
+    with ThreadPoolExecutor(4) as pool:
+        totals = list(pool.map(lambda _: ws.search("assemblage")["total"], range(8)))
+    assert totals == [2] * 8 and len(ws.memo) == 1 <= ws.generation <= 4
+
+    MasterStore(tmp_path / "m.sqlite3").upsert(
+        [{"orcid_id": "X", "title": "Assemblage and the city", "year": "2019", "type": "book"}])
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(lambda _: ws.search("assemblage")["total"], range(8))) == [3] * 8
+
+
+def test_search_route(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "_search", seeded(tmp_path))
+    client = flask_app.test_client()
+    r = client.get("/api/know/v1/search?query=assemblage&yearMin=2016")
+    assert r.status_code == 200 and r.get_json()["total"] == 1
+    assert client.get("/api/know/v1/search?cursor=nope").status_code == 400
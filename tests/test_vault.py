@@ -0,0 +1,96 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from app.know_service import vault
+from app.know_service.vault import VaultIndex, chunk_text
+from app import app as flask_app
+from app.routes import know_v1
+
+PAGE = {"id": "schizo", "title": "Schizoanalysis", "url": "/pages/schizoanalysis",
+        "text": "Schizoanalysis maps desiring-production.\n\nIt is Deleuze and Guattari's answer to psychoanalysis."}
+RECORD = {"orcid_id": "A", "title": "Deleuzism: A Metacommentary", "year": "2000", "type": "book", "doi": "10.1/x"}
+
+
+def test_chunks_respect_size():
+    text = "\n\n".join(["word " * 50] * 10)
+    chunks = chunk_text(text, size=300)
+    assert len(chunks) > 3 and all(len(c) <= 300 for c in chunks)
+
+
+def test_ingest_is_incremental(tmp_path):
+    index = VaultIndex(str(tmp_path / "v.sqlite3"))
+    s = index.ingest("site", [PAGE, RECORD, "junk"])
+    assert (s["added"], s["skipped"], s["pages"], s["records"]) == (2, 1, 1, 1)
+    assert index.ingest("site", [PAGE])["unchanged"] == 1
+    s = index.ingest("site", [dict(PAGE, text="Rewritten page on rhizomes.")], full=True)
+    assert (s["updated"], s["removed"], s["records"]) == (1, 1, 0)
+    assert index.search("site", "rhizomes")[0]["id"] == "schizo"
+    assert index.search("site", "psychoanalysis") == []
+    assert index.search("other", "rhizomes") == []
+
+
+def sign(body):
+    return base64.b64encode(hmac.new(b"s3cret", body.encode(), hashlib.sha256).digest()).decode()
+
+
+def test_ingest_stream_and_grounded_query(tmp_path, monkeypatch):
+    monkeypatch.setattr(vault, "_index", VaultIndex(str(tmp_path / "v.sqlite3")))
+    monkeypatch.setattr(know_v1, "INGEST_SECRET", "s3cret")
+    client = flask_app.test_client()
+    body = "\n".join(json.dumps(x) for x in [PAGE, RECORD]) + "\n"
+    r = client.post("/api/know/v1/ingest?siteId=vault", data=body, content_type="application/x-ndjson",
+                    headers={"X-Signature": sign(body)})
+    assert r.status_code == 200 and r.get_json()["stats"]["added"] == 2
+
+    r = client.post("/api/know/v1/query", json={"siteId": "vault", "msg": "what is schizoanalysis?"})
+    data = r.get_json()
+    assert "desiring-production" in data["answer"]
+    assert data["citations"][0] == {"title": "Schizoanalysis", "url": "/pages/schizoanalysis"}
+
+    r = client.post("/api/know/v1/ingest", data="{not json\n", content_type="application/x-ndjson",
+                    headers={"X-Signature": sign("{not json\n")})
+    assert r.status_code == 400 and "line 1" in r.get_json()["error"]
+
+    # a bad line or a bad signature at the end of a stream rolls the whole run back
+    version = vault._index.version()
+    body = json.dumps(dict(PAGE, id="p2")) + "\n{not json\n"
+    r = client.post("/api/know/v1/ingest", data=body, content_type="application/x-ndjson",
+                    headers={"X-Signature": sign(body)})
+    assert r.status_code == 400 and "line 2" in r.get_json()["error"]
+    body = json.dumps(dict(PAGE, id="p2")) + "\n"
+    r = client.post("/api/know/v1/ingest", data=body, content_type="application/x-ndjson",
+                    headers={"X-Signature": sign(body + " ")})
+    assert r.status_code == 401 and vault._index.version() == version
+
+    monkeypatch.setitem(flask_app.config, "MAX_CONTENT_LENGTH", 16)
+    r = client.post("/api/know/v1/ingest", data=body, content_type="application/x-ndjson",
+                    headers={"X-Signature": sign(body)})
+    assert r.status_code == 413 and vault._index.version() == version
+
+
+def test_ingest_requires_signature(tmp_path, monkeypatch):
+    monkeypatch.setattr(vault, "_index", VaultIndex(str(tmp_path / "v.sqlite3")))
+    client = flask_app.test_client()
+    body = json.dumps({"siteId": "vault", "forceFull": True})
+    monkeypatch.setattr(know_v1, "INGEST_SECRET", "")
+    assert client.post("/api/know/v1/ingest", data=body, content_type="application/json").status_code == 403
+
+    monkeypatch.setattr(know_v1, "INGEST_SECRET", "s3cret")
+    for headers in ({}, {"X-Signature": sign(body + " ")}):
+        r = client.post("/api/know/v1/ingest", data=body, content_type="application/json", headers=headers)
+        assert r.status_code == 401
+    assert vault._index.version() == "0:None"
+
+    feed = tmp_path / "qa-feed.json"
+    feed.write_text("[{oops", encoding="utf-8")
+    monkeypatch.setattr(know_v1, "vault_sources", lambda: vault.vault_sources(str(feed), tmp_path / "none"))
+    r = client.post("/api/know/v1/ingest", data=body, content_type="application/json",
+                    headers={"X-Signature": sign(body)})
+    assert r.status_code == 400 and "qa-feed.json" in r.get_json()["error"]
@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SCHOLAR_CATALOG_PATH", "data/scholars.json")
+
+from app.know_service import works
+from app.know_service.wire import MEDIA_TYPES, compact, expand
+from app.routes.http_cache import memo
+from app import app as flask_app
+
+
+def fake_works(orcid, *a, **k):
+    shared = {"title": "A Thousand Plateaus", "year": 1987, "doi": "10.1/atp", "url": None}
+    own = [{"title": f"Assemblage {orcid} {i}", "year": 2000 + i, "doi": None, "url": f"https://x.org/{orcid}/{i}"}
+           for i in range(20)]
+    return [shared] + own
+
+
+def test_compact_round_trips_and_is_smaller(monkeypatch):
+    monkeypatch.setattr(works, "orcid_works", fake_works)
+    monkeypatch.setattr(works, "openalex_works_by_author", lambda *a, **k: [])
+    monkeypatch.setattr(works, "crossref_search", lambda *a, **k: [])
+    memo.clear()
+    client = flask_app.test_client()
+    body = {"prompt": "compare assemblage across Buchanan, Massumi"}
+
+    plain = client.post("/api/know/v1/cartography/compile", json=body)
+    r = client.post("/api/know/v1/cartography/compile?format=compact", json=body)
+    assert r.status_code == 200 and r.mimetype == MEDIA_TYPES["compact"]
+    graph = plain.get_json()
+    assert expand(r.get_json()) == graph == expand(compact(graph))
+    assert len(r.get_data()) < len(plain.get_data())
+    assert r.headers["Vary"] == plain.headers["Vary"] == "Accept"
+
+    r = client.post("/api/know/v1/cartography/compile", json=body,
+                    headers={"Accept": "application/vnd.know.graph+json, application/json;q=0.5"})
+    assert r.mimetype == MEDIA_TYPES["compact"] and "ETag" in r.headers
+    again = client.post("/api/know/v1/cartography/compile", json=body,
+                        headers={"Accept": "application/vnd.know.graph+json, application/json;q=0.5",
+                                 "If-None-Match": r.headers["ETag"]})
+    assert again.status_code == 304 and again.headers["Vary"] == "Accept"
+
+    r = client.post("/api/know/v1/cartography/compile?format=xml", json=body)
+    assert r.status_code == 400 and json.loads(r.get_data())["ok"] is False